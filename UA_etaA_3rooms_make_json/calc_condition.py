@@ -0,0 +1,116 @@
+import convert_to_input_json as cij
+from excel_formula import FormulaWorkbook
+
+
+# # Evaluate '計算条件' sheet without EXCEL
+# xlwingsでExcelを開いて計算条件を入力する代わりに、ワークブックの数式をPythonで評価して入力の辞書と目標値の確認結果を得る
+
+# 計算条件のシート名
+CALC_CONDITION_SHEET = '計算条件'
+
+
+class CalcConditionWorkbook:
+    """計算条件を入力して入力の辞書を作成するワークブック
+
+    ワークブックの読み込みと数式の解析は最初の1回のみ行い、ケースごとには計算条件のセルを書き換えて再計算する。
+    """
+
+    def __init__(self, excel_file: str = 'continuous_calc_input_excel_UA_etaA_Step3.xlsx'):
+        """
+        Args:
+            excel_file (str): Excelファイル
+        """
+
+        self.workbook = FormulaWorkbook(excel_file=excel_file)
+
+    def set_condition(self, ac_mode: str, region: int, operation_mode: str, TS: int, ua_value: float, eta_a_value: float):
+        """計算条件を入力する
+
+        Args:
+            ac_mode (str): 暖冷房モード（'C' or 'H'）
+            region (int): 地域区分
+            operation_mode (str): 運転モード（'全館連続' or '居室連続' or '居室間歇'）
+            TS (int): 熱容量（1：なし、2：あり）
+            ua_value (float): 目標UA値[W/(m2･K)]
+            eta_a_value (float): 目標ηA値[－]
+        """
+
+        # A3セルに暖冷房モード、B3セルに地域区分、C3セルに運転モード、E3セルに熱容量、I3セルに目標UA値、J3セルに目標ηA値を入力する
+        for (coordinate, value) in [
+            ('A3', ac_mode),
+            ('B3', region),
+            ('C3', operation_mode),
+            ('E3', TS),
+            ('I3', ua_value),
+            ('J3', eta_a_value)
+        ]:
+            self.workbook.set_value(sheet=CALC_CONDITION_SHEET, coordinate=coordinate, value=value)
+
+    def get_check(self) -> (bool, bool):
+        """目標UA、ηA値が担保できているかの確認結果（K3、L3セル）を返す
+
+        Returns:
+            (bool, bool): UA値の確認結果、ηA値の確認結果
+        """
+
+        return (
+            self.workbook.get_value(sheet=CALC_CONDITION_SHEET, coordinate='K3'),
+            self.workbook.get_value(sheet=CALC_CONDITION_SHEET, coordinate='L3')
+        )
+
+    def to_sheets(self) -> dict:
+        """入力の辞書の作成に用いるシートの値を返す
+
+        Returns:
+            dict: シート名をキーとし、行ごとのセルの値のリストのリストを値とする辞書（data_only=Trueで読み込んだ場合と同じ値）
+        """
+
+        sheets = {}
+        for sheet in cij.SHEET_NAMES:
+            values = self.workbook.sheet_values(sheet)
+            n_row = max((row for (row, _) in values), default=0)
+            n_column = max((column for (_, column) in values), default=0)
+            rows = [[None] * n_column for _ in range(n_row)]
+            for ((row, column), v) in values.items():
+                # Excelに保存された値と同様に、整数値の数値は整数として読み込まれる
+                if isinstance(v, float) and v.is_integer():
+                    v = int(v)
+                rows[row - 1][column - 1] = v
+            sheets[sheet] = rows
+
+        return sheets
+
+    def calc(self, ac_mode: str, region: int, operation_mode: str, TS: int, ua_value: float, eta_a_value: float,
+             rf_cache=None) -> (dict, bool, bool):
+        """計算条件を入力して入力の辞書と目標値の確認結果を返す
+
+        Args:
+            ac_mode (str): 暖冷房モード（'C' or 'H'）
+            region (int): 地域区分
+            operation_mode (str): 運転モード（'全館連続' or '居室連続' or '居室間歇'）
+            TS (int): 熱容量（1：なし、2：あり）
+            ua_value (float): 目標UA値[W/(m2･K)]
+            eta_a_value (float): 目標ηA値[－]
+            rf_cache (ResponseFactorCache): 指定した場合、層構成のある部位に応答係数を付ける
+                （convert_to_input_json.make_response_factor_cacheで作成し、全てのケースで共有する）
+
+        Returns:
+            (dict, bool, bool): 入力の辞書（convert_excel_to_jsonと同じ）、UA値の確認結果、ηA値の確認結果
+        """
+
+        self.set_condition(
+            ac_mode=ac_mode,
+            region=region,
+            operation_mode=operation_mode,
+            TS=TS,
+            ua_value=ua_value,
+            eta_a_value=eta_a_value
+        )
+
+        (is_ua_value_check, is_etaa_value_check) = self.get_check()
+
+        input_dict = cij.convert_sheets_to_json(sheets=self.to_sheets())
+        if rf_cache is not None:
+            cij.attach_response_factors(d=input_dict, rf_cache=rf_cache)
+
+        return input_dict, is_ua_value_check, is_etaa_value_check
@@ -0,0 +1,262 @@
+import argparse
+import glob
+import io
+import json
+import os
+import zipfile
+
+import numpy as np
+
+
+# # Store input_data corpus as base documents and per-case patches
+# ケースごとのJSONはほとんどの内容（室、スケジュール、換気、層構成名、形状）が同じで、U値、η値、面積、厚さ等の数値のみが異なる。
+# 構造（辞書のキーとリストの長さ）が同じケースごとに1つの基準の文書を保存し、ケースごとには基準と異なる値のみを保存する。
+
+# 保存形式のバージョン
+VERSION = 1
+
+
+def flatten(doc) -> list:
+    """文書の末端の値を出現順に並べたリストを返す"""
+
+    leaves = []
+
+    def walk(obj):
+        if isinstance(obj, dict):
+            for v in obj.values():
+                walk(v)
+        elif isinstance(obj, list):
+            for v in obj:
+                walk(v)
+        else:
+            leaves.append(obj)
+
+    walk(doc)
+
+    return leaves
+
+
+def get_paths(doc) -> list:
+    """文書の末端の値の位置（ルートからのキーまたは添字のタプル）を出現順に並べたリストを返す"""
+
+    paths = []
+
+    def walk(obj, path):
+        items = obj.items() if isinstance(obj, dict) else enumerate(obj)
+        for k, v in items:
+            if isinstance(v, (dict, list)):
+                walk(v, path + (k,))
+            else:
+                paths.append(path + (k,))
+
+    walk(doc, ())
+
+    return paths
+
+
+def set_value(doc, path: tuple, value):
+    """文書のpathの位置の値を書き換える"""
+
+    for k in path[:-1]:
+        doc = doc[k]
+    doc[path[-1]] = value
+
+
+def get_skeleton(doc) -> str:
+    """文書の構造（辞書のキーの並びとリストの長さ）を表す文字列を返す"""
+
+    def walk(obj):
+        if isinstance(obj, dict):
+            return {k: walk(v) for k, v in obj.items()}
+        elif isinstance(obj, list):
+            return [walk(v) for v in obj]
+        else:
+            return 0
+
+    return json.dumps(walk(doc), ensure_ascii=False, separators=(',', ':'))
+
+
+def write_corpus(documents: dict, file_name: str):
+    """ケースの文書を基準の文書とケースごとの差分として保存する
+
+    Args:
+        documents (dict): ケース名をキーとする文書（入力の辞書）
+        file_name (str): 保存先のファイル（zip形式）
+    """
+
+    # 構造ごとにケースを分類する
+    groups = {}
+    for name, doc in documents.items():
+        groups.setdefault(get_skeleton(doc), []).append(name)
+
+    index = {'version': VERSION, 'cases': {}, 'groups': []}
+
+    with zipfile.ZipFile(file_name, 'w', compression=zipfile.ZIP_DEFLATED) as z:
+
+        for g, names in enumerate(groups.values()):
+
+            # 値の行列（ケース×末端の値）
+            leaves = [flatten(documents[name]) for name in names]
+            base = documents[names[0]]
+            base_leaves = leaves[0]
+
+            # ケースによって値の異なる列
+            varying = [j for j in range(len(base_leaves)) if any(row[j] != base_leaves[j] or type(row[j]) is not type(base_leaves[j]) for row in leaves)]
+
+            # 数値の列（整数のみの列は整数として復元する）と、それ以外の列（文字列、論理値、型の混在）
+            numeric_columns = []
+            integer_columns = []
+            other_columns = []
+            for j in varying:
+                types = set(type(row[j]) for row in leaves)
+                if types == {float}:
+                    numeric_columns.append(j)
+                elif types == {int} and all(abs(row[j]) < 2 ** 53 for row in leaves):
+                    integer_columns.append(j)
+                else:
+                    other_columns.append(j)
+
+            numeric = np.array([[row[j] for j in numeric_columns + integer_columns] for row in leaves], dtype=float).reshape(len(names), -1)
+
+            z.writestr(f'base_{g}.json', json.dumps(base, ensure_ascii=False, separators=(',', ':')))
+            buffer = io.BytesIO()
+            np.save(buffer, numeric)
+            z.writestr(f'numeric_{g}.npy', buffer.getvalue())
+            z.writestr(f'other_{g}.json', json.dumps([[row[j] for j in other_columns] for row in leaves], ensure_ascii=False, separators=(',', ':')))
+
+            index['groups'].append({
+                'numeric_columns': numeric_columns,
+                'integer_columns': integer_columns,
+                'other_columns': other_columns
+            })
+            for i, name in enumerate(names):
+                index['cases'][name] = [g, i]
+
+        z.writestr('index.json', json.dumps(index, ensure_ascii=False))
+
+
+class CorpusStore:
+    """write_corpusで保存したケースの文書を読み込む"""
+
+    def __init__(self, file_name: str):
+        """
+        Args:
+            file_name (str): write_corpusで保存したファイル
+        """
+
+        with zipfile.ZipFile(file_name) as z:
+            index = json.loads(z.read('index.json'))
+            if index['version'] != VERSION:
+                raise Exception('Unsupported corpus version', index['version'])
+            self.groups = []
+            for g, group in enumerate(index['groups']):
+                base = z.read(f'base_{g}.json')
+                # 差分のある列の位置のみ保持する
+                paths = get_paths(json.loads(base))
+                self.groups.append(dict(
+                    group,
+                    base=base,
+                    numeric_paths=[paths[j] for j in group['numeric_columns']],
+                    integer_paths=[paths[j] for j in group['integer_columns']],
+                    other_paths=[paths[j] for j in group['other_columns']],
+                    numeric=np.load(io.BytesIO(z.read(f'numeric_{g}.npy'))),
+                    other=json.loads(z.read(f'other_{g}.json'))
+                ))
+
+        self.cases = index['cases']
+
+    def names(self) -> list:
+        """ケース名のリスト"""
+
+        return sorted(self.cases)
+
+    def __len__(self):
+        return len(self.cases)
+
+    def __contains__(self, name):
+        return name in self.cases
+
+    def get(self, name: str) -> dict:
+        """ケースの文書を復元する
+
+        Args:
+            name (str): ケース名
+
+        Returns:
+            dict: 文書（入力の辞書）
+        """
+
+        (g, i) = self.cases[name]
+        group = self.groups[g]
+
+        doc = json.loads(group['base'])
+
+        values = group['numeric'][i]
+        n_float = len(group['numeric_paths'])
+        for path, v in zip(group['numeric_paths'], values[:n_float].tolist()):
+            set_value(doc, path, v)
+        for path, v in zip(group['integer_paths'], values[n_float:].tolist()):
+            set_value(doc, path, int(v))
+        for path, v in zip(group['other_paths'], group['other'][i]):
+            set_value(doc, path, v)
+
+        return doc
+
+    def export(self, output_dir: str, names: list = None, indent: int = 2):
+        """ケースの文書をJSONファイルに書き出す
+
+        Args:
+            output_dir (str): 出力先のフォルダ
+            names (list): ケース名のリスト（省略時は全てのケース）
+            indent (int): JSONのインデント（notebookの出力と同じ2が既定値）
+        """
+
+        os.makedirs(output_dir, exist_ok=True)
+        for name in (self.names() if names is None else names):
+            with open(os.path.join(output_dir, name + '.json'), 'w', encoding='utf-8') as f:
+                f.write(json.dumps(self.get(name), indent=indent, ensure_ascii=False))
+
+
+def read_documents(input_dir: str) -> dict:
+    """フォルダ内のJSONファイルを読み込む
+
+    Args:
+        input_dir (str): フォルダ
+
+    Returns:
+        dict: ケース名（拡張子を除くファイル名）をキーとする文書
+    """
+
+    documents = {}
+    for file_name in sorted(glob.glob(os.path.join(input_dir, '*.json'))):
+        with open(file_name, encoding='utf-8') as f:
+            documents[os.path.splitext(os.path.basename(file_name))[0]] = json.load(f)
+
+    return documents
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='入力JSONのフォルダを基準の文書とケースごとの差分に変換する、またはJSONに戻す')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    parser_pack = subparsers.add_parser('pack', help='JSONのフォルダを保存する')
+    parser_pack.add_argument('input_dir', help='入力JSONのフォルダ')
+    parser_pack.add_argument('file_name', help='保存先のファイル')
+
+    parser_unpack = subparsers.add_parser('unpack', help='JSONファイルに書き出す')
+    parser_unpack.add_argument('file_name', help='保存したファイル')
+    parser_unpack.add_argument('output_dir', help='出力先のフォルダ')
+    parser_unpack.add_argument('--name', nargs='+', default=None, help='書き出すケース名（省略時は全てのケース）')
+    parser_unpack.add_argument('--indent', type=int, default=2, help='JSONのインデント')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'pack':
+        write_corpus(documents=read_documents(input_dir=args.input_dir), file_name=args.file_name)
+    elif args.command == 'unpack':
+        CorpusStore(file_name=args.file_name).export(output_dir=args.output_dir, names=args.name, indent=args.indent)
+
+
+if __name__ == '__main__':
+    main()
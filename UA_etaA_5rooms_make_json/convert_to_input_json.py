@@ -1,26 +1,107 @@
 import openpyxl
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
+import argparse
+import concurrent.futures
 import json
+import os
+import sys
+import time
+import tracemalloc
 
 
 # # Convert EXCEL sheet to json format
 
+# 入力の辞書の作成に用いるシート
+SHEET_NAMES = [
+    'common',
+    'building',
+    'rooms',
+    'external_general_parts',
+    'external_opaque_parts',
+    'external_transparent_parts',
+    'internals',
+    'grounds',
+    'layers'
+]
+
+# 応答係数の計算に用いるモジュールのフォルダ
+RF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'calc_rf_using_minimize_function')
+
 def count_number_in_id_row(sheet):
-    id_all = [row[1].value for row in sheet.rows][1:]
+    id_all = [row[1] for row in sheet][1:]
     return len(id_all) - (id_all).count(None)
 
 def make_dictionary_of_layer(row):
-    n = int(row[2].value)
+    n = int(row[2])
     layer = [
         {
-            "name": row[3+3*i].value,
-            "thermal_resistance": float(row[4+3*i].value),
-            "thermal_capacity": float(row[5+3*i].value)
+            "name": row[3+3*i],
+            "thermal_resistance": float(row[4+3*i]),
+            "thermal_capacity": float(row[5+3*i])
         } for i in range(n)
     ]
     # Tuple(layer_list, reversed_layer_list)
     return layer, layer[::-1]
 
 
+class LayerIndex:
+    """層構成名から層構成を引く索引
+
+    layersシートの行ごとに層構成（室内側から順）と逆順の層構成を1回だけ作成し、同じ名前を参照する部位で共有する。
+    """
+
+    def __init__(self, rows: list):
+        """
+        Args:
+            rows (list): layersシートの行（見出しを除く）のリスト
+        """
+
+        self.layers = {}
+        self.duplicates = set()
+        for row in rows:
+            name = row[1]
+            if name in self.layers:
+                self.duplicates.add(name)
+                continue
+            # Tuple(layer_list, reversed_layer_list)
+            self.layers[name] = make_dictionary_of_layer(row)
+
+    def validate(self, names):
+        """参照する層構成名が全て1つずつ定義されていることを確認する
+
+        Args:
+            names: 部位が参照する層構成名
+
+        Raises:
+            Exception: 定義されていない名前、または重複して定義された名前がある場合（該当する名前を全て示す）
+        """
+
+        names = set(names)
+        missing = sorted((name for name in names if name not in self.layers), key=str)
+        duplicates = sorted((name for name in names if name in self.duplicates), key=str)
+        if len(missing) > 0:
+            raise Exception("Can't find the layer", missing)
+        if len(duplicates) > 0:
+            raise Exception("Match over one layer.", duplicates)
+
+    def get(self, layer_name, is_reverse=False) -> list:
+        """層構成を返す
+
+        Args:
+            layer_name: 層構成名
+            is_reverse (bool): Trueの場合、逆順（隣室側から順）の層構成を返す
+
+        Returns:
+            list: 層の辞書のリスト（同じ名前に対しては同じオブジェクト）
+        """
+
+        if layer_name in self.duplicates:
+            raise Exception("Match over one layer.", layer_name)
+        if layer_name not in self.layers:
+            raise Exception("Can't find the layer", layer_name)
+        return self.layers[layer_name][1 if is_reverse else 0]
+
+
 def get_h_c(direction):
     if direction in ['s', 'sw', 'w', 'nw', 'n', 'ne', 'e', 'se']:
         return 2.5
@@ -85,19 +166,222 @@ def get_is_floor(direction):
         raise Exception()
 
 
-def convert_excel_to_json(excel_file: str) -> dict:
+def make_response_factor_cache(cache_dir: str = None, method: str = 'QP'):
+    """部位の層構成の応答係数のキャッシュを作成する（応答係数の計算にはscipyを用いるため、必要な場合のみ読み込む）
+
+    Args:
+        cache_dir (str): 応答係数をファイルに保存するフォルダ（省略時はメモリ上のみ）
+        method (str): 最適化の解法
+
+    Returns:
+        ResponseFactorCache: キャッシュ（calc_rf_using_minimize_function/rf_cache.pyを参照）
+    """
+
+    if RF_DIR not in sys.path:
+        sys.path.append(RF_DIR)
+    from rf_cache import ResponseFactorCache
+
+    return ResponseFactorCache(cache_dir=cache_dir, method=method)
+
+
+def attach_response_factors(d: dict, rf_cache) -> dict:
+    """層構成のある部位に応答係数を付ける
+
+    応答係数（固定根と係数）は室外側の表面熱伝達抵抗を含む層構成について1回だけ計算する。
+    入力の辞書には層構成ごとの応答係数の表（'response_factors'、キーは層構成と解法のハッシュ）を1つだけ加え、
+    部位の'response_factor'は表のキーとする。
+    応答係数の計算に失敗した部位がある場合は、係数を付けずに部位ID、名前と失敗の理由を付けたValueErrorを送出する。
+
+    Args:
+        d (dict): 入力の辞書
+        rf_cache (ResponseFactorCache): make_response_factor_cacheで作成したキャッシュ
+
+    Returns:
+        dict: 応答係数を付けた入力の辞書（同じオブジェクト）
+    """
+
+    response_factors = {}
+    for boundary in d['boundaries']:
+        if 'layers' in boundary:
+            try:
+                (key, rf) = rf_cache.get_output_by_boundary(boundary)
+            except ValueError as e:
+                raise ValueError('Response factor fit failed', boundary['id'], boundary['name'], *e.args[1:]) from e
+            boundary['response_factor'] = key
+            response_factors[key] = rf
+    d['response_factors'] = response_factors
+
+    return d
+
+
+def convert_excel_to_json(excel_file: str, streaming: bool = True, rf_cache=None) -> dict:
+    """Excelファイル（数式の計算結果）から入力の辞書を作成する
+
+    Args:
+        excel_file (str): Excelファイル
+        streaming (bool): Trueの場合、read_onlyモードで必要なシートの値のみを読み込む（Falseの場合、ワークブック全体を読み込む）
+        rf_cache (ResponseFactorCache): 指定した場合、層構成のある部位に応答係数を付ける（attach_response_factorsを参照）
+
+    Returns:
+        dict: 入力の辞書
+    """
 
-    book = openpyxl.load_workbook(excel_file, data_only=True)
+    if streaming:
+        d = convert_sheets_to_json(sheets=read_sheets_streaming(excel_file=excel_file))
+    else:
+        book = openpyxl.load_workbook(excel_file, data_only=True)
+        d = convert_book_to_json(book=book)
+
+    if rf_cache is not None:
+        attach_response_factors(d=d, rf_cache=rf_cache)
+
+    return d
+
+
+def read_sheets_streaming(excel_file: str) -> dict:
+    """入力の辞書の作成に用いるシートの値をread_onlyモードで読み込む
+
+    書式やシート全体を読み込まずに、9つのシートを1回ずつ先頭から読み、ID列（B列）が空の行で読み込みを打ち切る。
+
+    Args:
+        excel_file (str): Excelファイル
+
+    Returns:
+        dict: シート名をキーとし、行ごとのセルの値のリストのリストを値とする辞書（1行目は見出し）
+    """
+
+    book = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+
+    try:
+        sheets = {}
+        for name in SHEET_NAMES:
+            rows = []
+            for row in book[name].iter_rows(values_only=True):
+                if len(rows) > 0 and (len(row) < 2 or row[1] is None):
+                    break
+                rows.append(list(row))
+            sheets[name] = rows
+    finally:
+        # read_onlyモードではファイルを開いたままになるため閉じる
+        book.close()
+
+    return sheets
+
+
+def convert_excel_files_to_json(excel_files: list, workers: int = None, streaming: bool = True, rf_cache=None) -> list:
+    """複数のExcelファイルをプロセスプールで並列に変換する
+
+    Args:
+        excel_files (list): Excelファイルのリスト
+        workers (int): ワーカープロセス数（省略時はファイル数とCPU数の小さい方）
+        streaming (bool): convert_excel_to_jsonを参照
+        rf_cache (ResponseFactorCache): 指定した場合、層構成のある部位に応答係数を付ける
+            （ファイル間で共有するため、変換後にこのプロセスでまとめて付ける）
+
+    Returns:
+        list: ファイルごとの入力の辞書（excel_filesと同じ順）
+    """
+
+    if workers is None:
+        workers = min(len(excel_files), os.cpu_count() or 1)
+
+    if workers <= 1:
+        ds = [convert_excel_to_json(excel_file=excel_file, streaming=streaming) for excel_file in excel_files]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            ds = list(executor.map(convert_excel_to_json, excel_files, [streaming] * len(excel_files)))
+
+    if rf_cache is not None:
+        for d in ds:
+            attach_response_factors(d=d, rf_cache=rf_cache)
+
+    return ds
+
+
+def benchmark(excel_files: list) -> list:
+    """ワークブック全体を読み込む場合とread_onlyモードで読み込む場合の実行時間とピークメモリを計測する
+
+    Args:
+        excel_files (list): Excelファイルのリスト
+
+    Returns:
+        list: ファイルと読み込み方法ごとの結果の辞書のリスト（変換できない場合は'error'、できた場合はワークブック全体を読み込んだ結果との一致を'is_same'に格納する）
+    """
+
+    results = []
+    for excel_file in excel_files:
+        outputs = {}
+        for streaming in (False, True):
+            tracemalloc.start()
+            start = time.perf_counter()
+            try:
+                outputs[streaming] = convert_excel_to_json(excel_file=excel_file, streaming=streaming)
+            except Exception as e:
+                # シートの列構成が異なる等、変換できないワークブック
+                outputs[streaming] = e
+            elapsed = time.perf_counter() - start
+            (_, peak) = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result = {
+                'excel_file': excel_file,
+                'streaming': streaming,
+                'time': elapsed,
+                'peak_memory': peak
+            }
+            if isinstance(outputs[streaming], Exception):
+                result['error'] = repr(outputs[streaming])
+            else:
+                result['is_same'] = outputs[streaming] == outputs[False]
+            results.append(result)
 
-    sheet_common = book['common']
-    sheet_building = book['building']
-    sheet_rooms = book['rooms']
-    sheet_external_general_parts = book['external_general_parts']
-    sheet_external_opaque_parts = book['external_opaque_parts']
-    sheet_external_transparent_parts = book['external_transparent_parts']
-    sheet_internals = book['internals']
-    sheet_grounds = book['grounds']
-    sheet_layers = book['layers']
+    return results
+
+
+def convert_book_to_json(book) -> dict:
+    """値（数式の計算結果）を持つワークブックから入力の辞書を作成する
+
+    Args:
+        book: openpyxlのワークブック（data_only=Trueで読み込んだもの）
+
+    Returns:
+        dict: 入力の辞書
+    """
+
+    return convert_sheets_to_json(sheets=read_sheets(book=book))
+
+
+def read_sheets(book) -> dict:
+    """入力の辞書の作成に用いるシートの値を読み込む
+
+    Args:
+        book: openpyxlのワークブック
+
+    Returns:
+        dict: シート名をキーとし、行ごとのセルの値のリストのリストを値とする辞書
+    """
+
+    return {name: [list(row) for row in book[name].iter_rows(values_only=True)] for name in SHEET_NAMES}
+
+
+def convert_sheets_to_json(sheets: dict) -> dict:
+    """シートの値から入力の辞書を作成する
+
+    Args:
+        sheets (dict): シート名をキーとし、行ごとのセルの値のリストのリストを値とする辞書（1行目は見出し）
+
+    Returns:
+        dict: 入力の辞書
+    """
+
+    sheet_common = sheets['common']
+    sheet_building = sheets['building']
+    sheet_rooms = sheets['rooms']
+    sheet_external_general_parts = sheets['external_general_parts']
+    sheet_external_opaque_parts = sheets['external_opaque_parts']
+    sheet_external_transparent_parts = sheets['external_transparent_parts']
+    sheet_internals = sheets['internals']
+    sheet_grounds = sheets['grounds']
+    sheet_layers = sheets['layers']
 
 
     n_rooms = count_number_in_id_row(sheet=sheet_rooms)
@@ -122,184 +406,173 @@ def convert_excel_to_json(excel_file: str) -> dict:
     n_layers
 
 
-    def get_layers(layer_name, is_reverse=False):
-        # use variable 'layers_master' as global variable
-        layers = list(filter(lambda d: d['name'] == layer_name , layers_master))
-        if len(layers) > 1:
-            raise Exception("Match over one layer.")
-        if len(layers) == 0:
-            raise Exception("Can't find the layer", layer_name)
-        if is_reverse:
-            return layers[0]['reversed_layers']
-        else:
-            return layers[0]['layers']
-    
-    layers_master = [
-        {
-            "name": row[1].value,
-            "layers": make_dictionary_of_layer(row)[0],
-            "reversed_layers": make_dictionary_of_layer(row)[1]
-        } for row in sheet_layers.iter_rows(min_row=2, max_row=n_layers+1)
-    ]
+    # 層構成名の索引を作成し、面積が0より大きい部位が参照する層構成名が定義されていることを先に確認する
+    layer_index = LayerIndex(rows=sheet_layers[1:n_layers+1])
+    layer_index.validate(
+        [row[7] for row in sheet_external_general_parts[1:n_external_general_parts+1] if float(row[5]) > 0.0]
+        + [row[10] for row in sheet_internals[1:n_internals+1] if float(row[9]) > 0.0]
+        + [row[6] for row in sheet_grounds[1:n_grounds+1] if float(row[5]) > 0.0]
+    )
+    get_layers = layer_index.get
 
     common = {
-        'ac_method': sheet_common.cell(column=2, row=2).value
+        'ac_method': sheet_common[1][1]
     }
 
     building = {
         "infiltration": {
             "method": "balance_residential",
             "c_value_estimate": "specify",
-            "story": int(sheet_building.cell(column=2, row=2).value),
-            "c_value": float(sheet_building.cell(column=3, row=2).value),
-            "inside_pressure": sheet_building.cell(column=4, row=2).value
+            "story": int(sheet_building[1][1]),
+            "c_value": float(sheet_building[1][2]),
+            "inside_pressure": sheet_building[1][3]
         }
     }
 
     rooms = [
         {
-            "id": row[1].value,
-            "name": row[2].value,
-            "sub_name": row[3].value,
-            "floor_area": float(row[4].value),
-            "volume": float(row[5].value),
+            "id": row[1],
+            "name": row[2],
+            "sub_name": row[3],
+            "floor_area": float(row[4]),
+            "volume": float(row[5]),
             "ventilation": {
-                "natural": float(row[6].value)
+                "natural": float(row[6])
             },
             "furniture": {
                 "input_method": "specify",
-                "heat_capacity": float(row[8].value),
-                "heat_cond": 0.00022 * float(row[8].value),
+                "heat_capacity": float(row[8]),
+                "heat_cond": 0.00022 * float(row[8]),
                 "moisture_capacity": 0.0,
                 "moisture_cond": 0.9
             },
             "schedule": {
-                "name": row[7].value
+                "name": row[7]
             }
-        } for row in sheet_rooms.iter_rows(min_row=2, max_row=n_rooms+1)
+        } for row in sheet_rooms[1:n_rooms+1]
     ]
 
     external_general_parts =  [
         {
-            "id": row[1].value,
-            "name": row[2].value,
-            "sub_name": row[3].value,
-            "connected_room_id": int(row[4].value),
+            "id": row[1],
+            "name": row[2],
+            "sub_name": row[3],
+            "connected_room_id": int(row[4]),
             "boundary_type": "external_general_part",
-            "area": float(row[5].value),
-            "h_c": get_h_c(direction=row[8].value),
-            "is_solar_absorbed_inside": bool(row[6].value),
-            "is_floor": bool(row[6].value),
-            "layers": get_layers(layer_name=row[7].value),
+            "area": float(row[5]),
+            "h_c": get_h_c(direction=row[8]),
+            "is_solar_absorbed_inside": bool(row[6]),
+            "is_floor": bool(row[6]),
+            "layers": get_layers(layer_name=row[7]),
             "solar_shading_part": {"existence": False},
             "is_sun_striked_outside": True,
-            "direction": row[8].value,
+            "direction": row[8],
             "outside_emissivity": 0.9,
-            "outside_heat_transfer_resistance": get_outside_heat_transfer_resistance(direction=row[8].value),
+            "outside_heat_transfer_resistance": get_outside_heat_transfer_resistance(direction=row[8]),
             "outside_solar_absorption": 0.8,
-            "temp_dif_coef": float(row[9].value)
-        } for row in sheet_external_general_parts.iter_rows(min_row=2, max_row=n_external_general_parts+1) if float(row[5].value) > 0.0
+            "temp_dif_coef": float(row[9])
+        } for row in sheet_external_general_parts[1:n_external_general_parts+1] if float(row[5]) > 0.0
     ]
 
 
     external_opaque_parts =  [
         {
-            "id": row[1].value,
-            "name": row[2].value,
-            "sub_name": row[3].value,
-            "connected_room_id": int(row[4].value),
+            "id": row[1],
+            "name": row[2],
+            "sub_name": row[3],
+            "connected_room_id": int(row[4]),
             "boundary_type": "external_opaque_part",
-            "area": float(row[5].value),
-            "h_c": get_h_c(direction=row[7].value),
+            "area": float(row[5]),
+            "h_c": get_h_c(direction=row[7]),
             "is_solar_absorbed_inside": False,
             "is_floor": False,
             "solar_shading_part": {"existence": False},
             "is_sun_striked_outside": True,
-            "direction": row[7].value,
+            "direction": row[7],
             "outside_emissivity": 0.9,
-            "outside_heat_transfer_resistance": get_outside_heat_transfer_resistance(direction=row[7].value),
-            "u_value": float(row[6].value),
+            "outside_heat_transfer_resistance": get_outside_heat_transfer_resistance(direction=row[7]),
+            "u_value": float(row[6]),
             "inside_heat_transfer_resistance": 0.11,
             "outside_solar_absorption": 0.8,
             "temp_dif_coef": 1.0
-        } for row in sheet_external_opaque_parts.iter_rows(min_row=2, max_row=n_external_opaque_parts+1) if float(row[5].value) > 0.0
+        } for row in sheet_external_opaque_parts[1:n_external_opaque_parts+1] if float(row[5]) > 0.0
     ]
 
     external_transparent_parts =  [
         {
-            "id": row[1].value,
-            "name": row[2].value,
-            "sub_name": row[3].value,
-            "connected_room_id": int(row[4].value),
+            "id": row[1],
+            "name": row[2],
+            "sub_name": row[3],
+            "connected_room_id": int(row[4]),
             "boundary_type": "external_transparent_part",
-            "area": float(row[5].value),
-            "h_c": get_h_c(direction=row[10].value),
+            "area": float(row[5]),
+            "h_c": get_h_c(direction=row[10]),
             "is_solar_absorbed_inside": False,
             "is_floor": False,
-            "solar_shading_part": get_solar_shading(exist=bool(row[11].value), depth=row[12].value, d_h=row[13].value, d_e=row[14].value),
+            "solar_shading_part": get_solar_shading(exist=bool(row[11]), depth=row[12], d_h=row[13], d_e=row[14]),
             "is_sun_striked_outside": True,
-            "direction": row[10].value,
+            "direction": row[10],
             "outside_emissivity": 0.9,
-            "outside_heat_transfer_resistance": get_outside_heat_transfer_resistance(direction=row[10].value),
-            "u_value": float(row[6].value),
+            "outside_heat_transfer_resistance": get_outside_heat_transfer_resistance(direction=row[10]),
+            "u_value": float(row[6]),
             "inside_heat_transfer_resistance": 0.11,
-            "eta_value": float(row[7].value),
-            "incident_angle_characteristics": row[8].value,
-            "glass_area_ratio": float(row[9].value),
+            "eta_value": float(row[7]),
+            "incident_angle_characteristics": row[8],
+            "glass_area_ratio": float(row[9]),
             "temp_dif_coef": 1.0
-        } for row in sheet_external_transparent_parts.iter_rows(min_row=2, max_row=n_external_transparent_parts+1) if float(row[5].value) > 0.0
+        } for row in sheet_external_transparent_parts[1:n_external_transparent_parts+1] if float(row[5]) > 0.0
     ]
 
     internals_2d =  [
         [
             {
-                "id": row[1].value,
-                "name": row[3].value,
-                "sub_name": row[5].value,
-                "connected_room_id": int(row[7].value),
+                "id": row[1],
+                "name": row[3],
+                "sub_name": row[5],
+                "connected_room_id": int(row[7]),
                 "boundary_type": "internal",
-                "area": float(row[9].value),
-                "h_c": get_h_c(direction=row[11].value)[0],
-                "is_solar_absorbed_inside": get_is_floor(direction=row[11].value)[0],
-                "is_floor": get_is_floor(direction=row[11].value)[0],
-                "layers": get_layers(layer_name=row[10].value, is_reverse=False),
+                "area": float(row[9]),
+                "h_c": get_h_c(direction=row[11])[0],
+                "is_solar_absorbed_inside": get_is_floor(direction=row[11])[0],
+                "is_floor": get_is_floor(direction=row[11])[0],
+                "layers": get_layers(layer_name=row[10], is_reverse=False),
                 "solar_shading_part": get_solar_shading(exist=False),
-                "outside_heat_transfer_resistance": get_outside_heat_transfer_resistance(direction=row[11].value)[0],
-                "rear_surface_boundary_id": row[2].value
+                "outside_heat_transfer_resistance": get_outside_heat_transfer_resistance(direction=row[11])[0],
+                "rear_surface_boundary_id": row[2]
             },
             {
-                "id": row[2].value,
-                "name": row[4].value,
-                "sub_name": row[6].value,
-                "connected_room_id": int(row[8].value),
+                "id": row[2],
+                "name": row[4],
+                "sub_name": row[6],
+                "connected_room_id": int(row[8]),
                 "boundary_type": "internal",
-                "area": float(row[9].value),
-                "h_c": get_h_c(direction=row[11].value)[1],
-                "is_solar_absorbed_inside": get_is_floor(direction=row[11].value)[1],
-                "is_floor": get_is_floor(direction=row[11].value)[1],
-                "layers": get_layers(layer_name=row[10].value, is_reverse=True),
+                "area": float(row[9]),
+                "h_c": get_h_c(direction=row[11])[1],
+                "is_solar_absorbed_inside": get_is_floor(direction=row[11])[1],
+                "is_floor": get_is_floor(direction=row[11])[1],
+                "layers": get_layers(layer_name=row[10], is_reverse=True),
                 "solar_shading_part": get_solar_shading(exist=False),
-                "outside_heat_transfer_resistance": get_outside_heat_transfer_resistance(direction=row[11].value)[1],
-                "rear_surface_boundary_id": row[1].value
+                "outside_heat_transfer_resistance": get_outside_heat_transfer_resistance(direction=row[11])[1],
+                "rear_surface_boundary_id": row[1]
             }
-        ] for row in sheet_internals.iter_rows(min_row=2, max_row=n_internals+1) if float(row[9].value) > 0.0
+        ] for row in sheet_internals[1:n_internals+1] if float(row[9]) > 0.0
     ]
     # flatten
     internals = sum(internals_2d, [])
 
     grounds =  [
         {
-            "id": row[1].value,
-            "name": row[2].value,
-            "sub_name": row[3].value,
-            "connected_room_id": int(row[4].value),
+            "id": row[1],
+            "name": row[2],
+            "sub_name": row[3],
+            "connected_room_id": int(row[4]),
             "boundary_type": "ground",
-            "area": float(row[5].value),
-            "is_solar_absorbed_inside": bool(row[7].value),
+            "area": float(row[5]),
+            "is_solar_absorbed_inside": bool(row[7]),
             "is_floor": True,
             "h_c": get_h_c(direction='bottom'),
-            "layers": get_layers(layer_name=row[6].value)
-        } for row in sheet_grounds.iter_rows(min_row=2, max_row=n_grounds+1) if float(row[5].value) > 0.0
+            "layers": get_layers(layer_name=row[6])
+        } for row in sheet_grounds[1:n_grounds+1] if float(row[5]) > 0.0
     ]
 
     complete_list = {
@@ -312,7 +585,140 @@ def convert_excel_to_json(excel_file: str) -> dict:
     return complete_list
 
 
+class InputWorkbook:
+    """入力の辞書の作成に用いるシートの値をメモリ上に保持するモデル
+
+    Excelファイルの解析は最初の1回のみ行い、ケースごとには変更するセル（面積、U値、η値、層構成名等）のみを書き換えて辞書を作成する。
+    """
+
+    def __init__(self, sheets: dict):
+        """
+        Args:
+            sheets (dict): シート名をキーとし、行ごとのセルの値のリストのリストを値とする辞書
+        """
+
+        self.sheets = sheets
+
+    @classmethod
+    def from_excel(cls, excel_file: str):
+        """Excelファイル（数式の計算結果）を読み込む
+
+        Args:
+            excel_file (str): Excelファイル
+
+        Returns:
+            InputWorkbook: 読み込んだモデル
+        """
+
+        book = openpyxl.load_workbook(excel_file, data_only=True)
+
+        return cls(sheets=read_sheets(book=book))
+
+    def set_value(self, sheet: str, coordinate: str, value):
+        """セルの値を書き換える
+
+        Args:
+            sheet (str): シート名
+            coordinate (str): セル番地（'F2'等）
+            value: 値
+        """
+
+        self.sheets = apply_overrides(sheets=self.sheets, overrides={(sheet, coordinate): value})
+
+    def to_json(self, overrides: dict = None, rf_cache=None) -> dict:
+        """入力の辞書を作成する
+
+        Args:
+            overrides (dict): (シート名, セル番地)をキーとする、このケースのみ書き換えるセルの値（モデルの値は変更しない）
+            rf_cache (ResponseFactorCache): 指定した場合、層構成のある部位に応答係数を付ける（attach_response_factorsを参照）
+
+        Returns:
+            dict: 入力の辞書
+        """
+
+        if overrides:
+            d = convert_sheets_to_json(sheets=apply_overrides(sheets=self.sheets, overrides=overrides))
+        else:
+            d = convert_sheets_to_json(sheets=self.sheets)
+
+        if rf_cache is not None:
+            attach_response_factors(d=d, rf_cache=rf_cache)
+
+        return d
+
+
+def apply_overrides(sheets: dict, overrides: dict) -> dict:
+    """セルの値を書き換えたシートの値を返す
+
+    書き換えるセルを含む行のみ複製し、それ以外の行は元のシートと共有する。
+
+    Args:
+        sheets (dict): シート名をキーとし、行ごとのセルの値のリストのリストを値とする辞書
+        overrides (dict): (シート名, セル番地)をキーとするセルの値
+
+    Returns:
+        dict: 書き換えたシートの値
+    """
+
+    sheets = dict(sheets)
+    copied = set()
+    for ((sheet, coordinate), value) in overrides.items():
+        (column, row) = coordinate_from_string(coordinate)
+        (i, j) = (row - 1, column_index_from_string(column) - 1)
+        if sheet not in copied:
+            sheets[sheet] = list(sheets[sheet])
+            copied.add(sheet)
+        rows = sheets[sheet]
+        width = max(len(rows[0]) if rows else 0, j + 1)
+        while len(rows) <= i:
+            rows.append([None] * width)
+        if (sheet, i) not in copied:
+            rows[i] = list(rows[i])
+            copied.add((sheet, i))
+        if len(rows[i]) <= j:
+            rows[i].extend([None] * (j + 1 - len(rows[i])))
+        rows[i][j] = value
+
+    return sheets
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='Excelファイル（数式の計算結果）を入力JSONに変換する')
+    parser.add_argument('excel_file', nargs='+', help='Excelファイル')
+    parser.add_argument('--output-dir', default='.', help='出力先のフォルダ（ファイル名はExcelファイルの拡張子を.jsonに変えたもの）')
+    parser.add_argument('--workers', type=int, default=None, help='ワーカープロセス数')
+    parser.add_argument('--full-load', action='store_true', help='read_onlyモードを用いずにワークブック全体を読み込む')
+    parser.add_argument('--response-factors', action='store_true', help='層構成のある部位に応答係数（固定根と係数）を付ける')
+    parser.add_argument('--rf-cache-dir', default=None, help='応答係数をファイルに保存するフォルダ（省略時はメモリ上のみ）')
+    parser.add_argument('--benchmark', action='store_true', help='変換せずに、読み込み方法ごとの実行時間とピークメモリを表示する')
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        for r in benchmark(excel_files=args.excel_file):
+            print(
+                f"{r['excel_file']} {'streaming' if r['streaming'] else 'full-load'}:"
+                f" time={r['time']:.3f} s peak={r['peak_memory'] / 1e6:.1f} MB"
+                + (f" error={r['error']}" if 'error' in r else f" same={r['is_same']}")
+            )
+        return
+
+    rf_cache = make_response_factor_cache(cache_dir=args.rf_cache_dir) if args.response_factors else None
+    ds = convert_excel_files_to_json(
+        excel_files=args.excel_file, workers=args.workers, streaming=not args.full_load, rf_cache=rf_cache)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    names = [os.path.splitext(os.path.basename(excel_file))[0] for excel_file in args.excel_file]
+    for excel_file, name, d in zip(args.excel_file, names, ds):
+        # 別のフォルダの同名のファイル（3室、5室のモデル等）は、フォルダ名を付けて区別する
+        if names.count(name) > 1:
+            name = os.path.basename(os.path.dirname(os.path.abspath(excel_file))) + '_' + name
+        file_name = os.path.join(args.output_dir, name + '.json')
+        with open(file_name, 'w', encoding='utf-8') as f:
+            json.dump(d, f, indent=4, ensure_ascii=False)
+
+
 if __name__ == '__main__':
 
-    d = convert_excel_to_json('continuous_calc_input_excel.xlsx')
+    main()
 
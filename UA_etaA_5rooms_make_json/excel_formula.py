@@ -0,0 +1,605 @@
+import re
+
+import openpyxl
+from openpyxl.utils import column_index_from_string
+from openpyxl.worksheet.formula import ArrayFormula
+
+
+# # Evaluate EXCEL formulas without EXCEL
+# ワークブックで使用している関数（IF, IFS, OFFSET, MATCH, VLOOKUP, SUMIFS 等）のみに対応する
+
+class ExcelError(Exception):
+    """Excelのエラー値（#N/A等）"""
+
+    def __init__(self, value: str):
+        super().__init__(value)
+        self.value = value
+
+
+class Ref:
+    """セル範囲への参照（行、列は1始まり）"""
+
+    __slots__ = ('sheet', 'r1', 'c1', 'r2', 'c2')
+
+    def __init__(self, sheet: str, r1: int, c1: int, r2: int, c2: int):
+        self.sheet = sheet
+        self.r1 = r1
+        self.c1 = c1
+        self.r2 = r2
+        self.c2 = c2
+
+
+TOKEN_RE = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<str>"(?:[^"]|"")*")
+  | (?P<ref>(?:(?P<sheet>[\w.]+|'(?:[^']|'')+')!)?
+            (?P<cell1>\$?[A-Z]{1,3}\$?\d+)(?::(?P<cell2>\$?[A-Z]{1,3}\$?\d+))?(?![\w(]))
+  | (?P<num>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+  | (?P<func>[A-Za-z_][\w.]*)\(
+  | (?P<bool>TRUE|FALSE)(?![\w(])
+  | (?P<op><>|<=|>=|[-+*/^&=<>%])
+  | (?P<lparen>\()
+  | (?P<rparen>\))
+  | (?P<comma>,)
+''', re.VERBOSE)
+
+CELL_RE = re.compile(r'\$?([A-Z]{1,3})\$?(\d+)')
+
+# 二項演算子の優先順位
+BINARY_PRECEDENCE = {
+    '=': 1, '<>': 1, '<': 1, '>': 1, '<=': 1, '>=': 1,
+    '&': 2,
+    '+': 3, '-': 3,
+    '*': 4, '/': 4,
+    '^': 5
+}
+
+
+def split_cell(cell: str) -> (int, int):
+    """'$A$1'形式のセル番地を（行, 列）に変換する"""
+
+    m = CELL_RE.fullmatch(cell)
+    return int(m.group(2)), column_index_from_string(m.group(1))
+
+
+def tokenize(formula: str) -> list:
+    """数式を字句に分割する
+
+    Args:
+        formula (str): '='を除いた数式
+
+    Returns:
+        list: (種類, 値)のリスト
+    """
+
+    tokens = []
+    pos = 0
+    while pos < len(formula):
+        m = TOKEN_RE.match(formula, pos)
+        if m is None:
+            raise ValueError('Can not tokenize formula', formula, pos)
+        kind = m.lastgroup
+        if kind == 'ws':
+            pass
+        elif kind == 'str':
+            tokens.append(('str', m.group('str')[1:-1].replace('""', '"')))
+        elif kind in ('ref', 'sheet', 'cell1', 'cell2'):
+            sheet = m.group('sheet')
+            if sheet is not None and sheet.startswith("'"):
+                sheet = sheet[1:-1].replace("''", "'")
+            tokens.append(('ref', (sheet, m.group('cell1'), m.group('cell2') or m.group('cell1'))))
+        elif kind == 'func':
+            name = m.group('func').upper()
+            if name.startswith('_XLFN.'):
+                name = name[6:]
+            tokens.append(('func', name))
+        elif kind == 'bool':
+            tokens.append(('bool', m.group('bool') == 'TRUE'))
+        else:
+            tokens.append((kind, m.group(kind)))
+        pos = m.end()
+
+    return tokens
+
+
+class Parser:
+    """字句のリストを構文木（タプル）に変換する"""
+
+    def __init__(self, tokens: list, sheet: str):
+        self.tokens = tokens
+        self.pos = 0
+        self.sheet = sheet
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def next(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.parse_expression(0)
+        if self.pos != len(self.tokens):
+            raise ValueError('Unexpected token', self.peek())
+        return node
+
+    def parse_expression(self, min_precedence: int):
+        left = self.parse_unary()
+        while True:
+            kind, value = self.peek()
+            if kind != 'op' or value not in BINARY_PRECEDENCE or BINARY_PRECEDENCE[value] < min_precedence:
+                return left
+            self.next()
+            right = self.parse_expression(BINARY_PRECEDENCE[value] + 1)
+            left = ('bin', value, left, right)
+
+    def parse_unary(self):
+        kind, value = self.peek()
+        if kind == 'op' and value in ('-', '+'):
+            self.next()
+            operand = self.parse_unary()
+            return ('neg', operand) if value == '-' else operand
+        node = self.parse_primary()
+        while self.peek() == ('op', '%'):
+            self.next()
+            node = ('bin', '/', node, ('num', 100.0))
+        return node
+
+    def parse_primary(self):
+        kind, value = self.next()
+        if kind == 'num':
+            return ('num', float(value))
+        if kind == 'str':
+            return ('str', value)
+        if kind == 'bool':
+            return ('bool', value)
+        if kind == 'ref':
+            (sheet, cell1, cell2) = value
+            (r1, c1) = split_cell(cell1)
+            (r2, c2) = split_cell(cell2)
+            return ('ref', sheet or self.sheet, min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2))
+        if kind == 'lparen':
+            node = self.parse_expression(0)
+            if self.next()[0] != 'rparen':
+                raise ValueError('Missing )')
+            return node
+        if kind == 'func':
+            args = []
+            if self.peek()[0] == 'rparen':
+                self.next()
+                return ('func', value, args)
+            while True:
+                if self.peek()[0] in ('comma', 'rparen'):
+                    # 省略された引数
+                    args.append(('empty',))
+                else:
+                    args.append(self.parse_expression(0))
+                kind, _ = self.next()
+                if kind == 'rparen':
+                    return ('func', value, args)
+                if kind != 'comma':
+                    raise ValueError('Missing , or )')
+        raise ValueError('Unexpected token', kind, value)
+
+
+def parse_formula(formula: str, sheet: str):
+    """数式を構文木に変換する
+
+    Args:
+        formula (str): '='から始まる数式
+        sheet (str): 数式のあるシート名（シート名のない参照の解決に使用）
+
+    Returns:
+        tuple: 構文木
+    """
+
+    return Parser(tokens=tokenize(formula[1:]), sheet=sheet).parse()
+
+
+def to_number(v) -> float:
+    if v is None:
+        return 0.0
+    if isinstance(v, bool):
+        return 1.0 if v else 0.0
+    if isinstance(v, (int, float)):
+        return v
+    try:
+        return float(v)
+    except ValueError:
+        raise ExcelError('#VALUE!')
+
+
+def to_text(v) -> str:
+    if v is None:
+        return ''
+    if isinstance(v, bool):
+        return 'TRUE' if v else 'FALSE'
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def to_bool(v) -> bool:
+    if isinstance(v, str):
+        if v.upper() in ('TRUE', 'FALSE'):
+            return v.upper() == 'TRUE'
+        raise ExcelError('#VALUE!')
+    return bool(to_number(v))
+
+
+def is_number(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def type_order(v) -> int:
+    # Excelの比較では 数値 < 文字列 < 論理値
+    if isinstance(v, bool):
+        return 2
+    if isinstance(v, str):
+        return 1
+    return 0
+
+
+def text_key(v: str):
+    """文字列の比較キー（大文字小文字を区別しない）
+
+    日本語版Excelでは漢字が読みの順に並ぶため、読み順に並んでいるShift_JIS（cp932）の符号の順で比較する。
+    """
+
+    v = v.lower()
+    try:
+        return v.encode('cp932')
+    except UnicodeEncodeError:
+        return v.encode('utf-16-be')
+
+
+def compare(a, b) -> int:
+    """Excelの比較規則で2つの値を比較する（a<bで-1、a=bで0、a>bで1）"""
+
+    # 空白セルは比較相手の型の既定値として扱う
+    if a is None:
+        a = '' if isinstance(b, str) else (False if isinstance(b, bool) else 0.0)
+    if b is None:
+        b = '' if isinstance(a, str) else (False if isinstance(a, bool) else 0.0)
+    (ta, tb) = (type_order(a), type_order(b))
+    if ta != tb:
+        return -1 if ta < tb else 1
+    if ta == 1:
+        (a, b) = (text_key(a), text_key(b))
+    elif ta == 0 and a != b:
+        # Excelと同様に有効桁数15桁で比較する
+        if float('%.15g' % a) == float('%.15g' % b):
+            return 0
+    return (a > b) - (a < b)
+
+
+# 評価中のセルを表す（循環参照の検出用）
+_IN_PROGRESS = object()
+
+
+class FormulaWorkbook:
+    """数式を含むワークブックをExcelを使わずに評価する"""
+
+    def __init__(self, excel_file: str):
+        """
+        Args:
+            excel_file (str): Excelファイル
+        """
+
+        book = openpyxl.load_workbook(excel_file)
+
+        # シートごとのセルの値（定数）と数式（構文木）
+        self.values = {}
+        self.formulas = {}
+        for sheet in book.worksheets:
+            values = {}
+            formulas = {}
+            for row in sheet.iter_rows():
+                for cell in row:
+                    v = cell.value
+                    if isinstance(v, ArrayFormula):
+                        v = v.text
+                    if isinstance(v, str) and v.startswith('=') and len(v) > 1:
+                        formulas[(cell.row, cell.column)] = parse_formula(formula=v, sheet=sheet.title)
+                    elif v is not None:
+                        values[(cell.row, cell.column)] = v
+            self.values[sheet.title] = values
+            self.formulas[sheet.title] = formulas
+
+        self._memo = {}
+
+    def set_value(self, sheet: str, coordinate: str, value):
+        """セルに値を入力する（数式は値で置き換えられる）
+
+        Args:
+            sheet (str): シート名
+            coordinate (str): セル番地（'A3'等）
+            value: 値
+        """
+
+        if hasattr(value, 'item'):
+            # numpyのスカラー（np.float64、np.str_等）はPythonの値に変換する
+            value = value.item()
+        key = split_cell(coordinate)
+        self.formulas[sheet].pop(key, None)
+        self.values[sheet][key] = value
+        self._memo.clear()
+
+    def get_value(self, sheet: str, coordinate: str):
+        """セルの値を返す（エラーの場合は'#N/A'等の文字列）
+
+        Args:
+            sheet (str): シート名
+            coordinate (str): セル番地（'K3'等）
+        """
+
+        (row, column) = split_cell(coordinate)
+        return self.cell_value(sheet, row, column)
+
+    def cell_value(self, sheet: str, row: int, column: int):
+        """セルの値を返す（エラーの場合は'#N/A'等の文字列）"""
+
+        try:
+            return self.evaluate_cell(sheet, row, column)
+        except ExcelError as e:
+            return e.value
+
+    def sheet_values(self, sheet: str) -> dict:
+        """シートの全てのセルの値を返す
+
+        Args:
+            sheet (str): シート名
+
+        Returns:
+            dict: (行, 列)をキーとするセルの値
+        """
+
+        keys = set(self.values[sheet]) | set(self.formulas[sheet])
+        return {(row, column): self.cell_value(sheet, row, column) for (row, column) in keys}
+
+    def evaluate_cell(self, sheet: str, row: int, column: int):
+        key = (sheet, row, column)
+        if key in self._memo:
+            v = self._memo[key]
+            if v is _IN_PROGRESS:
+                raise ValueError('Circular reference', key)
+        else:
+            node = self.formulas[sheet].get((row, column))
+            if node is None:
+                return self.values[sheet].get((row, column))
+            self._memo[key] = _IN_PROGRESS
+            try:
+                v = self.scalar(self.evaluate(node, sheet))
+                if v is None:
+                    # 空白セルを参照する数式の値は0
+                    v = 0.0
+            except ExcelError as e:
+                v = e
+            self._memo[key] = v
+        if isinstance(v, ExcelError):
+            raise v
+        return v
+
+    def scalar(self, v):
+        """参照を単一のセルの値に変換する"""
+
+        if isinstance(v, Ref):
+            return self.evaluate_cell(v.sheet, v.r1, v.c1)
+        return v
+
+    def range_values(self, v) -> list:
+        """参照（または値）を2次元のリストに変換する"""
+
+        if isinstance(v, Ref):
+            return [[self.evaluate_cell(v.sheet, r, c) for c in range(v.c1, v.c2 + 1)] for r in range(v.r1, v.r2 + 1)]
+        return [[v]]
+
+    def flat_values(self, v) -> list:
+        return [x for row in self.range_values(v) for x in row]
+
+    def evaluate(self, node, sheet: str):
+        kind = node[0]
+        if kind in ('num', 'str', 'bool'):
+            return node[1]
+        if kind == 'empty':
+            return None
+        if kind == 'ref':
+            return Ref(node[1], node[2], node[3], node[4], node[5])
+        if kind == 'neg':
+            return -to_number(self.scalar(self.evaluate(node[1], sheet)))
+        if kind == 'bin':
+            return self.binary(node[1], self.scalar(self.evaluate(node[2], sheet)), self.scalar(self.evaluate(node[3], sheet)))
+        if kind == 'func':
+            function = getattr(self, 'fn_' + node[1], None)
+            if function is None:
+                raise ValueError('Unsupported function', node[1])
+            return function(node[2], sheet)
+        raise ValueError('Unknown node', node)
+
+    def binary(self, op: str, a, b):
+        if op == '&':
+            return to_text(a) + to_text(b)
+        if op in ('=', '<>', '<', '>', '<=', '>='):
+            c = compare(a, b)
+            return {'=': c == 0, '<>': c != 0, '<': c < 0, '>': c > 0, '<=': c <= 0, '>=': c >= 0}[op]
+        (a, b) = (to_number(a), to_number(b))
+        if op == '+':
+            return a + b
+        if op == '-':
+            return a - b
+        if op == '*':
+            return a * b
+        if op == '/':
+            if b == 0:
+                raise ExcelError('#DIV/0!')
+            return a / b
+        if op == '^':
+            return a ** b
+        raise ValueError('Unknown operator', op)
+
+    def args(self, args: list, sheet: str) -> list:
+        return [self.evaluate(arg, sheet) for arg in args]
+
+    # ---- 関数 ----
+
+    def fn_IF(self, args, sheet):
+        if to_bool(self.scalar(self.evaluate(args[0], sheet))):
+            return self.evaluate(args[1], sheet) if len(args) > 1 else True
+        return self.evaluate(args[2], sheet) if len(args) > 2 else False
+
+    def fn_IFS(self, args, sheet):
+        for i in range(0, len(args), 2):
+            if to_bool(self.scalar(self.evaluate(args[i], sheet))):
+                return self.evaluate(args[i + 1], sheet)
+        raise ExcelError('#N/A')
+
+    def fn_OR(self, args, sheet):
+        return any(to_bool(v) for arg in self.args(args, sheet) for v in self.flat_values(arg) if v is not None)
+
+    def fn_VALUE(self, args, sheet):
+        v = self.scalar(self.evaluate(args[0], sheet))
+        return float(to_number(v))
+
+    def fn_SUM(self, args, sheet):
+        total = 0.0
+        for arg in self.args(args, sheet):
+            if isinstance(arg, Ref):
+                total += sum(v for v in self.flat_values(arg) if is_number(v))
+            else:
+                total += to_number(arg)
+        return total
+
+    def fn_MIN(self, args, sheet):
+        values = [to_number(v) for arg in self.args(args, sheet) for v in self.flat_values(arg)
+                  if is_number(v) or not isinstance(arg, Ref)]
+        return min(values) if values else 0.0
+
+    def fn_MAX(self, args, sheet):
+        values = [to_number(v) for arg in self.args(args, sheet) for v in self.flat_values(arg)
+                  if is_number(v) or not isinstance(arg, Ref)]
+        return max(values) if values else 0.0
+
+    def fn_SUMPRODUCT(self, args, sheet):
+        arrays = [self.flat_values(arg) for arg in self.args(args, sheet)]
+        total = 0.0
+        for values in zip(*arrays):
+            if all(is_number(v) for v in values):
+                product = 1.0
+                for v in values:
+                    product *= v
+                total += product
+        return total
+
+    def fn_SUMIFS(self, args, sheet):
+        args = self.args(args, sheet)
+        sum_values = self.flat_values(args[0])
+        is_match = [True] * len(sum_values)
+        for i in range(1, len(args), 2):
+            criteria = self.scalar(args[i + 1])
+            for j, v in enumerate(self.flat_values(args[i])):
+                if is_match[j] and not match_criteria(v, criteria):
+                    is_match[j] = False
+        return sum(v for v, m in zip(sum_values, is_match) if m and is_number(v))
+
+    def fn_MATCH(self, args, sheet):
+        args = self.args(args, sheet)
+        lookup_value = self.scalar(args[0])
+        values = self.flat_values(args[1])
+        match_type = to_number(self.scalar(args[2])) if len(args) > 2 else 1
+        return float(lookup(lookup_value, values, exact=(match_type == 0)) + 1)
+
+    def fn_VLOOKUP(self, args, sheet):
+        args = self.args(args, sheet)
+        lookup_value = self.scalar(args[0])
+        table = args[1]
+        column = int(to_number(self.scalar(args[2])))
+        is_approximate = to_bool(self.scalar(args[3])) if len(args) > 3 else True
+        if not isinstance(table, Ref):
+            if column != 1:
+                raise ExcelError('#REF!')
+            return table
+        # 表全体を評価すると（同じ表の他の列を経由した）見かけ上の循環参照になるため、検索列と結果のセルのみ評価する
+        keys = self.flat_values(Ref(table.sheet, table.r1, table.c1, table.r2, table.c1))
+        i = lookup(lookup_value, keys, exact=not is_approximate)
+        if column < 1 or column > table.c2 - table.c1 + 1:
+            raise ExcelError('#REF!')
+        return self.evaluate_cell(table.sheet, table.r1 + i, table.c1 + column - 1)
+
+    def fn_OFFSET(self, args, sheet):
+        ref = self.evaluate(args[0], sheet)
+        if not isinstance(ref, Ref):
+            raise ExcelError('#VALUE!')
+        (rows, columns) = (int(to_number(self.scalar(self.evaluate(args[i], sheet)))) for i in (1, 2))
+        height = int(to_number(self.scalar(self.evaluate(args[3], sheet)))) if len(args) > 3 and args[3] != ('empty',) else ref.r2 - ref.r1 + 1
+        width = int(to_number(self.scalar(self.evaluate(args[4], sheet)))) if len(args) > 4 and args[4] != ('empty',) else ref.c2 - ref.c1 + 1
+        r1 = ref.r1 + rows
+        c1 = ref.c1 + columns
+        if r1 < 1 or c1 < 1:
+            raise ExcelError('#REF!')
+        return Ref(ref.sheet, r1, c1, r1 + height - 1, c1 + width - 1)
+
+    def fn_LEFT(self, args, sheet):
+        text = to_text(self.scalar(self.evaluate(args[0], sheet)))
+        n = int(to_number(self.scalar(self.evaluate(args[1], sheet)))) if len(args) > 1 else 1
+        return text[:n]
+
+    def fn_RIGHT(self, args, sheet):
+        text = to_text(self.scalar(self.evaluate(args[0], sheet)))
+        n = int(to_number(self.scalar(self.evaluate(args[1], sheet)))) if len(args) > 1 else 1
+        return text[len(text) - n:] if n > 0 else ''
+
+    def fn_LEN(self, args, sheet):
+        return float(len(to_text(self.scalar(self.evaluate(args[0], sheet)))))
+
+
+def match_criteria(v, criteria) -> bool:
+    """SUMIFSの条件（比較演算子付きの文字列または値）に一致するか"""
+
+    if isinstance(criteria, str):
+        m = re.match(r'(<>|<=|>=|<|>|=)?(.*)', criteria)
+        (op, operand) = (m.group(1) or '=', m.group(2))
+        try:
+            operand = float(operand)
+        except ValueError:
+            pass
+    else:
+        (op, operand) = ('=', criteria)
+    if op == '=' and operand == '':
+        return v is None or v == ''
+    if v is None:
+        return op == '<>'
+    if type_order(v) != type_order(operand):
+        return op == '<>'
+    if isinstance(operand, str) and op in ('=', '<>') and re.search(r'[*?]', operand):
+        # ワイルドカード（*、?、~によるエスケープ）
+        pattern = ''.join(
+            re.escape(t[1]) if t.startswith('~') else ('.*' if t == '*' else ('.' if t == '?' else re.escape(t)))
+            for t in re.findall(r'~.|[*?]|[^~*?]+|~', operand)
+        )
+        is_match = re.fullmatch(pattern, v, flags=re.IGNORECASE | re.DOTALL) is not None
+        return is_match if op == '=' else not is_match
+    c = compare(v, operand)
+    return {'=': c == 0, '<>': c != 0, '<': c < 0, '>': c > 0, '<=': c <= 0, '>=': c >= 0}[op]
+
+
+def lookup(lookup_value, values: list, exact: bool) -> int:
+    """MATCH、VLOOKUPの検索（0始まりの位置を返す）"""
+
+    if exact:
+        for i, v in enumerate(values):
+            if v is not None and type_order(v) == type_order(lookup_value) and compare(v, lookup_value) == 0:
+                return i
+        raise ExcelError('#N/A')
+    # 昇順に並んでいる前提で、検索値以下の最大の値の位置
+    found = None
+    for i, v in enumerate(values):
+        if v is None or type_order(v) != type_order(lookup_value):
+            continue
+        if compare(v, lookup_value) <= 0:
+            found = i
+        else:
+            break
+    if found is None:
+        raise ExcelError('#N/A')
+    return found
@@ -0,0 +1,160 @@
+import argparse
+import concurrent.futures
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+
+from response_factor import SOLVER_SETTINGS
+from rf_cache import DIGITS, ResponseFactorCache, get_thermal_layers, round_values, to_output
+
+
+# 入力JSONの全ての部位の層構成について、応答係数をまとめて計算する
+# 同じ層構成（丸めた熱抵抗、熱容量と層の名前が同じもの）は1回だけ計算し、層構成ごとの応答係数の表を作成する
+# 層構成は室外側の表面熱伝達抵抗を含む（rf_cache.get_thermal_layersを参照）
+
+
+def make_construction_key(layers: list, digits: int = DIGITS) -> str:
+    """層構成のキー（層の名前と丸めた熱抵抗、熱容量のハッシュ）を返す
+
+    Args:
+        layers (list): 'name'、'thermal_resistance'、'thermal_capacity'をキーとする層の辞書のリスト
+        digits (int): 丸める有効桁数
+
+    Returns:
+        str: キー
+    """
+
+    content = {
+        'names': [layer['name'] for layer in layers],
+        'r_layer': round_values([layer['thermal_resistance'] for layer in layers], digits),
+        'c_layer': round_values([layer['thermal_capacity'] for layer in layers], digits)
+    }
+
+    return hashlib.sha256(json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def get_input_files(paths: list) -> list:
+    """入力JSONのファイルのリストを返す（フォルダを指定した場合はフォルダ内の全てのJSONファイル）"""
+
+    input_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            input_files.extend(sorted(glob.glob(os.path.join(path, '*.json'))))
+        else:
+            input_files.append(path)
+
+    return input_files
+
+
+def collect_constructions(input_files: list) -> dict:
+    """入力JSONの部位から重複のない層構成を集める
+
+    Args:
+        input_files (list): 入力JSONのファイルのリスト
+
+    Returns:
+        dict: 層構成のキーをキーとし、'layers'（室外側の表面熱伝達抵抗を含む層の辞書のリスト）と'n_boundaries'（その層構成の部位の数）を値とする辞書
+    """
+
+    constructions = {}
+    for input_file in input_files:
+        with open(input_file, encoding='utf-8') as f:
+            d = json.load(f)
+        for boundary in d.get('boundaries', []):
+            if 'layers' not in boundary:
+                continue
+            layers = get_thermal_layers(boundary)
+            key = make_construction_key(layers)
+            if key not in constructions:
+                constructions[key] = {'layers': layers, 'n_boundaries': 0}
+            constructions[key]['n_boundaries'] += 1
+
+    return constructions
+
+
+# ワーカープロセスごとの応答係数のキャッシュ
+_cache = None
+
+
+def _init_worker(cache_dir: str, method: str):
+
+    global _cache
+    _cache = ResponseFactorCache(cache_dir=cache_dir, method=method)
+
+
+def _fit(layers: list) -> dict:
+
+    try:
+        rf = _cache.get_by_layers(layers)
+    except Exception as e:
+        # 熱容量があり熱抵抗が0の層等、応答係数を計算できない層構成、最適化に失敗した層構成（rf_cache.get_fit_failureを参照）
+        return {'error': repr(e)}
+
+    return to_output(rf)
+
+
+def calc_response_factor_table(constructions: dict, method: str = 'QP', workers: int = None, cache_dir: str = None) -> dict:
+    """層構成ごとの応答係数を複数のプロセスで計算する
+
+    Args:
+        constructions (dict): collect_constructionsで集めた層構成
+        method (str): 最適化の解法
+        workers (int): ワーカープロセス数（省略時はCPU数）
+        cache_dir (str): 応答係数のキャッシュの保存先のフォルダ（省略時は保存しない）
+
+    Returns:
+        dict: 層構成のキーをキーとし、層構成と応答係数（計算できない場合は'error'）を値とする辞書
+    """
+
+    keys = list(constructions)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_dir, method)) as executor:
+        rfs = list(executor.map(_fit, [constructions[key]['layers'] for key in keys]))
+
+    return {key: dict(constructions[key], **rf) for key, rf in zip(keys, rfs)}
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='入力JSONの部位の層構成ごとに応答係数を計算し、表を作成する')
+    parser.add_argument('input', nargs='+', help='入力JSONのファイルまたはフォルダ')
+    parser.add_argument('--output', default='response_factor_table.json', help='応答係数の表の出力先のファイル')
+    parser.add_argument('--method', default='QP', choices=list(SOLVER_SETTINGS), help='最適化の解法')
+    parser.add_argument('--workers', type=int, default=None, help='ワーカープロセス数')
+    parser.add_argument('--cache-dir', default=None, help='応答係数のキャッシュの保存先のフォルダ')
+    parser.add_argument('--no-validation', action='store_true', help='計算した応答係数の検証（validate_rf.py）を行わない')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    input_files = get_input_files(paths=args.input)
+    constructions = collect_constructions(input_files=input_files)
+    n_boundaries = sum(c['n_boundaries'] for c in constructions.values())
+    print(f'{len(input_files)} files, {n_boundaries} boundaries, {len(constructions)} constructions')
+
+    table = calc_response_factor_table(constructions=constructions, method=args.method, workers=args.workers, cache_dir=args.cache_dir)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'method': args.method, 'constructions': table}, f, indent=1, ensure_ascii=False)
+
+    n_errors = sum(1 for rf in table.values() if 'error' in rf)
+    print(f'{len(table) - n_errors} / {len(table)} constructions fitted in {time.perf_counter() - start:.1f} s')
+
+    if args.no_validation:
+        return 0 if n_errors == 0 else 1
+
+    # validate_rfはこのモジュールを読み込むため、ここで読み込む
+    from validate_rf import summarize, validate_response_factors
+    results = validate_response_factors(constructions=table, method=args.method)
+    print(summarize(results=results))
+
+    # 計算できなかった、または許容値を超えた層構成がある場合は終了コードを1とする（validate_rf.pyと同じ）
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
@@ -0,0 +1,304 @@
+import argparse
+import time
+
+import numpy as np
+import scipy.linalg
+
+from response_factor import (SOLVER_SETTINGS, calc_max_violation, calc_response_factor, calc_step_response_error,
+                             calc_transfer_function, get_t_values, make_mat_exp, make_sample_constructions)
+
+
+# 固有値分解（モード分解）による応答係数の計算
+# 層構成を熱抵抗と熱容量の節点網（RC回路網）に分割し、一般化固有値問題 K･v = λ･C･v の固有値を根、
+# 固有ベクトルから求めた留数を係数とする。最適化を用いないため、同じ層構成には常に同じ応答係数を返す。
+# 貫流応答（室内側表面を断熱とし、屋外側表面の温度を単位ステップで上げたときの室内側表面温度）と
+# 吸熱応答（屋外側表面の温度を0とし、室内側表面に単位ステップの熱流を与えたときの室内側表面温度）は同じ節点網のため、根は共通となる。
+
+# 分割した層（小層）の時定数（熱抵抗 × 熱容量）の上限[s]
+TAU_SUBLAYER = 9.0
+
+# モードを削減する際の単位応答の誤差の許容値（定常値に対する比）
+MODAL_TOL = 1.0e-3
+
+
+def make_rc_network(c_layer: np.ndarray, r_layer: np.ndarray, tau_max: float = TAU_SUBLAYER) -> (np.ndarray, np.ndarray):
+    """層構成を節点網に分割する
+
+    各層を時定数がtau_max以下となる小層に等分し、小層の熱容量は両端の節点に半分ずつ配分する。
+    熱容量が0.001未満の層（空気層等）は分割せず、熱抵抗のみとする。熱抵抗が0の層は熱容量をその位置の節点に加える。
+
+    Args:
+        c_layer (np.ndarray): 層の熱容量[J/(m2･K)]（室内側の層から順）
+        r_layer (np.ndarray): 層の熱抵抗[m2･K/W]
+        tau_max (float): 小層の時定数の上限[s]
+
+    Returns:
+        (np.ndarray, np.ndarray): 節点の熱容量[J/(m2･K)]（最初が室内側表面、最後が屋外側表面）、節点の間の熱抵抗[m2･K/W]
+    """
+
+    cap = [0.0]
+    r_sub = []
+    for (c, r) in zip(np.asarray(c_layer, dtype=float), np.asarray(r_layer, dtype=float)):
+        if abs(c) < 0.001:
+            c = 0.0
+        if r <= 0.0:
+            cap[-1] += c
+            continue
+        n = 1 if c == 0.0 else max(1, int(np.ceil(np.sqrt(r * c / tau_max))))
+        for _ in range(n):
+            cap[-1] += c / n / 2
+            cap.append(c / n / 2)
+            r_sub.append(r / n)
+
+    return np.array(cap), np.array(r_sub)
+
+
+def calc_modes(c_layer: np.ndarray, r_layer: np.ndarray, tau_max: float = TAU_SUBLAYER) -> dict:
+    """節点網の全てのモードの根と、貫流応答、吸熱応答の係数（留数）を計算する
+
+    熱容量のない節点は静的縮約（シューア補元）で消去し、熱容量のある節点の一般化固有値問題を解く。
+
+    Args:
+        c_layer (np.ndarray): 層の熱容量[J/(m2･K)]
+        r_layer (np.ndarray): 層の熱抵抗[m2･K/W]
+        tau_max (float): 小層の時定数の上限[s]
+
+    Returns:
+        dict: 'alpha'（根[1/s]、昇順）、't0'、'a0'（貫流、吸熱応答の定常値）、'coef_t'、'coef_a'（係数）
+    """
+
+    (cap, r_sub) = make_rc_network(c_layer=c_layer, r_layer=r_layer, tau_max=tau_max)
+
+    # 屋外側表面の節点（温度を与える節点）を除く節点の熱コンダクタンス行列
+    n = len(r_sub)
+    g = 1.0 / r_sub
+    mat_k = np.zeros((n, n))
+    idx = np.arange(n)
+    mat_k[idx, idx] += g
+    mat_k[idx[1:], idx[1:]] += g[:-1]
+    mat_k[idx[1:], idx[:-1]] = -g[:-1]
+    mat_k[idx[:-1], idx[1:]] = -g[:-1]
+    cap = cap[:n]
+
+    # 定常状態の節点温度（貫流：屋外側表面が1、吸熱：室内側表面に熱流1）
+    theta_t = np.ones(n)
+    e0 = np.zeros(n)
+    e0[0] = 1.0
+    theta_a = np.linalg.solve(mat_k, e0)
+    (t0, a0) = (1.0, float(theta_a[0]))
+
+    is_p = cap > 0.0
+    if not np.any(is_p):
+        return {'alpha': np.zeros(0), 't0': t0, 'a0': a0, 'coef_t': np.zeros(0), 'coef_a': np.zeros(0)}
+
+    # 熱容量のない節点の静的縮約（熱容量のある節点の温度から熱容量のない節点の温度を求める行列をmat_zpとする）
+    (p, z) = (np.flatnonzero(is_p), np.flatnonzero(~is_p))
+    mat_kpp = mat_k[np.ix_(p, p)]
+    if len(z) > 0:
+        mat_zp = -np.linalg.solve(mat_k[np.ix_(z, z)], mat_k[np.ix_(z, p)])
+        mat_kpp = mat_kpp + mat_k[np.ix_(p, z)] @ mat_zp
+    else:
+        mat_zp = np.zeros((0, len(p)))
+
+    # 室内側表面の温度を熱容量のある節点の温度から求めるベクトル
+    if is_p[0]:
+        vec_h = (p == 0).astype(float)
+    else:
+        vec_h = mat_zp[np.flatnonzero(z == 0)[0]]
+
+    # 一般化固有値問題（固有ベクトルはV^T･C･V = Iに正規化される）
+    (lam, mat_v) = scipy.linalg.eigh((mat_kpp + mat_kpp.T) / 2, np.diag(cap[p]))
+
+    # 初期状態（全ての節点が0）と定常状態の差を固有ベクトルで展開する
+    hv = vec_h @ mat_v
+    coef_t = hv * (mat_v.T @ (cap[p] * -theta_t[p]))
+    coef_a = hv * (mat_v.T @ (cap[p] * -theta_a[p]))
+
+    return {'alpha': lam, 't0': t0, 'a0': a0, 'coef_t': coef_t, 'coef_a': coef_a}
+
+
+def lump_modes(alpha: np.ndarray, coef: np.ndarray, is_kept: np.ndarray) -> np.ndarray:
+    """削除するモードの係数を、根が最も近い（対数）残すモードに加える（係数の和と定常値を保つ）
+
+    Args:
+        alpha (np.ndarray): 根[1/s]
+        coef (np.ndarray): 係数
+        is_kept (np.ndarray): 残すモードの場合True
+
+    Returns:
+        np.ndarray: 残すモードの係数
+    """
+
+    kept = np.flatnonzero(is_kept)
+    nearest = kept[np.argmin(np.abs(np.log(alpha)[:, np.newaxis] - np.log(alpha[kept])[np.newaxis, :]), axis=1)]
+
+    coef_kept = np.zeros(len(alpha))
+    np.add.at(coef_kept, nearest, coef)
+
+    return coef_kept[kept]
+
+
+def reduce_modes(modes: dict, tol: float = MODAL_TOL, t_values: np.ndarray = None) -> dict:
+    """単位応答の誤差がtol以下となる最小の数のモードに削減する
+
+    係数の絶対値（貫流応答、吸熱応答の定常値に対する比の大きい方）の大きい順にモードを残し、削除するモードの係数は
+    根の最も近い残すモードに加える。
+
+    Args:
+        modes (dict): calc_modesの結果
+        tol (float): 単位応答の誤差の許容値（定常値に対する比）
+        t_values (np.ndarray): 誤差を確認する時刻（900秒単位、省略時はget_t_values）
+
+    Returns:
+        dict: 'alpha'、't0'、'a0'、'coef_t'、'coef_a'と、削減前のモードの数'n_modes'、
+            削減による単位応答の誤差'error_t'、'error_a'
+    """
+
+    alpha = modes['alpha']
+    n_modes = len(alpha)
+    rf = dict(modes, n_modes=n_modes, error_t=0.0, error_a=0.0)
+    if n_modes == 0:
+        return rf
+
+    t_values = get_t_values() if t_values is None else t_values
+    mat_exp = make_mat_exp(alpha_m_temp=alpha, t_values=t_values)
+    phi_t = mat_exp @ modes['coef_t']
+    phi_a = mat_exp @ modes['coef_a']
+
+    weight = np.maximum(np.abs(modes['coef_t']) / modes['t0'], np.abs(modes['coef_a']) / modes['a0'])
+    order = np.argsort(-weight, kind='stable')
+
+    for n_kept in range(1, n_modes + 1):
+        is_kept = np.zeros(n_modes, dtype=bool)
+        is_kept[order[:n_kept]] = True
+        coef_t = lump_modes(alpha=alpha, coef=modes['coef_t'], is_kept=is_kept)
+        coef_a = lump_modes(alpha=alpha, coef=modes['coef_a'], is_kept=is_kept)
+        error_t = float(np.max(np.abs(mat_exp[:, is_kept] @ coef_t - phi_t))) / modes['t0']
+        error_a = float(np.max(np.abs(mat_exp[:, is_kept] @ coef_a - phi_a))) / modes['a0']
+        if error_t <= tol and error_a <= tol:
+            break
+
+    return dict(rf, alpha=alpha[is_kept], coef_t=coef_t, coef_a=coef_a, error_t=error_t, error_a=error_a)
+
+
+def calc_response_factor_modal(c_layer: np.ndarray, r_layer: np.ndarray, tol: float = MODAL_TOL, tau_max: float = TAU_SUBLAYER) -> dict:
+    """固有値分解により応答係数を計算する
+
+    Args:
+        c_layer (np.ndarray): 層の熱容量[J/(m2･K)]
+        r_layer (np.ndarray): 層の熱抵抗[m2･K/W]
+        tol (float): モードを削減する際の単位応答の誤差の許容値（定常値に対する比、0の場合は削減しない）
+        tau_max (float): 小層の時定数の上限[s]
+
+    Returns:
+        dict: reduce_modesの結果（calc_response_factorの結果と同じ'alpha'、't0'、'a0'、'coef_t'、'coef_a'を含む）
+    """
+
+    modes = calc_modes(c_layer=c_layer, r_layer=r_layer, tau_max=tau_max)
+
+    if tol <= 0.0:
+        return dict(modes, n_modes=len(modes['alpha']), error_t=0.0, error_a=0.0)
+
+    return reduce_modes(modes=modes, tol=tol)
+
+
+def calc_transfer_function_error(rf: dict, c_layer: np.ndarray, r_layer: np.ndarray, laps: np.ndarray) -> (float, float):
+    """応答係数の伝達関数と、層構成から直接計算した伝達関数の差の最大値（定常値に対する比）
+
+    Args:
+        rf (dict): 応答係数（'alpha'、't0'、'a0'、'coef_t'、'coef_a'）
+        c_layer (np.ndarray): 層の熱容量[J/(m2･K)]
+        r_layer (np.ndarray): 層の熱抵抗[m2･K/W]
+        laps (np.ndarray): ラプラス変数[1/s]
+
+    Returns:
+        (float, float): 貫流、吸熱伝達関数の差の最大値
+    """
+
+    (ga, gt) = calc_transfer_function(c_layer=c_layer, r_layer=r_layer, laps=laps)
+    mat_f = laps[:, np.newaxis] / (laps[:, np.newaxis] + rf['alpha'][np.newaxis, :])
+
+    error_t = np.max(np.abs(rf['t0'] + mat_f @ rf['coef_t'] - gt)) / rf['t0']
+    error_a = np.max(np.abs(rf['a0'] + mat_f @ rf['coef_a'] - ga)) / rf['a0']
+
+    return float(error_t), float(error_a)
+
+
+def cross_check(constructions: dict, method: str = 'COBYLA', tol: float = MODAL_TOL) -> list:
+    """固有値分解による応答係数と、最適化による応答係数を比較する
+
+    伝達関数の誤差は、10年～900秒の対数等間隔のラプラス変数で確認する。
+
+    Args:
+        constructions (dict): 名前をキーとし、層の熱容量と熱抵抗のtupleを値とする辞書
+        method (str): 比較する最適化の解法
+        tol (float): モードを削減する際の単位応答の誤差の許容値
+
+    Returns:
+        list: 層構成ごとの結果の辞書のリスト（計算時間、根の数、伝達関数の誤差、単位応答の差、制約を満たさない量）
+    """
+
+    laps = np.logspace(np.log10(1.0 / (86400.0 * 365.0 * 10.0)), np.log10(1.0 / 900.0), 200)
+    t_values = get_t_values()
+
+    results = []
+    for name, (c_layer, r_layer) in constructions.items():
+        start = time.perf_counter()
+        rf_modal = calc_response_factor_modal(c_layer=c_layer, r_layer=r_layer, tol=tol)
+        time_modal = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rf_fit = calc_response_factor(c_layer=c_layer, r_layer=r_layer, method=method)
+        time_fit = time.perf_counter() - start
+
+        (tf_error_t_modal, tf_error_a_modal) = calc_transfer_function_error(rf_modal, c_layer, r_layer, laps)
+        (tf_error_t_fit, tf_error_a_fit) = calc_transfer_function_error(rf_fit, c_layer, r_layer, laps)
+        (diff_t, diff_a) = calc_step_response_error(rf_modal, rf_fit, t_values)
+
+        results.append({
+            'name': name,
+            'time_modal': time_modal,
+            'time_fit': time_fit,
+            'n_modes': rf_modal['n_modes'],
+            'n_root_modal': len(rf_modal['alpha']),
+            'n_root_fit': len(rf_fit['alpha']),
+            'tf_error_t_modal': tf_error_t_modal,
+            'tf_error_a_modal': tf_error_a_modal,
+            'tf_error_t_fit': tf_error_t_fit,
+            'tf_error_a_fit': tf_error_a_fit,
+            'diff_t': diff_t,
+            'diff_a': diff_a,
+            'violation_modal': calc_max_violation(rf_modal),
+            'violation_fit': calc_max_violation(rf_fit)
+        })
+
+    return results
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='固有値分解による応答係数を、最適化による応答係数と比較する')
+    parser.add_argument('--method', default='COBYLA', choices=list(SOLVER_SETTINGS), help='比較する最適化の解法')
+    parser.add_argument('--tol', type=float, default=MODAL_TOL, help='モードを削減する際の単位応答の誤差の許容値')
+    parser.add_argument('--name', nargs='+', default=None, help='計算する層構成の名前（省略時は全ての計算例）')
+    args = parser.parse_args(argv)
+
+    constructions = make_sample_constructions()
+    if args.name is not None:
+        constructions = {name: constructions[name] for name in args.name}
+
+    for r in cross_check(constructions=constructions, method=args.method, tol=args.tol):
+        print(
+            f"{r['name']}: time modal={r['time_modal'] * 1000:.1f} ms {args.method}={r['time_fit']:.3f} s"
+            f" roots modal={r['n_root_modal']}/{r['n_modes']} {args.method}={r['n_root_fit']}"
+            f" tf_error_t modal={r['tf_error_t_modal']:.1e} {args.method}={r['tf_error_t_fit']:.1e}"
+            f" tf_error_a modal={r['tf_error_a_modal']:.1e} {args.method}={r['tf_error_a_fit']:.1e}"
+            f" diff_t={r['diff_t']:.1e} diff_a={r['diff_a']:.1e}"
+            f" violation modal={r['violation_modal']:.1e} {args.method}={r['violation_fit']:.1e}",
+            flush=True
+        )
+
+
+if __name__ == '__main__':
+
+    main()
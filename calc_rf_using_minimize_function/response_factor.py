@@ -0,0 +1,926 @@
+import argparse
+import functools
+import time
+
+import numpy as np
+from scipy.optimize import LinearConstraint, OptimizeResult, minimize, nnls
+
+
+# 応答係数の計算（minimize_test_COBYLA_def.ipynbの関数をモジュール化したもの）
+# 伝達関数はラプラス変数のベクトルと層構成に対してまとめて計算する
+
+
+def calc_mat_fi(c_layer: np.ndarray, r_layer: np.ndarray, laps: np.ndarray) -> np.ndarray:
+    """層ごと、ラプラス変数ごとの四端子基本行列を計算する
+
+    Args:
+        c_layer (np.ndarray): 層の熱容量[J/(m2･K)]
+        r_layer (np.ndarray): 層の熱抵抗[m2･K/W]
+        laps (np.ndarray): ラプラス変数[1/s]
+
+    Returns:
+        np.ndarray: 四端子基本行列（層の数 × ラプラス変数の数 × 2 × 2）
+    """
+
+    c = np.asarray(c_layer, dtype=float)[:, np.newaxis]
+    r = np.asarray(r_layer, dtype=float)[:, np.newaxis]
+    s = np.asarray(laps, dtype=float)[np.newaxis, :]
+
+    # 定常部位（空気層等）の場合
+    is_steady = np.abs(c) < 0.001
+
+    # 非定常部位の場合（定常部位の値は使用しないため、0除算の警告を抑制する）
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        temp = np.sqrt(r * c * s)
+        cosh = np.cosh(temp)
+        sinh = np.sinh(temp)
+        f01 = r / temp * sinh
+        f10 = temp / r * sinh
+
+    mat_fi = np.empty((c.shape[0], s.shape[1], 2, 2), dtype=float)
+    mat_fi[..., 0, 0] = np.where(is_steady, 1.0, cosh)
+    mat_fi[..., 0, 1] = np.where(is_steady, r, f01)
+    mat_fi[..., 1, 0] = np.where(is_steady, 0.0, f10)
+    mat_fi[..., 1, 1] = np.where(is_steady, 1.0, cosh)
+
+    return mat_fi
+
+
+def calc_transfer_function(c_layer: np.ndarray, r_layer: np.ndarray, laps) -> (np.ndarray, np.ndarray):
+    """伝達関数を計算する
+
+    Args:
+        c_layer (np.ndarray): 層の熱容量[J/(m2･K)]
+        r_layer (np.ndarray): 層の熱抵抗[m2･K/W]
+        laps (array_like): ラプラス変数[1/s]（スカラーまたは配列）
+
+    Returns:
+        (np.ndarray, np.ndarray): 吸熱伝達関数[m2･K/W]、貫流伝達関数[-]（lapsと同じ形状）
+    """
+
+    laps = np.asarray(laps, dtype=float)
+
+    mat_fi = calc_mat_fi(c_layer=c_layer, r_layer=r_layer, laps=laps.ravel())
+
+    # 四端子行列（室内側の層から順に掛ける）
+    mat_ft = mat_fi[0]
+    for mat_fi_k in mat_fi[1:]:
+        mat_ft = np.matmul(mat_ft, mat_fi_k)
+
+    # 吸熱、貫流の各伝達関数ベクトルの作成
+    ga = mat_ft[:, 0, 1] / mat_ft[:, 1, 1]
+    gt = 1.0 / mat_ft[:, 1, 1]
+
+    return ga.reshape(laps.shape), gt.reshape(laps.shape)
+
+
+def choice_alpha(t0: float, GT: np.ndarray, alpha_m_temp: np.ndarray) -> np.ndarray:
+    """応答係数の計算に使用する固定根を選定する
+
+    Args:
+        t0 (float): 貫流応答の定常値
+        GT (np.ndarray): 固定根をラプラス変数とした貫流伝達関数
+        alpha_m_temp (np.ndarray): 固定根の候補[1/s]
+
+    Returns:
+        np.ndarray: 採用する固定根[1/s]
+    """
+
+    nroot = len(alpha_m_temp)
+
+    # 配列0に定常の伝達関数、配列の最後にs=∞の伝達関数を入力
+    GT2 = np.concatenate(([1.0], GT, [0.0]))
+
+    # 伝達関数が3%以上変化したかどうか（基準の位置i × 比較する位置j、j > iのみ）
+    is_changed = np.abs(GT2[np.newaxis, :nroot + 1] - GT2[:, np.newaxis]) > (t0 - GT[len(GT) - 1]) * 0.03
+    is_changed = np.triu(is_changed, k=1)
+
+    # 基準の位置ごとに、最初に3%以上変化する位置
+    has_next = is_changed.any(axis=1)
+    next_j = is_changed.argmax(axis=1)
+
+    # 変化した根を採用し、その根を次の基準とする（変化する根がなければ基準を1つ進める）
+    is_adopts = np.zeros(nroot, dtype=bool)
+    i = 0
+    while i <= nroot + 1:
+        if has_next[i]:
+            is_adopts[next_j[i] - 1] = True
+            i = next_j[i]
+        else:
+            i += 1
+
+    # 不採用の固定根を削除
+    return alpha_m_temp[is_adopts]
+
+
+def get_laps(alp: np.ndarray) -> np.ndarray:
+    """ラプラス変数を設定する
+
+    Args:
+        alp (np.ndarray): 固定根[1/s]
+
+    Returns:
+        np.ndarray: ラプラス変数の配列（固定根の2倍の個数）
+    """
+
+    alp = np.asarray(alp, dtype=float)
+
+    laps = np.empty(len(alp) * 2, dtype=float)
+    # 偶数番目はαをそのまま入力
+    laps[1::2] = alp
+    # 最初はα1/√(α2/α1）とする
+    laps[0] = alp[0] / np.sqrt(alp[1] / alp[0])
+    # それ以外は等比数列で補間
+    laps[2::2] = alp[1:] / np.sqrt(alp[1:] / alp[:-1])
+
+    return laps
+
+
+def make_mat_exp(alpha_m_temp: np.ndarray, t_values: np.ndarray) -> np.ndarray:
+    """制約を課す時刻ごとの指数項の行列を作成する
+
+    Args:
+        alpha_m_temp (np.ndarray): 固定根[1/s]
+        t_values (np.ndarray): 制約を課す時刻（900秒単位）
+
+    Returns:
+        np.ndarray: exp(-α･t･900)の行列（時刻の数 × 固定根の数）
+    """
+
+    return np.exp(-np.asarray(alpha_m_temp, dtype=float)[np.newaxis, :] * np.asarray(t_values, dtype=float)[:, np.newaxis] * 900)
+
+
+def phi(x: np.ndarray, mat_exp: np.ndarray, y0: float) -> np.ndarray:
+    """単位応答（貫流応答はy0=t0、吸熱応答はy0=a0）
+
+    Args:
+        x (np.ndarray): 応答係数
+        mat_exp (np.ndarray): make_mat_expで作成した指数項の行列
+        y0 (float): 単位応答の定常値
+
+    Returns:
+        np.ndarray: 時刻ごとの単位応答
+    """
+
+    return y0 + mat_exp @ x
+
+
+def diff_phi(x: np.ndarray, mat_exp: np.ndarray, alpha_m_temp: np.ndarray) -> np.ndarray:
+    """単位応答のtに対する微分（の900倍）
+
+    Args:
+        x (np.ndarray): 応答係数
+        mat_exp (np.ndarray): make_mat_expで作成した指数項の行列
+        alpha_m_temp (np.ndarray): 固定根[1/s]
+
+    Returns:
+        np.ndarray: 時刻ごとの微分
+    """
+
+    return mat_exp @ (-alpha_m_temp * x)
+
+
+def sum_constraint(x: np.ndarray, y0: float) -> float:
+    """x1 + x2 + x3 + x4 ・・・ + Y =0 制約（Yの5%まで許容する）"""
+
+    return y0 * 0.05 - abs(np.sum(x) + y0)
+
+
+def make_constraint_matrix(mat_exp: np.ndarray, alpha_m_temp: np.ndarray, y0: float) -> (np.ndarray, np.ndarray):
+    """単位応答の制約を行列形式（A･x >= b）で作成する
+
+    make_constraintsと同じ制約（係数の和の制約は上下の2つの1次式）を、行ごとに1つの不等式として並べる。
+
+    Args:
+        mat_exp (np.ndarray): make_mat_expで作成した指数項の行列
+        alpha_m_temp (np.ndarray): 固定根[1/s]
+        y0 (float): 単位応答の定常値
+
+    Returns:
+        (np.ndarray, np.ndarray): 係数行列A、右辺b
+    """
+
+    n = len(alpha_m_temp)
+    m = mat_exp.shape[0]
+
+    mat_a = np.vstack([
+        np.full((1, n), -1.0),  # y0 * 0.05 - (Σx + y0) >= 0
+        np.full((1, n), 1.0),  # y0 * 0.05 + (Σx + y0) >= 0
+        mat_exp,  # g(x, s) >= 0
+        -mat_exp,  # g(x, s) <= y0
+        mat_exp * -alpha_m_temp[np.newaxis, :]  # dg(x, s) >= 0
+    ])
+    vec_b = np.concatenate([[y0 - y0 * 0.05], [-y0 - y0 * 0.05], np.full(m, -y0), np.zeros(m), np.zeros(m)])
+
+    return mat_a, vec_b
+
+
+def make_constraints(mat_exp: np.ndarray, alpha_m_temp: np.ndarray, y0: float, method: str) -> list:
+    """単位応答の制約を作成する
+
+    単位応答が0以上y0以下であること、単調増加であること、係数の和が-y0に近いことを制約とする。
+    制約はいずれも係数の1次式のため、ヤコビアンは定数の行列とする。
+    勾配を用いる解法では、係数の和の制約（絶対値）を上下の2つの1次式に分ける。
+    trust-constrでは1つの線形制約（LinearConstraint）にまとめる。
+
+    Args:
+        mat_exp (np.ndarray): make_mat_expで作成した指数項の行列
+        alpha_m_temp (np.ndarray): 固定根[1/s]
+        y0 (float): 単位応答の定常値
+        method (str): 最適化の解法
+
+    Returns:
+        list: minimizeに与える制約のリスト
+    """
+
+    n = len(alpha_m_temp)
+    mat_diff = mat_exp * -alpha_m_temp[np.newaxis, :]
+
+    if method == 'trust-constr':
+        m = mat_exp.shape[0]
+        return [
+            LinearConstraint(
+                A=np.vstack([mat_exp, mat_diff, np.ones((1, n))]),
+                lb=np.concatenate([np.full(m, -y0), np.zeros(m), [-y0 * 1.05]]),
+                ub=np.concatenate([np.zeros(m), np.full(m, np.inf), [-y0 * 0.95]])
+            )
+        ]
+
+    if method == 'COBYLA':
+        cons_sum = [
+            {
+                'type': 'ineq',
+                'fun': lambda x: sum_constraint(x=x, y0=y0)
+            }
+        ]
+    else:
+        cons_sum = [
+            {
+                'type': 'ineq',
+                'fun': lambda x: y0 * 0.05 - (np.sum(x) + y0),
+                'jac': lambda x: np.full(n, -1.0)
+            },
+            {
+                'type': 'ineq',
+                'fun': lambda x: y0 * 0.05 + (np.sum(x) + y0),
+                'jac': lambda x: np.full(n, 1.0)
+            }
+        ]
+
+    return cons_sum + [
+        {
+            'type': 'ineq',
+            'fun': lambda x: phi(x, mat_exp, y0) - 0,  # g(x, s) >= 0
+            'jac': lambda x: mat_exp
+        },
+        {
+            'type': 'ineq',
+            'fun': lambda x: y0 - phi(x, mat_exp, y0),  # g(x, s) <= y0
+            'jac': lambda x: -mat_exp
+        },
+        {
+            'type': 'ineq',
+            'fun': lambda x: mat_diff @ x,  # dg(x, s) >= 0
+            'jac': lambda x: mat_diff
+        }
+    ]
+
+
+def make_mat_f(laps: np.ndarray, alpha_m_temp: np.ndarray) -> np.ndarray:
+    """伝達関数の係数を求めるための左辺行列を作成する
+
+    Args:
+        laps (np.ndarray): ラプラス変数[1/s]
+        alpha_m_temp (np.ndarray): 固定根[1/s]
+
+    Returns:
+        np.ndarray: 左辺行列（ラプラス変数の数 × 固定根の数）
+    """
+
+    laps = np.asarray(laps, dtype=float)[:, np.newaxis]
+
+    return laps / (laps + np.asarray(alpha_m_temp, dtype=float)[np.newaxis, :])
+
+
+def make_mat_gt_ga(c_layer: np.ndarray, r_layer: np.ndarray, laps: np.ndarray, t0: float, a0: float) -> (np.ndarray, np.ndarray):
+    """定数行列を作成する
+
+    Args:
+        c_layer (np.ndarray): 層の熱容量[J/(m2･K)]
+        r_layer (np.ndarray): 層の熱抵抗[m2･K/W]
+        laps (np.ndarray): ラプラス変数[1/s]
+        t0 (float): 貫流応答の定常値
+        a0 (float): 吸熱応答の定常値
+
+    Returns:
+        (np.ndarray, np.ndarray): 貫流、吸熱の定数行列
+    """
+
+    (ga, gt) = calc_transfer_function(c_layer=c_layer, r_layer=r_layer, laps=laps)
+
+    return gt - t0, ga - a0
+
+
+def calc_error(x: np.ndarray, mat_g: np.ndarray, mat_f: np.ndarray) -> float:
+    """伝達関数の誤差の二乗和"""
+
+    return np.sum((mat_g - mat_f @ x) ** 2)
+
+
+def calc_error_jac(x: np.ndarray, mat_g: np.ndarray, mat_f: np.ndarray) -> np.ndarray:
+    """伝達関数の誤差の二乗和の勾配"""
+
+    return -2.0 * (mat_f.T @ (mat_g - mat_f @ x))
+
+
+def calc_error_hess(x: np.ndarray, mat_g: np.ndarray, mat_f: np.ndarray) -> np.ndarray:
+    """伝達関数の誤差の二乗和のヘッセ行列（定数）"""
+
+    return 2.0 * (mat_f.T @ mat_f)
+
+
+# 解法ごとの許容誤差（貫流応答、吸熱応答）と設定
+# QPは不等式制約付き最小二乗問題として直接解く（既定の解法、許容誤差はない）
+# COBYLAはminimize_test_COBYLA_def.ipynbと同じ設定とする
+# SLSQP、trust-constrは目的関数と制約の勾配（ヤコビアン）を与える
+# constraint_tolは制約を満たさないとみなす量（定常値に対する比、省略時はADAPTIVE_TOL）で、解法の許容誤差に合わせる
+# （COBYLAは制約の許容値catolの既定値）
+SOLVER_SETTINGS = {
+    'QP': {},
+    'COBYLA': {'tol_t': 1.0e-8, 'tol_a': 1.0e-5, 'options': {'maxiter': 10000}, 'constraint_tol': 2.0e-4},
+    'SLSQP': {'tol_t': 1.0e-12, 'tol_a': 1.0e-12, 'options': {'maxiter': 1000}, 'constraint_tol': 1.0e-12},
+    'trust-constr': {'tol_t': 1.0e-10, 'tol_a': 1.0e-10, 'options': {'maxiter': 10000}, 'constraint_tol': 1.0e-10}
+}
+
+
+def get_alpha_m() -> np.ndarray:
+    """固定根の候補（1年～900秒の対数等間隔の10個）[1/s]"""
+
+    return np.logspace(np.log10(1.0 / (86400.0 * 365.0)), np.log10(1.0 / 900.0), 10)
+
+
+def get_t_values() -> np.ndarray:
+    """単位応答の上下限、単調増加を担保するtの範囲を離散的な点に分割する（900秒単位）"""
+
+    return np.linspace(0, 2000, num=2000)
+
+
+# 制約を課す時刻を適応的に追加する場合の設定
+# 最初は対数等間隔に間引いた時刻のみに制約を課し、全ての時刻で制約を満たすまで、制約を満たさない時刻を追加して解き直す
+# 間引いた時刻の制約は全ての時刻の制約を緩和したものであるため、全ての時刻で制約を満たす解は全ての時刻に制約を課した場合の解と同じになる
+ADAPTIVE_N_INITIAL = 16  # 最初に制約を課す時刻の数
+ADAPTIVE_TOL = 1.0e-12  # 制約を満たさないとみなす量（定常値に対する比、丸め誤差を含まない大きさとする）
+ADAPTIVE_MAX_ROUNDS = 50  # 解き直す回数の上限
+ADAPTIVE_STATUS_VIOLATED = -1  # 解き直しを終えた時点で全ての時刻の制約を満たさない場合の状態
+
+
+def get_initial_t_index(n_t: int, n_initial: int = ADAPTIVE_N_INITIAL) -> np.ndarray:
+    """最初に制約を課す時刻のインデックス（最初と最後の時刻を含み、対数等間隔に間引く）
+
+    Args:
+        n_t (int): 全ての時刻の数
+        n_initial (int): 間引いた時刻の数
+
+    Returns:
+        np.ndarray: 時刻のインデックス
+    """
+
+    return np.unique(np.concatenate([[0], np.round(np.geomspace(1, n_t - 1, n_initial - 1)).astype(int)]))
+
+
+def calc_violation_by_time(x: np.ndarray, mat_exp: np.ndarray, alpha_m_temp: np.ndarray, y0: float) -> np.ndarray:
+    """時刻ごとの単位応答の制約（上下限、単調増加）を満たさない量の最大値
+
+    Args:
+        x (np.ndarray): 係数
+        mat_exp (np.ndarray): make_mat_expで作成した指数項の行列
+        alpha_m_temp (np.ndarray): 固定根[1/s]
+        y0 (float): 単位応答の定常値
+
+    Returns:
+        np.ndarray: 時刻ごとのb - A･xの最大値（時刻の数）
+    """
+
+    (mat_a, vec_b) = make_constraint_matrix(mat_exp=mat_exp, alpha_m_temp=alpha_m_temp, y0=y0)
+
+    # 係数の和の制約（先頭の2行）を除き、（制約の種類 × 時刻）に並べ替える
+    return np.max((vec_b[2:] - mat_a[2:] @ x).reshape(3, mat_exp.shape[0]), axis=0)
+
+
+def solve_lsi(mat_f: np.ndarray, mat_g: np.ndarray, mat_a: np.ndarray, vec_b: np.ndarray) -> np.ndarray:
+    """不等式制約付き最小二乗問題（min |F･x - g|^2、A･x >= b）を解く
+
+    Lawson, Hanson "Solving Least Squares Problems" 23章の方法で、Fの特異値分解により
+    最小距離問題（min |z|、A'･z >= b'）に変換し、非負最小二乗法（NNLS）で解く。
+    反復の初期値や許容誤差によらず、同じ問題には同じ解を返す。
+
+    Args:
+        mat_f (np.ndarray): 左辺行列F（列数は係数の数以上、列はフルランク）
+        mat_g (np.ndarray): 定数行列g
+        mat_a (np.ndarray): 制約の係数行列A
+        vec_b (np.ndarray): 制約の右辺b
+
+    Returns:
+        np.ndarray: 係数x（制約を満たす解がない場合はNone）
+    """
+
+    # F = U･diag(s)･V^T、z = diag(s)･V^T･x - U^T･g とおくと、|F･x - g|^2 = |z|^2 + 定数
+    (u, sv, vt) = np.linalg.svd(mat_f, full_matrices=False)
+    mat_w = vt.T / sv[np.newaxis, :]  # x = W･(z + U^T･g)
+    vec_c = u.T @ mat_g
+
+    mat_a2 = mat_a @ mat_w
+    vec_b2 = vec_b - mat_a2 @ vec_c
+
+    # 各行の大きさを揃える（係数が0の行は定数の不等式のため除く）
+    norm = np.linalg.norm(mat_a2, axis=1)
+    is_used = norm > 0.0
+    mat_a2 = mat_a2[is_used] / norm[is_used, np.newaxis]
+    vec_b2 = vec_b2[is_used] / norm[is_used]
+
+    # 最小距離問題をNNLSで解く
+    n = mat_a2.shape[1]
+    mat_e = np.vstack([mat_a2.T, vec_b2[np.newaxis, :]])
+    vec_f = np.zeros(n + 1)
+    vec_f[n] = 1.0
+    (y, _) = nnls(mat_e, vec_f, maxiter=50 * mat_e.shape[1])
+    r = mat_e @ y - vec_f
+    # 残差が0（1 - b'･y = -r[n]が0）の場合は制約を満たす解がない
+    fac = -r[n]
+    if 1.0 + fac <= 1.0:
+        return None
+    z = r[:n] / fac
+
+    return mat_w @ (z + vec_c)
+
+
+def fit_coefficients_qp(mat_f: np.ndarray, mat_g: np.ndarray, mat_exp: np.ndarray, alpha_m_temp: np.ndarray, y0: float) -> OptimizeResult:
+    """伝達関数の誤差が最小となる応答係数を、不等式制約付き最小二乗問題として求める
+
+    Args:
+        mat_f (np.ndarray): make_mat_fで作成した左辺行列
+        mat_g (np.ndarray): make_mat_gt_gaで作成した定数行列
+        mat_exp (np.ndarray): make_mat_expで作成した指数項の行列
+        alpha_m_temp (np.ndarray): 固定根[1/s]
+        y0 (float): 単位応答の定常値
+
+    Returns:
+        OptimizeResult: 最適化の結果（minimizeの結果と同じ属性を持つ）
+    """
+
+    (mat_a, vec_b) = make_constraint_matrix(mat_exp=mat_exp, alpha_m_temp=alpha_m_temp, y0=y0)
+
+    x = solve_lsi(mat_f=mat_f, mat_g=mat_g, mat_a=mat_a, vec_b=vec_b)
+
+    if x is None:
+        return OptimizeResult(
+            x=np.full(len(alpha_m_temp), np.nan), fun=np.nan, success=False, status=2,
+            message='Inequality constraints incompatible', nfev=1, nit=1, ncev=1
+        )
+
+    return OptimizeResult(
+        x=x, fun=calc_error(x, mat_g, mat_f), success=True, status=0,
+        message='Optimization terminated successfully', nfev=1, nit=1, ncev=1
+    )
+
+
+def fit_coefficients(mat_f: np.ndarray, mat_g: np.ndarray, mat_exp: np.ndarray, alpha_m_temp: np.ndarray, y0: float,
+                     method: str, tol: float, options: dict, disp: bool = False, x0: np.ndarray = None):
+    """伝達関数の誤差が最小となる応答係数を求める
+
+    Args:
+        mat_f (np.ndarray): make_mat_fで作成した左辺行列
+        mat_g (np.ndarray): make_mat_gt_gaで作成した定数行列
+        mat_exp (np.ndarray): make_mat_expで作成した指数項の行列
+        alpha_m_temp (np.ndarray): 固定根[1/s]
+        y0 (float): 単位応答の定常値
+        method (str): 最適化の解法（SOLVER_SETTINGSのキー）
+        tol (float): 許容誤差（QPでは使用しない）
+        options (dict): minimizeのオプション（QPでは使用しない）
+        disp (bool): 最適化の経過を表示する場合True
+        x0 (np.ndarray): 係数の初期値（省略時は係数の和が-y0となる均等な値、QPでは使用しない）
+
+    Returns:
+        OptimizeResult: 最適化の結果（ncevは制約の評価回数）
+    """
+
+    if method == 'QP':
+        return fit_coefficients_qp(mat_f=mat_f, mat_g=mat_g, mat_exp=mat_exp, alpha_m_temp=alpha_m_temp, y0=y0)
+
+    # 初期値
+    if x0 is None:
+        x0 = np.full(len(alpha_m_temp), -y0 / len(alpha_m_temp), float)
+
+    constraints = make_constraints(mat_exp=mat_exp, alpha_m_temp=alpha_m_temp, y0=y0, method=method)
+
+    # 制約関数の呼び出し回数を数える（全ての制約関数の呼び出し回数の合計）
+    counts = {'ncev': 0}
+    for con in constraints:
+        if isinstance(con, dict):
+            con['fun'] = count_calls(fun=con['fun'], counts=counts)
+
+    result = minimize(
+        calc_error, x0, args=(mat_g, mat_f), method=method,
+        jac=None if method == 'COBYLA' else calc_error_jac,
+        hess=calc_error_hess if method == 'trust-constr' else None,
+        constraints=constraints,
+        tol=tol, options=dict(options, disp=disp)
+    )
+
+    # trust-constrの線形制約は関数を呼び出さないため、解法が数えた評価回数とする
+    result['ncev'] = int(np.sum(result.get('constr_nfev', 0))) if method == 'trust-constr' else counts['ncev']
+
+    return result
+
+
+def count_calls(fun, counts: dict, key: str = 'ncev'):
+    """関数の呼び出し回数をcounts[key]に加算する関数を返す"""
+
+    def wrapper(*args, **kwargs):
+        counts[key] += 1
+        return fun(*args, **kwargs)
+
+    return wrapper
+
+
+def fit_coefficients_adaptive(mat_f: np.ndarray, mat_g: np.ndarray, mat_exp: np.ndarray, alpha_m_temp: np.ndarray, y0: float,
+                              method: str, tol: float, options: dict, disp: bool = False, x0: np.ndarray = None,
+                              t_index: np.ndarray = None, n_initial: int = ADAPTIVE_N_INITIAL, max_rounds: int = ADAPTIVE_MAX_ROUNDS,
+                              constraint_tol: float = ADAPTIVE_TOL):
+    """制約を課す時刻を適応的に追加して、伝達関数の誤差が最小となる応答係数を求める
+
+    間引いた時刻に制約を課して解き、全ての時刻で制約を確認する。制約を満たさない時刻のうち、
+    制約を満たさない量が前後の時刻以上となる時刻（極大値）を追加し、前回の解を初期値として解き直す。
+
+    Args:
+        mat_f (np.ndarray): make_mat_fで作成した左辺行列
+        mat_g (np.ndarray): make_mat_gt_gaで作成した定数行列
+        mat_exp (np.ndarray): make_mat_expで作成した全ての時刻の指数項の行列
+        alpha_m_temp (np.ndarray): 固定根[1/s]
+        y0 (float): 単位応答の定常値
+        method (str): 最適化の解法（SOLVER_SETTINGSのキー）
+        tol (float): 許容誤差（QPでは使用しない）
+        options (dict): minimizeのオプション（QPでは使用しない）
+        disp (bool): 最適化の経過を表示する場合True
+        x0 (np.ndarray): 係数の初期値（QPでは使用しない）
+        t_index (np.ndarray): 最初に制約を課す時刻のインデックス（省略時はget_initial_t_indexで間引いた時刻）
+        n_initial (int): 最初に制約を課す時刻の数（t_indexを省略した場合）
+        max_rounds (int): 解き直す回数の上限
+        constraint_tol (float): 制約を満たさないとみなす量（定常値に対する比）
+
+    Returns:
+        OptimizeResult: 最適化の結果（nfev、nit、ncevは全ての回の合計（ncevには全ての時刻での制約の確認を含む）、n_roundsは解いた回数、
+            t_indexは最後に制約を課した時刻のインデックス、n_t_activeはその数、max_violationは全ての時刻の制約を満たさない量の最大値）
+            解き直す回数の上限に達した場合や、制約を課した時刻で許容誤差の範囲で制約を満たさない場合等、
+            全ての時刻で制約を満たさない量がconstraint_tol･y0を超えたまま終えた場合は、successをFalse、statusをADAPTIVE_STATUS_VIOLATEDとする。
+    """
+
+    if t_index is None:
+        t_index = get_initial_t_index(n_t=mat_exp.shape[0], n_initial=n_initial)
+
+    (nfev, nit, ncev) = (0, 0, 0)
+    violation = np.full(mat_exp.shape[0], np.inf)
+    for n_rounds in range(1, max_rounds + 1):
+        result = fit_coefficients(
+            mat_f=mat_f, mat_g=mat_g, mat_exp=mat_exp[t_index], alpha_m_temp=alpha_m_temp, y0=y0,
+            method=method, tol=tol, options=options, disp=disp, x0=x0
+        )
+        nfev += result.get('nfev', 0)
+        nit += result.get('nit', 0)
+        ncev += result.get('ncev', 0)
+        if not np.all(np.isfinite(result.x)):
+            violation = np.full(mat_exp.shape[0], np.inf)
+            break
+
+        # 全ての時刻で制約を確認し、制約を満たさない量の極大値の時刻を追加する
+        violation = calc_violation_by_time(x=result.x, mat_exp=mat_exp, alpha_m_temp=alpha_m_temp, y0=y0)
+        ncev += 1
+        padded = np.concatenate([[-np.inf], violation, [-np.inf]])
+        is_peak = (violation >= padded[:-2]) & (violation >= padded[2:])
+        new_index = np.setdiff1d(np.flatnonzero(is_peak & (violation > constraint_tol * y0)), t_index)
+        if len(new_index) == 0:
+            break
+        t_index = np.union1d(t_index, new_index)
+        x0 = result.x
+
+    result['nfev'] = nfev
+    result['nit'] = nit
+    result['ncev'] = ncev
+    result['n_rounds'] = n_rounds
+    result['t_index'] = t_index
+    result['n_t_active'] = len(t_index)
+    result['max_violation'] = float(np.max(violation))
+
+    # 最後の解が全ての時刻で制約を満たすことを確認する（解自体が得られなかった場合は最適化の結果のままとする）
+    if result.success and result['max_violation'] > constraint_tol * y0:
+        result['success'] = False
+        result['status'] = ADAPTIVE_STATUS_VIOLATED
+        result['message'] = (
+            f"Constraints violated on the full time grid after {n_rounds} rounds"
+            f" (max violation {result['max_violation']:.2e})"
+        )
+
+    return result
+
+
+def select_alpha(c_layer: np.ndarray, r_layer: np.ndarray) -> np.ndarray:
+    """層構成の応答係数の計算に使用する固定根を選定する
+
+    Args:
+        c_layer (np.ndarray): 層の熱容量[J/(m2･K)]
+        r_layer (np.ndarray): 層の熱抵抗[m2･K/W]
+
+    Returns:
+        np.ndarray: 採用する固定根[1/s]
+    """
+
+    alpha_m = get_alpha_m()
+
+    # 固定根をラプラスパラメータとして伝達関数を計算
+    (_, GT) = calc_transfer_function(c_layer=c_layer, r_layer=r_layer, laps=alpha_m)
+
+    return choice_alpha(t0=1.0, GT=GT, alpha_m_temp=alpha_m)
+
+
+def make_root_matrices(alpha_m_temp: np.ndarray) -> dict:
+    """固定根のみで決まる行列（層構成によらないため、固定根が同じ層構成で共有できる）
+
+    Args:
+        alpha_m_temp (np.ndarray): 固定根[1/s]
+
+    Returns:
+        dict: 'alpha'（固定根）、'laps'（ラプラス変数）、'mat_f'（左辺行列）、'mat_exp'（全ての時刻の指数項の行列）
+    """
+
+    alpha_m_temp = np.asarray(alpha_m_temp, dtype=float)
+
+    # ラプラス変数の設定
+    laps = get_laps(alpha_m_temp)
+
+    return {
+        'alpha': alpha_m_temp,
+        'laps': laps,
+        'mat_f': make_mat_f(laps=laps, alpha_m_temp=alpha_m_temp),
+        # 単位応答の上下限、単調増加を担保するtの範囲を離散的な点に分割
+        'mat_exp': make_mat_exp(alpha_m_temp=alpha_m_temp, t_values=get_t_values())
+    }
+
+
+def calc_response_factor(c_layer: np.ndarray, r_layer: np.ndarray, method: str = 'QP', disp: bool = False, plot: bool = False,
+                         alpha_m_temp: np.ndarray = None, adaptive: bool = True, matrices: dict = None, warm_start: dict = None) -> dict:
+    """応答係数を計算する
+
+    Args:
+        c_layer (np.ndarray): 層の熱容量[J/(m2･K)]
+        r_layer (np.ndarray): 層の熱抵抗[m2･K/W]
+        method (str): 最適化の解法（'QP'、'COBYLA'、'SLSQP'、'trust-constr'）
+        disp (bool): 最適化の経過と結果を表示する場合True
+        plot (bool): 単位応答のグラフを描画する場合True
+        alpha_m_temp (np.ndarray): 使用する固定根[1/s]（省略時はselect_alphaで選定する）
+        adaptive (bool): 制約を課す時刻を適応的に追加する場合True（Falseの場合は全ての時刻に制約を課す）
+        matrices (dict): make_root_matricesで作成した行列（固定根が同じ場合のみ使用する）
+        warm_start (dict): 初期値とする類似の層構成の応答係数（calc_response_factorの結果）
+            固定根が同じ場合は係数を反復の初期値とし、制約を適応的に追加する場合は最後に制約を課した時刻から始める
+
+    Returns:
+        dict: 'alpha'（採用した固定根[1/s]）、't0'、'a0'（貫流、吸熱応答の定常値）、
+            'coef_t'、'coef_a'（貫流、吸熱応答の係数）、'result_t'、'result_a'（最適化の結果）
+    """
+
+    if method not in SOLVER_SETTINGS:
+        raise ValueError('Unknown method', method)
+    settings = SOLVER_SETTINGS[method]
+
+    c_layer = np.asarray(c_layer, dtype=float)
+    r_layer = np.asarray(r_layer, dtype=float)
+
+    t0 = 1.0
+    a0 = np.sum(r_layer)
+
+    # 応答係数計算に使用する固定根を選択
+    if alpha_m_temp is None:
+        alpha_m_temp = select_alpha(c_layer=c_layer, r_layer=r_layer)
+    else:
+        alpha_m_temp = np.asarray(alpha_m_temp, dtype=float)
+
+    if matrices is None or not np.array_equal(matrices['alpha'], alpha_m_temp):
+        matrices = make_root_matrices(alpha_m_temp=alpha_m_temp)
+    (laps, mat_f, mat_exp) = (matrices['laps'], matrices['mat_f'], matrices['mat_exp'])
+    t_values = get_t_values()
+
+    (mat_gt, mat_ga) = make_mat_gt_ga(c_layer=c_layer, r_layer=r_layer, laps=laps, t0=t0, a0=a0)
+
+    # 類似の層構成の結果による初期値（吸熱応答の係数は定常値の比で換算する）
+    (warm_t, warm_a) = ({}, {})
+    if warm_start is not None:
+        if np.array_equal(warm_start['alpha'], alpha_m_temp) and np.all(np.isfinite(warm_start['coef_t'])):
+            warm_t['x0'] = np.array(warm_start['coef_t'], dtype=float)
+        if np.array_equal(warm_start['alpha'], alpha_m_temp) and np.all(np.isfinite(warm_start['coef_a'])):
+            warm_a['x0'] = np.array(warm_start['coef_a'], dtype=float) * a0 / warm_start['a0']
+        if adaptive and 't_index' in warm_start['result_t']:
+            warm_t['t_index'] = warm_start['result_t']['t_index']
+        if adaptive and 't_index' in warm_start['result_a']:
+            warm_a['t_index'] = warm_start['result_a']['t_index']
+
+    # 最適化の実行
+    if adaptive:
+        fit = functools.partial(fit_coefficients_adaptive, constraint_tol=settings.get('constraint_tol', ADAPTIVE_TOL))
+    else:
+        fit = fit_coefficients
+    result_t = fit(
+        mat_f=mat_f, mat_g=mat_gt, mat_exp=mat_exp, alpha_m_temp=alpha_m_temp, y0=t0,
+        method=method, tol=settings.get('tol_t'), options=settings.get('options', {}), disp=disp, **warm_t
+    )
+    result_a = fit(
+        mat_f=mat_f, mat_g=mat_ga, mat_exp=mat_exp, alpha_m_temp=alpha_m_temp, y0=a0,
+        method=method, tol=settings.get('tol_a'), options=settings.get('options', {}), disp=disp, **warm_a
+    )
+
+    if disp:
+        print(result_t)
+        print(result_a)
+
+    if plot:
+        plot_unit_response(t_values=t_values, phi=phi(x=result_t.x, mat_exp=mat_exp, y0=t0), name='phi_t')
+        plot_unit_response(t_values=t_values, phi=phi(x=result_a.x, mat_exp=mat_exp, y0=a0), name='phi_a')
+
+    return {
+        'alpha': alpha_m_temp,
+        't0': t0,
+        'a0': a0,
+        'coef_t': result_t.x,
+        'coef_a': result_a.x,
+        'result_t': result_t,
+        'result_a': result_a
+    }
+
+
+def calc_max_violation(rf: dict, t_values: np.ndarray = None) -> float:
+    """応答係数が制約を満たさない量の最大値（制約を満たす場合は0）
+
+    Args:
+        rf (dict): calc_response_factorの結果
+        t_values (np.ndarray): 制約を確認する時刻（900秒単位、省略時はget_t_values）
+
+    Returns:
+        float: 貫流応答、吸熱応答の制約（A･x >= b）のb - A･xの最大値
+    """
+
+    mat_exp = make_mat_exp(alpha_m_temp=rf['alpha'], t_values=get_t_values() if t_values is None else t_values)
+
+    violation = 0.0
+    for (x, y0) in ((rf['coef_t'], rf['t0']), (rf['coef_a'], rf['a0'])):
+        (mat_a, vec_b) = make_constraint_matrix(mat_exp=mat_exp, alpha_m_temp=rf['alpha'], y0=y0)
+        violation = max(violation, float(np.max(vec_b - mat_a @ x)))
+
+    return violation
+
+
+def calc_step_response_error(rf1: dict, rf2: dict, t_values: np.ndarray) -> (float, float):
+    """2つの応答係数の単位応答の差の最大値（定常値に対する比）を返す
+
+    Args:
+        rf1 (dict): 応答係数（'alpha'、't0'、'a0'、'coef_t'、'coef_a'）
+        rf2 (dict): 応答係数
+        t_values (np.ndarray): 単位応答を比較する時刻（900秒単位）
+
+    Returns:
+        (float, float): 貫流応答、吸熱応答の差の最大値
+    """
+
+    mat_exp1 = make_mat_exp(alpha_m_temp=rf1['alpha'], t_values=t_values)
+    mat_exp2 = make_mat_exp(alpha_m_temp=rf2['alpha'], t_values=t_values)
+
+    error_t = np.max(np.abs(rf1['t0'] + mat_exp1 @ rf1['coef_t'] - rf2['t0'] - mat_exp2 @ rf2['coef_t'])) / rf1['t0']
+    error_a = np.max(np.abs(rf1['a0'] + mat_exp1 @ rf1['coef_a'] - rf2['a0'] - mat_exp2 @ rf2['coef_a'])) / rf1['a0']
+
+    return float(error_t), float(error_a)
+
+
+def plot_unit_response(t_values: np.ndarray, phi: np.ndarray, name: str):
+    """単位応答のグラフを描画する"""
+
+    import pandas as pd
+
+    df = pd.DataFrame(columns=['x', name])
+    df['x'] = t_values
+    df[name] = phi
+    df.plot.scatter(x='x', y=name, s=5, grid=True)
+
+
+def make_sample_constructions() -> dict:
+    """minimize_test_COBYLA_def.ipynbの計算例の層構成を返す
+
+    Returns:
+        dict: 名前をキーとし、層の熱容量[J/(m2･K)]と熱抵抗[m2･K/W]のtupleを値とする辞書
+    """
+
+    constructions = {
+        '外壁': (
+            np.array([7.885, 7.10769601547645, 0.0]) * 1000.0,
+            np.array([0.0431818181818182, 17.7692400386911, 0.09])
+        )
+    }
+
+    for l in range(5):
+        # 内断熱
+        constructions['内断熱 ウレタン' + str(l * 20)] = (
+            np.array([l * 20 / 1000 * 61, 100 / 1000 * 2000, 0.0]) * 1000,
+            np.array([l * 20 / 1000 / 0.034, 100 / 1000 / 1.6, 0.04])
+        )
+    for l in range(5):
+        # 外断熱
+        constructions['外断熱 ウレタン' + str(l * 20)] = (
+            np.array([100 / 1000 * 2000, l * 20 / 1000 * 61, 0.0]) * 1000,
+            np.array([100 / 1000 / 1.6, l * 20 / 1000 / 0.034, 0.04])
+        )
+
+    return constructions
+
+
+def benchmark(constructions: dict, methods: list, reference: str = 'COBYLA', adaptive: bool = True) -> list:
+    """解法ごとの応答係数の計算時間と、基準の解法との係数の差を計測する
+
+    基準の解法がある場合は、伝達関数の誤差が基準の解法以下で、制約を満たさない量が基準の解法を超えない（1e-9まで許容する）とき、
+    基準の解法と一致したとみなす（'is_match'）。
+
+    Args:
+        constructions (dict): 名前をキーとし、層の熱容量と熱抵抗のtupleを値とする辞書
+        methods (list): 解法のリスト
+        reference (str): 係数の差の基準とする解法（methodsに含まれる場合）
+        adaptive (bool): 制約を課す時刻を適応的に追加する場合True
+
+    Returns:
+        list: 層構成と解法ごとの結果の辞書のリスト（基準の解法がある場合は係数の差の最大値を'max_diff_t'、'max_diff_a'に、一致したかどうかを'is_match'に格納する）
+    """
+
+    results = []
+    for name, (c_layer, r_layer) in constructions.items():
+        rfs = {}
+        for method in methods:
+            start = time.perf_counter()
+            rfs[method] = calc_response_factor(c_layer=c_layer, r_layer=r_layer, method=method, adaptive=adaptive)
+            elapsed = time.perf_counter() - start
+            result = {
+                'name': name,
+                'method': method,
+                'time': elapsed,
+                'n_root': len(rfs[method]['alpha']),
+                'nfev': rfs[method]['result_t'].nfev + rfs[method]['result_a'].nfev,
+                'error_t': rfs[method]['result_t'].fun,
+                'error_a': rfs[method]['result_a'].fun,
+                'max_violation': calc_max_violation(rfs[method])
+            }
+            results.append(result)
+
+        if reference in rfs:
+            ref = [result for result in results[-len(methods):] if result['method'] == reference][0]
+            for result in results[-len(methods):]:
+                if len(rfs[result['method']]['alpha']) == len(rfs[reference]['alpha']):
+                    result['max_diff_t'] = np.max(np.abs(rfs[result['method']]['coef_t'] - rfs[reference]['coef_t']))
+                    result['max_diff_a'] = np.max(np.abs(rfs[result['method']]['coef_a'] - rfs[reference]['coef_a']))
+                result['is_match'] = bool(
+                    result['error_t'] <= ref['error_t'] * (1.0 + 1.0e-6)
+                    and result['error_a'] <= ref['error_a'] * (1.0 + 1.0e-6)
+                    and result['max_violation'] <= max(ref['max_violation'], 0.0) + 1.0e-9
+                )
+
+    return results
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='計算例の層構成の応答係数を計算する')
+    parser.add_argument('--method', default='QP', choices=list(SOLVER_SETTINGS), help='最適化の解法')
+    parser.add_argument('--benchmark', nargs='+', default=None, choices=list(SOLVER_SETTINGS), metavar='METHOD',
+                        help='指定した解法ごとの計算時間と、基準の解法との係数の差の最大値を表示する')
+    parser.add_argument('--reference', default='COBYLA', choices=list(SOLVER_SETTINGS), help='比較の基準とする解法')
+    parser.add_argument('--name', nargs='+', default=None, help='計算する層構成の名前（省略時は全ての計算例）')
+    parser.add_argument('--fixed-grid', action='store_true', help='制約を適応的に追加せず、全ての時刻に制約を課す')
+    args = parser.parse_args(argv)
+
+    constructions = make_sample_constructions()
+    if args.name is not None:
+        constructions = {name: constructions[name] for name in args.name}
+
+    if args.benchmark is not None:
+        for r in benchmark(constructions=constructions, methods=args.benchmark, reference=args.reference, adaptive=not args.fixed_grid):
+            print(
+                f"{r['name']} {r['method']}: time={r['time']:.3f} s roots={r['n_root']} nfev={r['nfev']}"
+                f" error_t={r['error_t']:.3e} error_a={r['error_a']:.3e} violation={r['max_violation']:.1e}"
+                + (f" max_diff_t={r['max_diff_t']:.3e} max_diff_a={r['max_diff_a']:.3e}" if 'max_diff_t' in r else '')
+                + (f" match={r['is_match']}" if 'is_match' in r else '')
+            )
+        return
+
+    for name, (c_layer, r_layer) in constructions.items():
+        rf = calc_response_factor(c_layer=c_layer, r_layer=r_layer, method=args.method, adaptive=not args.fixed_grid)
+        print(name)
+        print('  alpha =', rf['alpha'])
+        print('  coef_t =', rf['coef_t'])
+        print('  coef_a =', rf['coef_a'])
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,296 @@
+import collections
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from response_factor import SOLVER_SETTINGS, calc_response_factor, get_alpha_m, get_t_values
+
+
+# 応答係数のキャッシュ
+# 層構成（熱抵抗、熱容量を丸めた値）と解法の設定のハッシュをキーとし、メモリ上（LRU）とフォルダ内のファイルの2段で保持する
+# 丸めた値で計算するため、キャッシュの有無や計算の順序によらず同じキーには同じ応答係数を返す
+
+# 保存形式のバージョン
+VERSION = 2
+
+# 応答係数の計算に用いるソースファイル（内容のハッシュを解法の設定のハッシュに含め、計算方法を変えた場合はキーを変える）
+SOURCE_FILES = ('response_factor.py', 'rf_cache.py')
+
+# 丸める有効桁数
+DIGITS = 10
+
+# 室外側（内壁は隣室側）の表面熱伝達抵抗を表す層の名前
+OUTSIDE_FILM_NAME = '室外側表面熱伝達抵抗'
+
+
+def round_values(values, digits: int = DIGITS) -> list:
+    """値を有効桁数で丸める"""
+
+    return [float(f'{v:.{digits}g}') for v in np.asarray(values, dtype=float).tolist()]
+
+
+def get_source_hashes() -> dict:
+    """応答係数の計算に用いるソースファイルのハッシュを返す"""
+
+    hashes = {}
+    for file_name in SOURCE_FILES:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name), 'rb') as f:
+            hashes[file_name] = hashlib.sha256(f.read()).hexdigest()
+
+    return hashes
+
+
+def get_solver_hash(method: str) -> str:
+    """解法の設定（解法、許容誤差、固定根の候補、制約を課す時刻）とソースファイルのハッシュを返す"""
+
+    content = {
+        'version': VERSION,
+        'sources': get_source_hashes(),
+        'method': method,
+        'settings': SOLVER_SETTINGS[method],
+        'alpha_m': get_alpha_m().tolist(),
+        't_values': get_t_values().tolist()
+    }
+
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def make_key(c_layer, r_layer, solver_hash: str, digits: int = DIGITS) -> (str, dict):
+    """キャッシュのキーを作成する
+
+    Args:
+        c_layer (array_like): 層の熱容量[J/(m2･K)]
+        r_layer (array_like): 層の熱抵抗[m2･K/W]
+        solver_hash (str): get_solver_hashで作成した解法の設定のハッシュ
+        digits (int): 丸める有効桁数
+
+    Returns:
+        (str, dict): キー（ハッシュ）、キーの元とした値（丸めた層構成と解法の設定のハッシュ）
+    """
+
+    content = {
+        'c_layer': round_values(c_layer, digits),
+        'r_layer': round_values(r_layer, digits),
+        'solver': solver_hash
+    }
+
+    key = hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+    return key, content
+
+
+def get_thermal_layers(boundary: dict) -> list:
+    """部位の応答係数を計算する層構成を返す
+
+    室外側の表面熱伝達抵抗（'outside_heat_transfer_resistance'）のある部位は、熱容量0の層として室外側（末尾）に加える。
+
+    Args:
+        boundary (dict): 'layers'（室内側から順の層の辞書のリスト）、'outside_heat_transfer_resistance'（省略可）をキーとする部位の辞書
+
+    Returns:
+        list: 'name'、'thermal_resistance'[m2･K/W]、'thermal_capacity'[kJ/(m2･K)]をキーとする層の辞書のリスト
+    """
+
+    layers = list(boundary['layers'])
+    if boundary.get('outside_heat_transfer_resistance') is not None:
+        layers.append({
+            'name': OUTSIDE_FILM_NAME,
+            'thermal_resistance': boundary['outside_heat_transfer_resistance'],
+            'thermal_capacity': 0.0
+        })
+
+    return layers
+
+
+def get_fit_failure(rf: dict) -> str:
+    """応答係数の計算に失敗した理由を返す
+
+    Args:
+        rf (dict): calc_response_factorの結果、または保存した応答係数
+
+    Returns:
+        str: 最適化が成功しなかった場合、係数が有限の値でない場合はその理由（失敗していない場合はNone）
+    """
+
+    for (k, name) in (('result_t', 'coef_t'), ('result_a', 'coef_a')):
+        if k in rf and not rf[k].success:
+            return f'{k}: {rf[k].message}'
+        if not np.all(np.isfinite(rf[name])):
+            return f'{name}: not finite'
+    if not (np.isfinite(rf['t0']) and np.isfinite(rf['a0'])):
+        return 't0, a0: not finite'
+
+    return None
+
+
+def to_arrays(d: dict) -> dict:
+    """保存した応答係数を変更できない配列に変換する（キャッシュ内の値を共有するため）"""
+
+    rf = {'alpha': d['alpha'], 't0': d['t0'], 'a0': d['a0'], 'coef_t': d['coef_t'], 'coef_a': d['coef_a']}
+    for k in ('alpha', 'coef_t', 'coef_a'):
+        rf[k] = np.array(rf[k], dtype=float)
+        rf[k].flags.writeable = False
+
+    return rf
+
+
+def to_output(rf: dict) -> dict:
+    """応答係数を入力JSONに出力する形式（配列はリスト）に変換する"""
+
+    return {
+        'alpha': np.asarray(rf['alpha']).tolist(),
+        't0': float(rf['t0']),
+        'a0': float(rf['a0']),
+        'coef_t': np.asarray(rf['coef_t']).tolist(),
+        'coef_a': np.asarray(rf['coef_a']).tolist()
+    }
+
+
+class ResponseFactorCache:
+    """応答係数のキャッシュ
+
+    get(c_layer, r_layer)は、メモリ上、フォルダ内の順に探し、ない場合のみ応答係数を計算する。
+    返す値は'alpha'（採用した固定根[1/s]）、't0'、'a0'、'coef_t'、'coef_a'の辞書（キャッシュ内で共有するため変更しない）とする。
+    計算に失敗した層構成（get_fit_failureを参照）は保存せずにValueErrorを送出し、メモリ上に失敗の理由のみ保持する。
+    """
+
+    def __init__(self, cache_dir: str = None, max_size: int = 1024, method: str = 'QP', digits: int = DIGITS):
+        """
+        Args:
+            cache_dir (str): 保存先のフォルダ（省略時はメモリ上のみ）
+            max_size (int): メモリ上に保持する層構成の数
+            method (str): 最適化の解法
+            digits (int): 丸める有効桁数
+        """
+
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.method = method
+        self.digits = digits
+        self.solver_hash = get_solver_hash(method)
+        self.entries = collections.OrderedDict()
+        self.outputs = {}
+        self.failures = {}
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'fits': 0, 'failures': 0}
+
+    def file_name(self, key: str) -> str:
+        """キーの保存先のファイル"""
+
+        return os.path.join(self.cache_dir, key[:2], key + '.json')
+
+    def get(self, c_layer, r_layer) -> dict:
+        """層構成の応答係数を返す
+
+        Args:
+            c_layer (array_like): 層の熱容量[J/(m2･K)]
+            r_layer (array_like): 層の熱抵抗[m2･K/W]
+
+        Returns:
+            dict: 応答係数
+
+        Raises:
+            ValueError: 応答係数の計算に失敗した場合
+        """
+
+        (key, content) = make_key(c_layer=c_layer, r_layer=r_layer, solver_hash=self.solver_hash, digits=self.digits)
+
+        # 計算に失敗した層構成
+        if key in self.failures:
+            raise ValueError('Response factor fit failed', self.failures[key])
+
+        # メモリ上
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return self.entries[key]
+
+        # フォルダ内
+        rf = None
+        if self.cache_dir is not None and os.path.exists(self.file_name(key)):
+            with open(self.file_name(key), encoding='utf-8') as f:
+                rf = to_arrays(json.load(f))
+            # 有限の値でない係数は使わずに計算し直す
+            if get_fit_failure(rf) is None:
+                self.stats['disk_hits'] += 1
+            else:
+                rf = None
+
+        # 丸めた層構成で計算する
+        if rf is None:
+            self.stats['fits'] += 1
+            try:
+                result = calc_response_factor(c_layer=np.array(content['c_layer']), r_layer=np.array(content['r_layer']), method=self.method)
+                failure = get_fit_failure(result)
+            except Exception as e:
+                # 熱容量があり熱抵抗が0の層等、固定根を選定できない層構成
+                failure = repr(e)
+            if failure is not None:
+                self.failures[key] = failure
+                self.stats['failures'] += 1
+                raise ValueError('Response factor fit failed', failure)
+            d = {
+                'alpha': result['alpha'].tolist(),
+                't0': float(result['t0']),
+                'a0': float(result['a0']),
+                'coef_t': result['coef_t'].tolist(),
+                'coef_a': result['coef_a'].tolist()
+            }
+            if self.cache_dir is not None:
+                self.save(key=key, d=dict(content, method=self.method, **d))
+            rf = to_arrays(d)
+
+        self.entries[key] = rf
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+        return rf
+
+    def get_by_layers(self, layers: list) -> dict:
+        """入力の層構成（辞書型のリスト）の応答係数を返す
+
+        Args:
+            layers (list): 'thermal_resistance'[m2･K/W]、'thermal_capacity'[kJ/(m2･K)]をキーとする層の辞書のリスト
+
+        Returns:
+            dict: 応答係数
+        """
+
+        return self.get(
+            c_layer=[layer['thermal_capacity'] * 1000.0 for layer in layers],
+            r_layer=[layer['thermal_resistance'] for layer in layers]
+        )
+
+    def get_output_by_boundary(self, boundary: dict) -> (str, dict):
+        """部位の応答係数を、入力JSONに出力する形式で返す
+
+        層構成は室外側の表面熱伝達抵抗を含む（get_thermal_layersを参照）。
+        同じ層構成（丸めた値が同じもの）には同じキーと辞書を返すため、入力JSONでは応答係数の表にキーごとに1回だけ出力し、部位はキーで参照する（辞書は変更しない）。
+
+        Args:
+            boundary (dict): 'layers'と'outside_heat_transfer_resistance'（省略可）をキーとする部位の辞書
+
+        Returns:
+            (str, dict): キー、'alpha'、't0'、'a0'、'coef_t'、'coef_a'をキーとする応答係数
+        """
+
+        layers = get_thermal_layers(boundary)
+        c_layer = [layer['thermal_capacity'] * 1000.0 for layer in layers]
+        r_layer = [layer['thermal_resistance'] for layer in layers]
+        (key, _) = make_key(c_layer=c_layer, r_layer=r_layer, solver_hash=self.solver_hash, digits=self.digits)
+        if key not in self.outputs:
+            self.outputs[key] = to_output(self.get(c_layer=c_layer, r_layer=r_layer))
+
+        return key, self.outputs[key]
+
+    def save(self, key: str, d: dict):
+        """応答係数をフォルダに保存する"""
+
+        file_name = self.file_name(key)
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        # 書き込み途中のファイルを読まないように、一時ファイルに書いてから置き換える
+        tmp_file = file_name + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(d, f, ensure_ascii=False)
+        os.replace(tmp_file, file_name)
@@ -0,0 +1,175 @@
+import argparse
+import time
+
+import numpy as np
+
+from response_factor import SOLVER_SETTINGS, calc_response_factor, make_root_matrices, select_alpha
+
+
+# 類似の層構成（断熱材の厚さのみが異なる層構成等）の応答係数をまとめて計算する
+# 熱抵抗と熱容量の合計が近い順に計算し、計算済みの最も近い層構成の結果を初期値とする（継続法）
+# 固定根が同じ層構成では、固定根のみで決まる行列（make_root_matrices）を共有する
+
+
+def calc_features(c_layer: np.ndarray, r_layer: np.ndarray) -> np.ndarray:
+    """層構成の類似度の尺度（熱抵抗の合計と熱容量の合計の対数）
+
+    Args:
+        c_layer (np.ndarray): 層の熱容量[J/(m2･K)]
+        r_layer (np.ndarray): 層の熱抵抗[m2･K/W]
+
+    Returns:
+        np.ndarray: log10(熱抵抗の合計)、log10(1 + 熱容量の合計[kJ/(m2･K)])
+    """
+
+    return np.array([np.log10(np.sum(r_layer)), np.log10(1.0 + np.sum(c_layer) / 1000.0)])
+
+
+def make_order(features: np.ndarray) -> (list, list):
+    """計算する順序と、初期値とする計算済みの層構成を決める
+
+    熱抵抗の合計が最も小さい層構成から始め、計算済みのいずれかの層構成に最も近い層構成を順に選ぶ。
+
+    Args:
+        features (np.ndarray): 層構成ごとのcalc_featuresの値（層構成の数 × 2）
+
+    Returns:
+        (list, list): 計算する層構成のインデックスの順序、それぞれの初期値とする層構成のインデックス（最初はNone）
+    """
+
+    n = len(features)
+    if n == 0:
+        return [], []
+
+    first = int(np.argmin(features[:, 0]))
+    order = [first]
+    parents = [None]
+
+    # 未計算の層構成ごとの、計算済みの層構成との距離の最小値とその層構成
+    dist = np.linalg.norm(features - features[first], axis=1)
+    nearest = np.full(n, first)
+    is_done = np.zeros(n, dtype=bool)
+    is_done[first] = True
+
+    for _ in range(n - 1):
+        i = int(np.argmin(np.where(is_done, np.inf, dist)))
+        order.append(i)
+        parents.append(int(nearest[i]))
+        is_done[i] = True
+        d = np.linalg.norm(features - features[i], axis=1)
+        nearest = np.where(d < dist, i, nearest)
+        dist = np.minimum(d, dist)
+
+    return order, parents
+
+
+def fit_family(constructions: dict, method: str = 'QP', adaptive: bool = True, warm: bool = True) -> (dict, dict):
+    """類似の層構成の応答係数をまとめて計算する
+
+    Args:
+        constructions (dict): 名前をキーとし、層の熱容量[J/(m2･K)]と熱抵抗[m2･K/W]のtupleを値とする辞書
+        method (str): 最適化の解法
+        adaptive (bool): 制約を課す時刻を適応的に追加する場合True
+        warm (bool): 計算済みの最も近い層構成の結果を初期値とする場合True（Falseの場合は層構成ごとに独立に計算する）
+
+    Returns:
+        (dict, dict): 名前をキーとし、calc_response_factorの結果（初期値とした層構成の名前を'warm_from'に格納する）を値とする辞書、
+            反復回数等の集計（'nit'、'nfev'、'n_rounds'、'n_matrices'（作成した固定根の行列の数）、'time'）
+    """
+
+    start = time.perf_counter()
+
+    names = list(constructions)
+    stacks = [(np.asarray(c, dtype=float), np.asarray(r, dtype=float)) for (c, r) in constructions.values()]
+    (order, parents) = make_order(np.array([calc_features(c_layer=c, r_layer=r) for (c, r) in stacks]))
+
+    # 固定根ごとの行列
+    matrices = {}
+
+    rfs = {}
+    stats = {'nit': 0, 'nfev': 0, 'n_rounds': 0, 'n_matrices': 0}
+    for (i, parent) in zip(order, parents):
+        (c_layer, r_layer) = stacks[i]
+        alpha = select_alpha(c_layer=c_layer, r_layer=r_layer)
+        key = alpha.tobytes()
+        if key not in matrices:
+            matrices[key] = make_root_matrices(alpha_m_temp=alpha)
+            stats['n_matrices'] += 1
+
+        warm_start = rfs[names[parent]] if warm and parent is not None else None
+        rf = calc_response_factor(
+            c_layer=c_layer, r_layer=r_layer, method=method, alpha_m_temp=alpha, adaptive=adaptive,
+            matrices=matrices[key], warm_start=warm_start
+        )
+        rf['warm_from'] = names[parent] if warm_start is not None else None
+        rfs[names[i]] = rf
+
+        for result in (rf['result_t'], rf['result_a']):
+            stats['nit'] += result.get('nit', 0)
+            stats['nfev'] += result.get('nfev', 0)
+            stats['n_rounds'] += result.get('n_rounds', 1)
+
+    stats['time'] = time.perf_counter() - start
+
+    return {name: rfs[name] for name in names}, stats
+
+
+def make_family_constructions(d_max: float = 200.0, d_step: float = 5.0) -> dict:
+    """minimize_test_COBYLA_def.ipynbの内断熱、外断熱の計算例の断熱材の厚さを細かく変えた層構成を返す
+
+    Args:
+        d_max (float): 断熱材の厚さの最大値[mm]
+        d_step (float): 断熱材の厚さの間隔[mm]
+
+    Returns:
+        dict: 名前をキーとし、層の熱容量[J/(m2･K)]と熱抵抗[m2･K/W]のtupleを値とする辞書
+    """
+
+    constructions = {}
+    for d in np.arange(0.0, d_max + d_step / 2, d_step):
+        # 内断熱
+        constructions['内断熱 ウレタン' + f'{d:g}'] = (
+            np.array([d / 1000 * 61, 100 / 1000 * 2000, 0.0]) * 1000,
+            np.array([d / 1000 / 0.034, 100 / 1000 / 1.6, 0.04])
+        )
+    for d in np.arange(0.0, d_max + d_step / 2, d_step):
+        # 外断熱
+        constructions['外断熱 ウレタン' + f'{d:g}'] = (
+            np.array([100 / 1000 * 2000, d / 1000 * 61, 0.0]) * 1000,
+            np.array([100 / 1000 / 1.6, d / 1000 / 0.034, 0.04])
+        )
+
+    return constructions
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='断熱材の厚さを変えた層構成の応答係数を、初期値の有無で比較する')
+    parser.add_argument('--method', default='QP', choices=list(SOLVER_SETTINGS), help='最適化の解法')
+    parser.add_argument('--d-max', type=float, default=200.0, help='断熱材の厚さの最大値[mm]')
+    parser.add_argument('--d-step', type=float, default=5.0, help='断熱材の厚さの間隔[mm]')
+    parser.add_argument('--fixed-grid', action='store_true', help='制約を適応的に追加せず、全ての時刻に制約を課す')
+    args = parser.parse_args(argv)
+
+    constructions = make_family_constructions(d_max=args.d_max, d_step=args.d_step)
+
+    results = {}
+    for warm in (False, True):
+        (rfs, stats) = fit_family(constructions=constructions, method=args.method, adaptive=not args.fixed_grid, warm=warm)
+        results[warm] = rfs
+        print(
+            f"{'warm' if warm else 'cold'}: {len(rfs)} constructions time={stats['time']:.2f} s nit={stats['nit']}"
+            f" nfev={stats['nfev']} rounds={stats['n_rounds']} matrices={stats['n_matrices']}"
+        )
+
+    # 初期値の有無による伝達関数の誤差の差（初期値によらず同じ解となることの確認）
+    diff = max(
+        abs(results[True][name][k].fun - results[False][name][k].fun) / max(results[False][name][k].fun, 1.0e-300)
+        for name in constructions for k in ('result_t', 'result_a')
+    )
+    print(f'max relative difference of error = {diff:.1e}')
+
+
+if __name__ == '__main__':
+
+    main()
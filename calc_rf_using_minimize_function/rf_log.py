@@ -0,0 +1,175 @@
+import argparse
+import csv
+import json
+import time
+
+import numpy as np
+
+from batch_rf import collect_constructions, get_input_files
+from response_factor import SOLVER_SETTINGS, calc_max_violation, calc_response_factor, make_sample_constructions
+
+
+# 応答係数の計算の記録
+# 層構成ごとに計算時間、反復回数、目的関数と制約の評価回数、固定根の数、伝達関数の誤差（残差）、制約を満たさない量を記録し、
+# CSVまたはJSONのファイルに出力する（計算に時間のかかる層構成や、解が制約を満たさない層構成を探すため）
+
+# 記録の項目（CSVの列の順）
+FIELDS = [
+    'name', 'method', 'adaptive', 'time', 'n_root', 'n_layer',
+    'nit_t', 'nit_a', 'nfev_t', 'nfev_a', 'ncev_t', 'ncev_a', 'n_rounds_t', 'n_rounds_a',
+    'residual_t', 'residual_a', 'max_violation', 'success', 'message', 'error'
+]
+
+# 制約を満たさないとみなす量（summarizeで表示する）
+VIOLATION_TOL = 1.0e-9
+
+
+def make_record(name: str, method: str, adaptive: bool, elapsed: float, c_layer: np.ndarray, rf: dict = None, error: str = '') -> dict:
+    """1つの層構成の計算の記録を作成する
+
+    Args:
+        name (str): 層構成の名前
+        method (str): 最適化の解法
+        adaptive (bool): 制約を課す時刻を適応的に追加した場合True
+        elapsed (float): 計算時間[s]
+        c_layer (np.ndarray): 層の熱容量[J/(m2･K)]
+        rf (dict): calc_response_factorの結果（計算できなかった場合はNone）
+        error (str): 計算できなかった場合の例外
+
+    Returns:
+        dict: FIELDSをキーとする記録
+    """
+
+    record = dict.fromkeys(FIELDS, '')
+    record.update({'name': name, 'method': method, 'adaptive': adaptive, 'time': elapsed, 'n_layer': len(c_layer), 'error': error})
+    if rf is None:
+        record['success'] = False
+        return record
+
+    (result_t, result_a) = (rf['result_t'], rf['result_a'])
+    record.update({
+        'n_root': len(rf['alpha']),
+        'nit_t': int(result_t.get('nit', 0)),
+        'nit_a': int(result_a.get('nit', 0)),
+        'nfev_t': int(result_t.get('nfev', 0)),
+        'nfev_a': int(result_a.get('nfev', 0)),
+        'ncev_t': int(result_t.get('ncev', 0)),
+        'ncev_a': int(result_a.get('ncev', 0)),
+        'n_rounds_t': int(result_t.get('n_rounds', 1)),
+        'n_rounds_a': int(result_a.get('n_rounds', 1)),
+        'residual_t': float(result_t.fun),
+        'residual_a': float(result_a.fun),
+        'max_violation': calc_max_violation(rf),
+        'success': bool(result_t.success and result_a.success),
+        'message': result_t.message if not result_t.success else result_a.message
+    })
+
+    return record
+
+
+def fit_with_record(name: str, c_layer: np.ndarray, r_layer: np.ndarray, method: str = 'QP', adaptive: bool = True,
+                    plot: bool = False) -> (dict, dict):
+    """応答係数を計算し、計算の記録を作成する
+
+    Args:
+        name (str): 層構成の名前
+        c_layer (np.ndarray): 層の熱容量[J/(m2･K)]
+        r_layer (np.ndarray): 層の熱抵抗[m2･K/W]
+        method (str): 最適化の解法
+        adaptive (bool): 制約を課す時刻を適応的に追加する場合True
+        plot (bool): 単位応答のグラフを描画する場合True
+
+    Returns:
+        (dict, dict): calc_response_factorの結果（計算できなかった場合はNone）、make_recordの記録
+    """
+
+    start = time.perf_counter()
+    try:
+        rf = calc_response_factor(c_layer=c_layer, r_layer=r_layer, method=method, plot=plot, adaptive=adaptive)
+        error = ''
+    except Exception as e:
+        # 熱容量があり熱抵抗が0の層等、応答係数を計算できない層構成
+        rf = None
+        error = repr(e)
+    elapsed = time.perf_counter() - start
+
+    return rf, make_record(name=name, method=method, adaptive=adaptive, elapsed=elapsed, c_layer=c_layer, rf=rf, error=error)
+
+
+def write_log(records: list, file_name: str):
+    """記録をファイルに出力する（拡張子が.jsonの場合はJSON、それ以外はCSV）"""
+
+    if file_name.endswith('.json'):
+        with open(file_name, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=1, ensure_ascii=False)
+        return
+
+    with open(file_name, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def summarize(records: list, n_top: int = 10) -> str:
+    """計算時間の長い層構成と、計算に失敗した、または制約を満たさない層構成の一覧を返す
+
+    Args:
+        records (list): 記録のリスト
+        n_top (int): 表示する計算時間の長い層構成の数
+
+    Returns:
+        str: 一覧
+    """
+
+    lines = [f"{len(records)} fits, total time={sum(r['time'] for r in records):.2f} s"]
+
+    lines.append(f'slowest {min(n_top, len(records))}:')
+    for r in sorted(records, key=lambda r: -r['time'])[:n_top]:
+        lines.append(
+            f"  {r['name']}: time={r['time']:.3f} s roots={r['n_root']} nit={r['nit_t']},{r['nit_a']}"
+            f" nfev={r['nfev_t']},{r['nfev_a']} ncev={r['ncev_t']},{r['ncev_a']}"
+        )
+
+    flagged = [r for r in records if not r['success'] or r['max_violation'] > VIOLATION_TOL]
+    lines.append(f'failed or violating constraints: {len(flagged)}')
+    for r in flagged:
+        lines.append(f"  {r['name']}: success={r['success']} violation={r['max_violation']} {r['message']}{r['error']}")
+
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='応答係数の計算時間、反復回数、誤差等を層構成ごとに記録する')
+    parser.add_argument('input', nargs='*', help='入力JSONのファイルまたはフォルダ（省略時は計算例の層構成）')
+    parser.add_argument('--method', default='QP', choices=list(SOLVER_SETTINGS), help='最適化の解法')
+    parser.add_argument('--fixed-grid', action='store_true', help='制約を適応的に追加せず、全ての時刻に制約を課す')
+    parser.add_argument('--log', default='rf_fit_log.csv', help='記録の出力先のファイル（.csvまたは.json）')
+    parser.add_argument('--plot', action='store_true', help='単位応答のグラフを描画する')
+    parser.add_argument('--top', type=int, default=10, help='表示する計算時間の長い層構成の数')
+    args = parser.parse_args(argv)
+
+    if args.input:
+        # 名前はキーの先頭と層の名前とする
+        constructions = {
+            key[:12] + ' ' + '/'.join(layer['name'] for layer in c['layers']): (
+                np.array([layer['thermal_capacity'] for layer in c['layers']]) * 1000.0,
+                np.array([layer['thermal_resistance'] for layer in c['layers']])
+            )
+            for key, c in collect_constructions(get_input_files(paths=args.input)).items()
+        }
+    else:
+        constructions = make_sample_constructions()
+
+    records = [
+        fit_with_record(name=name, c_layer=c_layer, r_layer=r_layer, method=args.method, adaptive=not args.fixed_grid, plot=args.plot)[1]
+        for name, (c_layer, r_layer) in constructions.items()
+    ]
+
+    write_log(records=records, file_name=args.log)
+    print(summarize(records=records, n_top=args.top))
+
+
+if __name__ == '__main__':
+
+    main()
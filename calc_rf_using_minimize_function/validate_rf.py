@@ -0,0 +1,334 @@
+import argparse
+import csv
+import json
+import sys
+import time
+
+import numpy as np
+
+from batch_rf import get_input_files
+from response_factor import ADAPTIVE_TOL, SOLVER_SETTINGS, get_t_values
+from rf_cache import get_thermal_layers
+
+
+# 計算済みの応答係数の検証
+# 多数の層構成の応答係数をまとめて、密なラプラス変数で伝達関数の誤差を、制約を課した時刻（get_t_values）で単位応答の上下限と単調増加を確認し、
+# 許容値を超える層構成を一覧にする（batch_rf.pyで応答係数の表を作成するたびに確認する）
+# 上下限と単調増加は最適化で保証する範囲（制約を課した時刻と解法の制約の許容値）で確認するため、既定の解法で計算した応答係数は全て満たす
+# 層構成の数だけ繰り返さないよう、伝達関数は層を揃えた配列でまとめて計算し、単位応答と応答係数の伝達関数は
+# 固定根が同じ層構成ごとに行列の積で計算する
+
+# 伝達関数の誤差（定常値に対する比）の許容値
+# 伝達関数の誤差は最適化で保証されないため、既定の解法（QP）で得られる誤差を許容する
+# （最も速い固定根付近で大きく、UA_etaAの入力の層構成で最大0.08、熱容量の小さいpyStep3の層構成で最大0.30）
+TF_TOL = 0.35
+
+# 単位応答の上下限、単調増加を満たさない量の許容値の、解法の制約の許容値（SOLVER_SETTINGSのconstraint_tol）に対する倍率
+# （応答係数を出力した際の丸めと、単位応答の計算の丸め誤差の余裕）
+BOUND_TOL_MARGIN = 10.0
+
+# 係数の和の制約（Σx + 定常値 = 0）の許容値（定常値に対する比、make_constraintsと同じ）
+SUM_TOL = 0.05
+
+# 結果の項目（CSVの列の順）
+FIELDS = [
+    'name', 'n_root', 'n_layer', 'tf_error_t', 'tf_error_a', 'phi0_t', 'phi0_a', 'lower_t', 'lower_a',
+    'upper_t', 'upper_a', 'decrease_t', 'decrease_a', 'ok', 'failures'
+]
+
+
+def get_laps_dense() -> np.ndarray:
+    """伝達関数を確認するラプラス変数（10年～900秒の対数等間隔の200個）[1/s]"""
+
+    return np.logspace(np.log10(1.0 / (86400.0 * 365.0 * 10.0)), np.log10(1.0 / 900.0), 200)
+
+
+def get_bound_tol(method: str = 'QP') -> float:
+    """単位応答の上下限、単調増加を満たさない量（定常値に対する比）の許容値
+
+    Args:
+        method (str): 応答係数の計算に用いた最適化の解法
+
+    Returns:
+        float: 許容値（単調増加は900秒あたりの減少量のため、900倍して用いる）
+    """
+
+    return SOLVER_SETTINGS[method].get('constraint_tol', ADAPTIVE_TOL) * BOUND_TOL_MARGIN
+
+
+def pad_layers(constructions: list) -> (np.ndarray, np.ndarray):
+    """層構成ごとの層の熱容量、熱抵抗を、層の数を揃えた配列にする（不足する層は熱容量、熱抵抗0の層とする）
+
+    Args:
+        constructions (list): 層の熱容量[J/(m2･K)]と熱抵抗[m2･K/W]のtupleのリスト
+
+    Returns:
+        (np.ndarray, np.ndarray): 層の熱容量、熱抵抗（層構成の数 × 層の数の最大値）
+    """
+
+    n_layer = max((len(c) for (c, _) in constructions), default=0)
+    c_layers = np.zeros((len(constructions), n_layer))
+    r_layers = np.zeros((len(constructions), n_layer))
+    for (i, (c_layer, r_layer)) in enumerate(constructions):
+        c_layers[i, :len(c_layer)] = c_layer
+        r_layers[i, :len(r_layer)] = r_layer
+
+    return c_layers, r_layers
+
+
+def calc_transfer_functions(c_layers: np.ndarray, r_layers: np.ndarray, laps: np.ndarray) -> (np.ndarray, np.ndarray):
+    """複数の層構成の伝達関数をまとめて計算する（calc_transfer_functionと同じ）
+
+    四端子行列は層ごとに掛けるたびに最大の要素で割り、桁あふれしないよう倍率の対数を別に保持する。
+
+    Args:
+        c_layers (np.ndarray): 層の熱容量[J/(m2･K)]（層構成の数 × 層の数、pad_layersを参照）
+        r_layers (np.ndarray): 層の熱抵抗[m2･K/W]（層構成の数 × 層の数）
+        laps (np.ndarray): ラプラス変数[1/s]
+
+    Returns:
+        (np.ndarray, np.ndarray): 吸熱伝達関数[m2･K/W]、貫流伝達関数[-]（層構成の数 × ラプラス変数の数）
+    """
+
+    s = np.asarray(laps, dtype=float)[np.newaxis, :]
+
+    (n, n_layer) = c_layers.shape
+    mat_ft = np.zeros((n, s.shape[1], 2, 2))
+    mat_ft[..., 0, 0] = 1.0
+    mat_ft[..., 1, 1] = 1.0
+    log_scale = np.zeros((n, s.shape[1]))
+
+    for k in range(n_layer):
+        c = c_layers[:, k:k + 1]
+        r = r_layers[:, k:k + 1]
+
+        # 定常部位（空気層等、揃えるために加えた層を含む）の場合
+        is_steady = np.abs(c) < 0.001
+
+        # 非定常部位の場合（定常部位の値は使用しないため、0除算の警告を抑制する）
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            temp = np.sqrt(r * c * s)
+            cosh = np.cosh(temp)
+            sinh = np.sinh(temp)
+            f01 = r / temp * sinh
+            f10 = temp / r * sinh
+
+        mat_fi = np.empty_like(mat_ft)
+        mat_fi[..., 0, 0] = np.where(is_steady, 1.0, cosh)
+        mat_fi[..., 0, 1] = np.where(is_steady, r, f01)
+        mat_fi[..., 1, 0] = np.where(is_steady, 0.0, f10)
+        mat_fi[..., 1, 1] = np.where(is_steady, 1.0, cosh)
+
+        mat_ft = np.matmul(mat_ft, mat_fi)
+        scale = np.max(np.abs(mat_ft), axis=(2, 3))
+        mat_ft /= scale[..., np.newaxis, np.newaxis]
+        log_scale += np.log(scale)
+
+    # 吸熱、貫流の各伝達関数
+    ga = mat_ft[..., 0, 1] / mat_ft[..., 1, 1]
+    with np.errstate(over='ignore'):
+        gt = np.exp(-log_scale) / mat_ft[..., 1, 1]
+
+    return ga, gt
+
+
+def group_by_roots(alphas: list) -> dict:
+    """固定根が同じ層構成のインデックスをまとめる
+
+    Args:
+        alphas (list): 層構成ごとの固定根[1/s]
+
+    Returns:
+        dict: 固定根のbytesをキーとし、層構成のインデックスの配列を値とする辞書
+    """
+
+    groups = {}
+    for (i, alpha) in enumerate(alphas):
+        groups.setdefault(np.asarray(alpha, dtype=float).tobytes(), []).append(i)
+
+    return {key: np.array(index) for key, index in groups.items()}
+
+
+def validate_response_factors(constructions: dict, laps: np.ndarray = None, t_values: np.ndarray = None,
+                              tf_tol: float = TF_TOL, bound_tol: float = None, method: str = 'QP') -> list:
+    """複数の層構成の応答係数をまとめて検証する
+
+    Args:
+        constructions (dict): 名前をキーとし、'layers'（層の辞書のリスト、熱容量はkJ/(m2･K)）と
+            応答係数（'alpha'、't0'、'a0'、'coef_t'、'coef_a'）を値とする辞書（batch_rf.pyの表と同じ形式）
+        laps (np.ndarray): 伝達関数を確認するラプラス変数[1/s]（省略時はget_laps_dense）
+        t_values (np.ndarray): 単位応答を確認する時刻（900秒単位、省略時は制約を課した時刻get_t_values）
+        tf_tol (float): 伝達関数の誤差の許容値
+        bound_tol (float): 単位応答の上下限、単調増加を満たさない量の許容値（省略時はget_bound_tol）
+        method (str): 応答係数の計算に用いた最適化の解法（bound_tolを省略した場合）
+
+    Returns:
+        list: 層構成ごとの結果（FIELDSをキーとする辞書、定常値に対する比、'failures'は許容値を超えた項目を';'で区切ったもの）のリスト
+    """
+
+    laps = get_laps_dense() if laps is None else np.asarray(laps, dtype=float)
+    t_values = get_t_values() if t_values is None else np.asarray(t_values, dtype=float)
+    bound_tol = get_bound_tol(method) if bound_tol is None else bound_tol
+
+    names = list(constructions)
+    results = [dict.fromkeys(FIELDS, '') for _ in names]
+    for (result, name) in zip(results, names):
+        result.update({'name': name, 'n_layer': len(constructions[name]['layers']), 'ok': False})
+
+    # 応答係数を計算できなかった層構成
+    fitted = [i for (i, name) in enumerate(names) if 'error' not in constructions[name]]
+    for i in sorted(set(range(len(names))) - set(fitted)):
+        results[i]['failures'] = 'error'
+    if len(fitted) == 0:
+        return results
+
+    rfs = [constructions[names[i]] for i in fitted]
+    (c_layers, r_layers) = pad_layers([
+        (
+            np.array([layer['thermal_capacity'] for layer in rf['layers']]) * 1000.0,
+            np.array([layer['thermal_resistance'] for layer in rf['layers']])
+        ) for rf in rfs
+    ])
+    (ga, gt) = calc_transfer_functions(c_layers=c_layers, r_layers=r_layers, laps=laps)
+
+    y0 = {'t': np.array([rf['t0'] for rf in rfs]), 'a': np.array([rf['a0'] for rf in rfs])}
+    g = {'t': gt, 'a': ga}
+    values = {f'{k}_{ta}': np.empty(len(rfs)) for k in ('tf_error', 'phi0', 'lower', 'upper', 'decrease') for ta in ('t', 'a')}
+
+    for index in group_by_roots([rf['alpha'] for rf in rfs]).values():
+        alpha = np.asarray(rfs[index[0]]['alpha'], dtype=float)
+        mat_f = laps[:, np.newaxis] / (laps[:, np.newaxis] + alpha[np.newaxis, :])
+        mat_exp = np.exp(-alpha[np.newaxis, :] * t_values[:, np.newaxis] * 900)
+
+        for ta in ('t', 'a'):
+            x = np.array([rfs[i]['coef_' + ta] for i in index], dtype=float).reshape(len(index), len(alpha))
+            y = y0[ta][index][:, np.newaxis]
+
+            # 伝達関数の誤差
+            values['tf_error_' + ta][index] = np.max(np.abs(y + x @ mat_f.T - g[ta][index]), axis=1) / y[:, 0]
+
+            # 単位応答の初期値（係数の和の制約）、上下限、単調増加（900秒あたりの減少量）
+            phi = y + x @ mat_exp.T
+            diff_phi = (x * -alpha[np.newaxis, :] * 900) @ mat_exp.T
+            values['phi0_' + ta][index] = np.abs(np.sum(x, axis=1) + y[:, 0]) / y[:, 0]
+            values['lower_' + ta][index] = np.maximum(-np.min(phi, axis=1), 0.0) / y[:, 0]
+            values['upper_' + ta][index] = np.maximum(np.max(phi, axis=1) - y[:, 0], 0.0) / y[:, 0]
+            values['decrease_' + ta][index] = np.maximum(-np.min(diff_phi, axis=1), 0.0) / y[:, 0]
+
+    tols = {'tf_error': tf_tol, 'phi0': SUM_TOL + bound_tol, 'lower': bound_tol, 'upper': bound_tol, 'decrease': bound_tol * 900}
+    for (j, i) in enumerate(fitted):
+        result = results[i]
+        result['n_root'] = len(rfs[j]['alpha'])
+        failures = []
+        for (k, v) in values.items():
+            result[k] = float(v[j])
+            # 伝達関数がNaN等の場合も許容値を超えたものとする
+            if not v[j] <= tols[k.rsplit('_', 1)[0]]:
+                failures.append(k)
+        result['ok'] = len(failures) == 0
+        result['failures'] = ';'.join(failures)
+
+    return results
+
+
+def load_constructions(paths: list) -> dict:
+    """検証する応答係数を読み込む
+
+    batch_rf.pyの応答係数の表（'constructions'をキーとするJSON）、または応答係数を付けた入力JSON
+    （応答係数の表'response_factors'と部位の'response_factor'（表のキー）、convert_to_input_json.py、pyStep3/sweep.pyの--response-factorsで作成したもの）を読み込む。
+
+    Args:
+        paths (list): 応答係数の表、入力JSONのファイルまたはフォルダ
+
+    Returns:
+        dict: 層構成のキーをキーとし、層構成と応答係数を値とする辞書（validate_response_factorsを参照）
+    """
+
+    constructions = {}
+    input_files = []
+    for file_name in get_input_files(paths=paths):
+        with open(file_name, encoding='utf-8') as f:
+            d = json.load(f)
+        if 'constructions' in d:
+            constructions.update(d['constructions'])
+        else:
+            input_files.append(file_name)
+
+    # 入力JSONは応答係数を付けた部位のみとし、表のキー（室外側の表面熱伝達抵抗を含む層構成と解法のハッシュ）の重複を除く
+    for input_file in input_files:
+        with open(input_file, encoding='utf-8') as f:
+            d = json.load(f)
+        for boundary in d.get('boundaries', []):
+            if 'response_factor' not in boundary:
+                continue
+            key = boundary['response_factor']
+            if key not in constructions:
+                constructions[key] = dict(d['response_factors'][key], layers=get_thermal_layers(boundary))
+
+    return constructions
+
+
+def summarize(results: list, n_top: int = 10) -> str:
+    """許容値を超えた層構成の一覧と、項目ごとの最大値を返す
+
+    Args:
+        results (list): validate_response_factorsの結果
+        n_top (int): 表示する許容値を超えた層構成の数
+
+    Returns:
+        str: 一覧
+    """
+
+    failed = [r for r in results if not r['ok']]
+    fitted = [r for r in results if r['n_root'] != '']
+    lines = [f'{len(results) - len(failed)} / {len(results)} constructions passed']
+
+    if len(fitted) > 0:
+        lines.append('max: ' + ' '.join(f'{k}={max(r[k] for r in fitted):.1e}' for k in FIELDS[3:-2]))
+
+    for r in failed[:n_top]:
+        lines.append(f"  {r['name']}: {r['failures']}")
+    if len(failed) > n_top:
+        lines.append(f'  ... and {len(failed) - n_top} more')
+
+    return '\n'.join(lines)
+
+
+def write_results(results: list, file_name: str):
+    """結果をCSVファイルに出力する"""
+
+    with open(file_name, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='計算済みの応答係数の伝達関数の誤差と単位応答の上下限、単調増加を確認する')
+    parser.add_argument('input', nargs='+', help='batch_rf.pyの応答係数の表、または応答係数を付けた入力JSONのファイルまたはフォルダ')
+    parser.add_argument('--tf-tol', type=float, default=TF_TOL, help='伝達関数の誤差（定常値に対する比）の許容値')
+    parser.add_argument('--bound-tol', type=float, default=None, help='単位応答の上下限、単調増加を満たさない量の許容値（省略時は解法の制約の許容値による）')
+    parser.add_argument('--method', default='QP', choices=list(SOLVER_SETTINGS), help='応答係数の計算に用いた最適化の解法')
+    parser.add_argument('--output', default=None, help='層構成ごとの結果の出力先のCSVファイル')
+    parser.add_argument('--top', type=int, default=10, help='表示する許容値を超えた層構成の数')
+    args = parser.parse_args(argv)
+
+    constructions = load_constructions(paths=args.input)
+
+    start = time.perf_counter()
+    results = validate_response_factors(constructions=constructions, tf_tol=args.tf_tol, bound_tol=args.bound_tol, method=args.method)
+    elapsed = time.perf_counter() - start
+
+    if args.output is not None:
+        write_results(results=results, file_name=args.output)
+    print(summarize(results=results, n_top=args.top))
+    print(f'validated in {elapsed:.2f} s')
+
+    # 許容値を超えた層構成がある場合は終了コードを1とする
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+
+
+# 地域区分の数
+N_REGION = 8
+
+# 解析済みの部位情報（プロセス内のキャッシュ、(ファイルのパス, 更新時刻, サイズ)をキーとする）
+_memo = {}
+
+
+def load_building_part_info(excel_file: str = 'info_of_building_part.xlsx', cache_dir: str = None) -> dict:
+    """部位情報（info_of_building_part.xlsx）を列ごとの配列として返す
+
+    初回のみExcelを解析し、ファイル内容のハッシュをキーとしてpickle形式でディスクに保存する。
+    2回目以降（別プロセスを含む）は保存したファイルを読み込み、同一プロセス内ではメモリ上の結果を返す。
+    ファイルの更新時刻とサイズが前回と同じ場合は、ファイル内容のハッシュを計算せずに前回のハッシュを用いる
+    （ディスクのキャッシュには更新時刻、サイズとハッシュの対応を保存する）。
+
+    Args:
+        excel_file (str): 部位情報のExcelファイル
+        cache_dir (str): キャッシュの保存先（省略時はExcelファイルと同じフォルダの.cache）
+
+    Returns:
+        dict: 部位情報
+            'building_part_name': 部位名称
+            'temp_coefficient': 温度差係数
+            'area': 部位面積（開口部面積含む）[m2]
+            'direction': 方位
+            'door_area_cold', 'door_area_warm': ドア面積（寒冷地、温暖地）[m2]
+            'window_area_cold', 'window_area_warm': 窓面積（寒冷地、温暖地）[m2]
+            'cooling_sol_correction_factor', 'heating_sol_correction_factor': 冷房期、暖房期の取得日射補正係数（地域区分×部位）
+    """
+
+    path = os.path.abspath(excel_file)
+    stat = os.stat(path)
+    memo_key = (path, stat.st_mtime_ns, stat.st_size)
+    if memo_key in _memo:
+        return _memo[memo_key]
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(path), '.cache')
+
+    # 更新時刻とサイズが前回と同じ場合は前回のハッシュを用いる
+    stat_file = os.path.join(cache_dir, os.path.basename(excel_file) + '.stat.json')
+    stat_entry = {'path': path, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+    key = None
+    if os.path.exists(stat_file):
+        with open(stat_file, encoding='utf-8') as f:
+            saved = json.load(f)
+        if {k: saved.get(k) for k in stat_entry} == stat_entry:
+            key = saved['key']
+    is_hashed = key is None
+    if is_hashed:
+        with open(path, 'rb') as f:
+            key = hashlib.sha256(f.read()).hexdigest()
+
+    cache_file = os.path.join(cache_dir, os.path.basename(excel_file) + '.' + key[:16] + '.pkl')
+
+    if os.path.exists(cache_file):
+        with open(cache_file, 'rb') as f:
+            info = pickle.load(f)
+    else:
+        info = parse_building_part_info(excel_file=excel_file)
+        os.makedirs(cache_dir, exist_ok=True)
+        # 書き込み途中のファイルを他のプロセスが読まないように、一時ファイルに書いてから置き換える
+        tmp_file = cache_file + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(info, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+
+    if is_hashed:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_file = stat_file + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(dict(stat_entry, key=key), f)
+        os.replace(tmp_file, stat_file)
+
+    _memo[memo_key] = info
+
+    return info
+
+
+def parse_building_part_info(excel_file: str) -> dict:
+    """部位情報のExcelファイルを解析する
+
+    Args:
+        excel_file (str): 部位情報のExcelファイル
+
+    Returns:
+        dict: 部位情報（load_building_part_info を参照）
+    """
+
+    import pandas as pd
+
+    df_info = pd.read_excel(excel_file)
+
+    return {
+        'building_part_name': df_info['部位名称'].to_numpy(dtype=str),
+        'temp_coefficient': df_info['温度差係数'].to_numpy(dtype=float),
+        'area': df_info['部位面積（開口部面積含む）'].to_numpy(dtype=float),
+        'direction': df_info['方位'].to_numpy(dtype=str),
+        'door_area_cold': df_info['ドア（寒冷地）'].to_numpy(dtype=float),
+        'door_area_warm': df_info['ドア（温暖地）'].to_numpy(dtype=float),
+        'window_area_cold': df_info['窓（寒冷地）'].to_numpy(dtype=float),
+        'window_area_warm': df_info['窓（温暖地）'].to_numpy(dtype=float),
+        'cooling_sol_correction_factor': np.array([
+            df_info[str(region) + '地域冷房期取得日射補正係数'].to_numpy(dtype=float) for region in range(1, N_REGION + 1)
+        ]),
+        'heating_sol_correction_factor': np.array([
+            df_info[str(region) + '地域暖房期取得日射補正係数'].to_numpy(dtype=float) for region in range(1, N_REGION + 1)
+        ])
+    }
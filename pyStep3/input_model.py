@@ -0,0 +1,315 @@
+from schedule_store import freeze
+
+
+# 入力の室、部位、層をスロット付きのクラスで保持し、to_dictで従来と同じ形式の辞書型に変換する
+# 隣室側の部位は表側の部位を参照し、層構成は逆順の層構成を共有するため、部位の複製（deepcopy）を行わない
+
+
+class Layer:
+    """層"""
+
+    __slots__ = ('name', 'thermal_resistance', 'thermal_capacity')
+
+    def __init__(self, name: str, thermal_resistance: float, thermal_capacity: float):
+        """
+        Args:
+            name (str): 名前
+            thermal_resistance (float): 熱抵抗[m2･K/W]
+            thermal_capacity (float): 熱容量[kJ/(m2･K)]
+        """
+
+        self.name = name
+        self.thermal_resistance = thermal_resistance
+        self.thermal_capacity = thermal_capacity
+
+    def to_dict(self) -> dict:
+
+        return {
+            "name": self.name,
+            "thermal_resistance": self.thermal_resistance,
+            "thermal_capacity": self.thermal_capacity
+        }
+
+
+class LayerStack:
+    """層構成（層のtuple）
+
+    逆順の層構成と辞書型への変換結果は最初に参照したときに1回だけ作成し、以降は同じオブジェクトを返す。
+    """
+
+    __slots__ = ('layers', '_reversed', '_list')
+
+    def __init__(self, layers: tuple, reversed_stack=None):
+        """
+        Args:
+            layers (tuple): 層（Layer）のtuple
+            reversed_stack (LayerStack): 逆順の層構成（作成済みの場合）
+        """
+
+        self.layers = tuple(layers)
+        self._reversed = reversed_stack
+        self._list = None
+
+    def reversed(self):
+        """逆順の層構成を返す"""
+
+        if self._reversed is None:
+            self._reversed = LayerStack(self.layers[::-1], reversed_stack=self)
+        return self._reversed
+
+    def __len__(self):
+        return len(self.layers)
+
+    def __iter__(self):
+        return iter(self.layers)
+
+    def __getitem__(self, i):
+        return self.layers[i]
+
+    def to_list(self) -> tuple:
+        """層の辞書型のリスト（同じ層構成を参照する部位で共有するため、変更できない型とする）"""
+
+        if self._list is None:
+            self._list = freeze([layer.to_dict() for layer in self.layers])
+        return self._list
+
+
+def to_value(v):
+    """辞書型に変換する際の値（層構成は層の辞書型のリストに変換する）"""
+
+    if isinstance(v, LayerStack):
+        return v.to_list()
+    return v
+
+
+class Room:
+    """室"""
+
+    __slots__ = ('id', 'name', 'floor_area', 'volume', 'heat_capacity', 'schedule')
+
+    def __init__(self, id: int, name: str, floor_area: float, volume: float, heat_capacity: float, schedule: dict):
+        """
+        Args:
+            id (int): 部屋ID
+            name (str): 部屋名
+            floor_area (float): 床面積[m2]
+            volume (float): 室容積[m3]
+            heat_capacity (float): 室内の熱容量[J/K]
+            schedule (dict): スケジュール（ScheduleStoreが返す共有のオブジェクト）
+        """
+
+        self.id = id
+        self.name = name
+        self.floor_area = floor_area
+        self.volume = volume
+        self.heat_capacity = heat_capacity
+        self.schedule = schedule
+
+    def to_dict(self) -> dict:
+
+        return {
+            "id": self.id,
+            "name": self.name,
+            "sub_name": self.name,
+            "floor_area": self.floor_area,
+            "volume": self.volume,
+            "ventilation": {
+                "natural": 0.0
+            },
+            "furniture": {
+                "input_method": "specify",
+                "heat_capacity": self.heat_capacity,
+                "heat_cond": self.heat_capacity * 0.00022,
+                "moisture_capacity": 0.0,
+                "moisture_cond": 1.0
+            },
+            "schedule": self.schedule
+        }
+
+
+class Boundary:
+    """部位の基底クラス
+
+    サブクラスのFIELDSに辞書型のキーを出力する順に並べ、同じ名前のスロットに値を保持する。
+    response_factorは応答係数の表（InputModel.response_factors）のキー（response_factor_store.ResponseFactorStoreで付ける）とする。
+    """
+
+    __slots__ = ('response_factor',)
+
+    FIELDS = ()
+
+    def __init__(self, **kwargs):
+
+        self.response_factor = None
+        for (k, v) in kwargs.items():
+            setattr(self, k, v)
+
+    def to_dict(self) -> dict:
+
+        d = {k: to_value(getattr(self, k)) for k in self.FIELDS}
+
+        # 応答係数が付いている場合は末尾に表のキーを出力する
+        if self.response_factor is not None:
+            d['response_factor'] = self.response_factor
+
+        return d
+
+
+class ExternalGeneralPart(Boundary):
+    """外皮の一般部位（外壁）"""
+
+    FIELDS = (
+        'id', 'name', 'sub_name', 'connected_room_id', 'boundary_type', 'area', 'is_sun_striked_outside', 'temp_dif_coef',
+        'is_solar_absorbed_inside', 'is_floor', 'direction', 'h_c', 'outside_emissivity', 'outside_heat_transfer_resistance',
+        'outside_solar_absorption', 'layers', 'solar_shading_part'
+    )
+    __slots__ = FIELDS
+
+
+class ExternalOpaquePart(Boundary):
+    """外皮の不透明な開口部（ドア、屋根）"""
+
+    FIELDS = (
+        'id', 'name', 'sub_name', 'connected_room_id', 'boundary_type', 'area', 'is_sun_striked_outside', 'temp_dif_coef',
+        'is_solar_absorbed_inside', 'is_floor', 'direction', 'h_c', 'outside_emissivity', 'outside_heat_transfer_resistance',
+        'u_value', 'inside_heat_transfer_resistance', 'outside_solar_absorption', 'solar_shading_part'
+    )
+    __slots__ = FIELDS
+
+
+class ExternalTransparentPart(Boundary):
+    """外皮の透明な開口部（窓）"""
+
+    FIELDS = (
+        'id', 'name', 'sub_name', 'connected_room_id', 'boundary_type', 'area', 'is_sun_striked_outside', 'temp_dif_coef',
+        'is_solar_absorbed_inside', 'is_floor', 'direction', 'h_c', 'outside_emissivity', 'outside_heat_transfer_resistance',
+        'u_value', 'inside_heat_transfer_resistance', 'eta_value', 'incident_angle_characteristics', 'glass_area_ratio',
+        'solar_shading_part'
+    )
+    __slots__ = FIELDS
+
+
+class Ground(Boundary):
+    """土間床"""
+
+    FIELDS = (
+        'id', 'name', 'sub_name', 'connected_room_id', 'boundary_type', 'area', 'is_solar_absorbed_inside', 'is_floor', 'h_c',
+        'layers', 'solar_shading_part'
+    )
+    __slots__ = FIELDS
+
+
+class InternalBoundary(Boundary):
+    """内壁（表側）"""
+
+    FIELDS = (
+        'id', 'name', 'sub_name', 'connected_room_id', 'boundary_type', 'area', 'rear_surface_boundary_id',
+        'is_solar_absorbed_inside', 'is_floor', 'h_c', 'layers', 'solar_shading_part'
+    )
+    __slots__ = FIELDS
+
+    def rear(self, connected_room_id: int, is_floor: bool = None):
+        """隣室側の部位を返す
+
+        Args:
+            connected_room_id (int): 隣接する部屋ID（隣室側）
+            is_floor (bool): 隣室側が床の場合True（省略時は表側と同じ）
+
+        Returns:
+            RearSurface: 隣室側の部位
+        """
+
+        return RearSurface(front=self, connected_room_id=connected_room_id, is_floor=is_floor)
+
+
+class RearSurface(Boundary):
+    """内壁の隣室側
+
+    表側の部位を参照し、部位IDと隣室側の部位IDを入れ替え、層構成は逆順とする。接続する室と床かどうか以外の値は表側と共有する。
+    """
+
+    # 従来の辞書型では層構成を入れ替えた際にlayersが末尾に移動していたため、同じ順に出力する
+    FIELDS = (
+        'id', 'name', 'sub_name', 'connected_room_id', 'boundary_type', 'area', 'rear_surface_boundary_id',
+        'is_solar_absorbed_inside', 'is_floor', 'h_c', 'solar_shading_part', 'layers'
+    )
+    __slots__ = ('front', 'connected_room_id', 'is_floor')
+
+    def __init__(self, front: InternalBoundary, connected_room_id: int, is_floor: bool = None):
+        """
+        Args:
+            front (InternalBoundary): 表側の部位
+            connected_room_id (int): 隣接する部屋ID（隣室側）
+            is_floor (bool): 隣室側が床の場合True（省略時は表側と同じ）
+        """
+
+        self.response_factor = None
+        self.front = front
+        self.connected_room_id = connected_room_id
+        self.is_floor = front.is_floor if is_floor is None else is_floor
+
+    @property
+    def id(self):
+        return self.front.rear_surface_boundary_id
+
+    @property
+    def rear_surface_boundary_id(self):
+        return self.front.id
+
+    @property
+    def layers(self) -> LayerStack:
+        return self.front.layers.reversed()
+
+    def __getattr__(self, name):
+        # 上記以外の値は表側と共有する
+        if name == 'front':
+            raise AttributeError(name)
+        return getattr(self.front, name)
+
+
+class InputModel:
+    """1ケースの入力
+
+    response_factorsは層構成ごとの応答係数の表（キーは部位のresponse_factor、response_factor_store.ResponseFactorStoreで付ける）とする。
+    """
+
+    __slots__ = ('common', 'building', 'rooms', 'boundaries', 'mechanical_ventilations', 'response_factors')
+
+    def __init__(self, common: dict, building: dict, rooms: list, boundaries: list, mechanical_ventilations: list):
+        """
+        Args:
+            common (dict): common部の辞書型
+            building (dict): building部の辞書型
+            rooms (list): 室（Room）のリスト
+            boundaries (list): 部位（Boundary）のリスト
+            mechanical_ventilations (list): 機械換気の辞書型のリスト
+        """
+
+        self.common = common
+        self.building = building
+        self.rooms = rooms
+        self.boundaries = boundaries
+        self.mechanical_ventilations = mechanical_ventilations
+        self.response_factors = None
+
+    def to_dict(self) -> dict:
+
+        d = {
+            "common": self.common,
+            "building": self.building,
+            "rooms": [room.to_dict() for room in self.rooms],
+            "boundaries": [boundary.to_dict() for boundary in self.boundaries],
+            "mechanical_ventilations": self.mechanical_ventilations,
+            "equipments": {
+                "heating_equipments": {
+                },
+                "cooling_equipments": {
+                }
+            }
+        }
+
+        # 応答係数が付いている場合は末尾に応答係数の表を出力する
+        if self.response_factors is not None:
+            d["response_factors"] = self.response_factors
+
+        return d
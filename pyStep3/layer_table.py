@@ -0,0 +1,162 @@
+import numpy as np
+
+from input_model import Layer, LayerStack
+
+
+# 部位の構成（層は室内側から室外側の順）
+#   'r_i', 'r_o': 室内側、室外側の表面熱伝達抵抗[m2･K/W]（断熱材の熱抵抗の計算に用いる）
+#   'layers': 層のリスト
+#       'lamda'（熱伝導率[W/(m･K)]）、'd'（厚さ[m]）、'crho'（容積比熱[kJ/(m3･K)]）を指定する層は、
+#           熱抵抗をd / lamda、熱容量をcrho * dとする
+#       'thermal_resistance'、'thermal_capacity' を指定する層は、その値とする
+#       'is_insulation' がTrueの層（断熱材）は、熱貫流率から熱抵抗を逆算し、厚さをR * lamdaとする（熱抵抗が0の場合は層を削除する）
+#       'is_storage_only' がTrueの層は、蓄熱の利用ありの場合のみ設ける
+CONSTRUCTIONS = {
+    'exterior_wall': {
+        'r_i': 0.11,
+        'r_o': 0.04,
+        'layers': [
+            {'name': '石膏ボード10mm', 'lamda': 0.24, 'd': 0.010, 'crho': 830},
+            {'name': '中空層', 'thermal_resistance': 0.09, 'thermal_capacity': 0.0},
+            {'name': '住宅用グラスウール断熱材16K相当', 'lamda': 0.045, 'crho': 13, 'is_insulation': True},
+            {'name': '合板12mm', 'lamda': 0.16, 'd': 0.012, 'crho': 720},
+            {'name': '木片セメント板13mm', 'lamda': 0.15, 'd': 0.013, 'crho': 1000.0}
+        ]
+    },
+    'skin_ceiling': {
+        'r_i': 0.09,
+        'r_o': 0.09,
+        'layers': [
+            {'name': '石膏ボード10mm', 'lamda': 0.24, 'd': 0.010, 'crho': 830},
+            {'name': '住宅用グラスウール断熱材10K相当', 'lamda': 0.05, 'crho': 8, 'is_insulation': True}
+        ]
+    },
+    'skin_floor': {
+        'r_i': 0.15,
+        'r_o': 0.15,
+        'layers': [
+            {'name': 'コンクリート90mm', 'lamda': 1.6, 'd': 0.090, 'crho': 2000, 'is_storage_only': True},
+            {'name': '合板12mm', 'lamda': 0.16, 'd': 0.012, 'crho': 720},
+            {'name': '住宅用グラスウール断熱材16K相当', 'lamda': 0.045, 'crho': 13, 'is_insulation': True}
+        ]
+    },
+    'partition_wall': {
+        'layers': [
+            {'name': '石膏ボード', 'lamda': 0.22, 'd': 0.0125, 'crho': 830.0},
+            {'name': '空気層', 'thermal_resistance': 0.07, 'thermal_capacity': 0.0},
+            {'name': '石膏ボード', 'lamda': 0.22, 'd': 0.0125, 'crho': 830.0}
+        ]
+    },
+    'kaima_floor': {
+        'layers': [
+            {'name': '石膏ボード', 'lamda': 0.22, 'd': 0.0125, 'crho': 830.0}
+        ]
+    },
+    '2nd_floor': {
+        'layers': [
+            {'name': 'コンクリート', 'lamda': 1.6, 'd': 0.09, 'crho': 2000.0, 'is_storage_only': True},
+            {'name': '合板', 'lamda': 0.16, 'd': 0.012, 'crho': 720.0}
+        ]
+    },
+    'ground': {
+        'layers': [
+            {'name': 'コンクリート', 'thermal_resistance': 0.075, 'thermal_capacity': 227.5512}
+        ]
+    }
+}
+
+# 断熱内壁は外壁と同じ構成とする
+CONSTRUCTIONS['insulated_internal_wall'] = CONSTRUCTIONS['exterior_wall']
+
+
+def get_fixed_property(layer: dict) -> (float, float):
+    """断熱材以外の層の熱抵抗[m2･K/W]と熱容量[kJ/(m2･K)]を返す"""
+
+    if 'thermal_resistance' in layer:
+        return layer['thermal_resistance'], layer['thermal_capacity']
+
+    return layer['d'] / layer['lamda'], layer['crho'] * layer['d']
+
+
+def calc_insulation(construction: str, u_calc: np.ndarray, is_storage: np.ndarray) -> (np.ndarray, np.ndarray):
+    """部位の熱貫流率から断熱材の熱抵抗と熱容量をまとめて計算する
+
+    Args:
+        construction (str): 部位の構成（CONSTRUCTIONSのキー）
+        u_calc (np.ndarray): 部位の熱貫流率[W/(m2･K)]
+        is_storage (np.ndarray): 蓄熱の利用ありの場合True
+
+    Returns:
+        (np.ndarray, np.ndarray): 断熱材の熱抵抗[m2･K/W]、熱容量[kJ/(m2･K)]
+    """
+
+    c = CONSTRUCTIONS[construction]
+    insulation = [layer for layer in c['layers'] if layer.get('is_insulation', False)][0]
+
+    # 断熱材の熱抵抗の計算（室内側から順に差し引く）
+    r = 1.0 / u_calc - c['r_i'] - c['r_o']
+    for layer in c['layers']:
+        if layer.get('is_insulation', False):
+            continue
+        (r_layer, _) = get_fixed_property(layer)
+        if layer.get('is_storage_only', False):
+            r = r - np.where(is_storage, r_layer, 0.0)
+        else:
+            r = r - r_layer
+    r = np.maximum(r, 0.0)
+    # 断熱材の厚さの計算
+    d = r * insulation['lamda']
+    # 断熱材の熱容量の計算
+    hcap = insulation['crho'] * d
+
+    return r, hcap
+
+
+def make_layers(construction: str, u_calc=None, is_storage=False) -> list:
+    """部位の層構成をまとめて作成する
+
+    熱抵抗、熱容量が同じになるケースには同じ層構成のオブジェクトを返す。
+
+    Args:
+        construction (str): 部位の構成（CONSTRUCTIONSのキー）
+        u_calc (array_like): 部位の熱貫流率[W/(m2･K)]（断熱材のない構成では省略する）
+        is_storage (array_like): 蓄熱の利用ありの場合True
+
+    Returns:
+        list: ケースごとの層構成（LayerStack）
+    """
+
+    c = CONSTRUCTIONS[construction]
+    has_insulation = any(layer.get('is_insulation', False) for layer in c['layers'])
+
+    (u_calc, is_storage) = [
+        a.ravel() for a in np.broadcast_arrays(
+            np.asarray(1.0 if u_calc is None else u_calc, dtype=float),
+            np.asarray(is_storage, dtype=bool)
+        )
+    ]
+
+    if has_insulation:
+        (r_insulation, hcap_insulation) = [a.tolist() for a in calc_insulation(construction, u_calc, is_storage)]
+    else:
+        r_insulation = hcap_insulation = [0.0] * len(u_calc)
+
+    shared = {}
+    layers = []
+    for (r, hcap, storage) in zip(r_insulation, hcap_insulation, is_storage.tolist()):
+        key = (r, hcap, storage)
+        if key not in shared:
+            shared[key] = LayerStack([
+                Layer(
+                    name=layer['name'],
+                    thermal_resistance=r if layer.get('is_insulation', False) else get_fixed_property(layer)[0],
+                    thermal_capacity=hcap if layer.get('is_insulation', False) else get_fixed_property(layer)[1]
+                )
+                for layer in c['layers']
+                # もし、断熱なしの結果になったらlayerを削除
+                if not (layer.get('is_insulation', False) and r == 0.0)
+                and not (layer.get('is_storage_only', False) and not storage)
+            ])
+        layers.append(shared[key])
+
+    return layers
@@ -1,9 +1,14 @@
-import pandas as pd
 import numpy as np
-import copy
 import os
 import json
 
+from building_part_info import load_building_part_info
+from input_model import (
+    Room, ExternalGeneralPart, ExternalOpaquePart, ExternalTransparentPart, Ground, InternalBoundary, RearSurface, InputModel, LayerStack
+)
+from layer_table import CONSTRUCTIONS, make_layers
+from schedule_store import default_store as schedule_store
+
 def make_input_json(region: int, ua_target: float, eta_ac_target: float, eta_ah_target: float, a_env: float, is_storage: bool, operation_mode: str):
     """_summary_
 
@@ -16,56 +21,174 @@ def make_input_json(region: int, ua_target: float, eta_ac_target: float, eta_ah_
         is_storage (bool): 蓄熱の利用ありの場合True
         operation_mode (str): 'kyositu_kanketu' or 'kyositu_renzoku' or 'zenkan_renzoku'
     """
-    
-    is_cold_region = region <= 3
 
-    df_info = pd.read_excel('info_of_building_part.xlsx')
+    return make_input_json_batch(
+        region=[region],
+        ua_target=[ua_target],
+        eta_ac_target=[eta_ac_target],
+        eta_ah_target=[eta_ah_target],
+        a_env=[a_env],
+        is_storage=[is_storage],
+        operation_mode=[operation_mode]
+    )[0]
+
+def make_input_json_batch(region, ua_target, eta_ac_target, eta_ah_target, a_env, is_storage, operation_mode, return_calibration: bool = False, as_model: bool = False,
+                          response_factor_store=None) -> list:
+    """複数ケースの入力をまとめて作成する（各引数はブロードキャスト可能な配列）
+
+    Args:
+        region (array_like): 地域区分
+        ua_target (array_like): 設計住戸の目標外皮平均熱貫流率[W/(m2･K)]
+        eta_ac_target (array_like): 設計住戸の冷房期平均日射熱取得率[－]（NaNの場合は暖房期の目標値のみで窓を決める）
+        eta_ah_target (array_like): 設計住戸の暖房期平均日射熱取得率[－]（NaNの場合は冷房期の目標値のみで窓を決める）
+        a_env (array_like): 設計住戸の外皮面積の合計[m2]
+        is_storage (array_like): 蓄熱の利用ありの場合True
+        operation_mode (array_like): 'kyositu_kanketu' or 'kyositu_renzoku' or 'zenkan_renzoku'
+        return_calibration (bool): Trueの場合、calc_u_and_eta_values の計算結果も返す
+        as_model (bool): Trueの場合、辞書型の代わりに入力のモデル（InputModel）を返す（多数のケースをメモリ上に保持する場合）
+        response_factor_store (ResponseFactorStore): 指定した場合、層構成のある部位に応答係数を付ける（入力に応答係数の表'response_factors'、部位に表のキー'response_factor'）
+            （response_factor_store.pyを参照、同じ層構成の応答係数は1回だけ計算し、ケース間、部位間で共有する）
+
+    Returns:
+        list: ケースごとの辞書型またはモデル（return_calibrationがTrueの場合は計算結果の辞書型とのタプル）
+    """
+
+    (region, ua_target, eta_ac_target, eta_ah_target, a_env, is_storage, operation_mode) = [
+        a.ravel() for a in np.broadcast_arrays(
+            np.asarray(region, dtype=int),
+            np.asarray(ua_target, dtype=float),
+            np.asarray(eta_ac_target, dtype=float),
+            np.asarray(eta_ah_target, dtype=float),
+            np.asarray(a_env, dtype=float),
+            np.asarray(is_storage, dtype=bool),
+            np.asarray(operation_mode, dtype=object)
+        )
+    ]
+
+    info = load_building_part_info('info_of_building_part.xlsx')
+
+    c = calc_u_and_eta_values(
+        info=info,
+        region=region,
+        ua_target=ua_target,
+        eta_ac_target=eta_ac_target,
+        eta_ah_target=eta_ah_target,
+        a_env=a_env,
+        is_storage=is_storage
+    )
+
+    # 部位の層構成は全ケース分をまとめて計算し、同じ層構成はケース間で共有する
+    layers = make_layers_batch(
+        u_calc_wall=c['u_calc_wall'],
+        u_calc_ceil=c['u_calc_ceil'],
+        u_calc_floor=c['u_calc_floor'],
+        is_storage=is_storage
+    )
+
+    # 応答係数を付ける場合は、モデルの層構成に付けてから辞書型に変換する
+    to_model = as_model or response_factor_store is not None
+
+    input_dicts = [
+        (make_input_model if to_model else make_input_dict)(
+            region=int(region[n]),
+            is_storage=bool(is_storage[n]),
+            operation_mode=str(operation_mode[n]),
+            u_calc_wall=c['u_calc_wall'][n],
+            u_calc_ceil=c['u_calc_ceil'][n],
+            u_calc_floor=c['u_calc_floor'][n],
+            u_calc_door=c['u_calc_door'][n],
+            u_calc_window=c['u_calc_window'][n],
+            eta_c_calc_window=c['eta_calc_window'][n],
+            f_eta=c['f_eta'][n],
+            layers=layers[n]
+        ) for n in range(len(region))
+    ]
+
+    if response_factor_store is not None:
+        for model in input_dicts:
+            response_factor_store.attach(model)
+        if not as_model:
+            input_dicts = [model.to_dict() for model in input_dicts]
+
+    if return_calibration:
+        return input_dicts, c
+
+    return input_dicts
+
+def calc_u_and_eta_values(
+        info: dict,
+        region: np.ndarray,
+        ua_target: np.ndarray,
+        eta_ac_target: np.ndarray,
+        eta_ah_target: np.ndarray,
+        a_env: np.ndarray,
+        is_storage: np.ndarray
+    ) -> dict:
+    """目標UA値、ηA値を再現する各部位の熱貫流率、日射熱取得率をケースごとに一括で計算する
+
+    Args:
+        info (dict): 部位情報（info_of_building_part.xlsx、load_building_part_info を参照）
+        region (np.ndarray): 地域区分
+        ua_target (np.ndarray): 設計住戸の目標外皮平均熱貫流率[W/(m2･K)]
+        eta_ac_target (np.ndarray): 設計住戸の冷房期平均日射熱取得率[－]（NaNの場合は暖房期の目標値のみで窓を決める）
+        eta_ah_target (np.ndarray): 設計住戸の暖房期平均日射熱取得率[－]（NaNの場合は冷房期の目標値のみで窓を決める）
+        a_env (np.ndarray): 設計住戸の外皮面積の合計[m2]
+        is_storage (np.ndarray): 蓄熱の利用ありの場合True
 
-    a_env_jiritsu = df_info['部位面積（開口部面積含む）'].sum()
-    a_js = df_info['部位面積（開口部面積含む）'].to_numpy()
-    temp_coefficient_js = df_info['温度差係数'].to_numpy()
-    door_area_js = df_info['ドア（寒冷地）' if is_cold_region else 'ドア（温暖地）'].to_numpy()
-    window_area_js = df_info['窓（寒冷地）' if is_cold_region else '窓（温暖地）'].to_numpy()
+    Returns:
+        dict: 部位ごとの熱貫流率、日射熱取得率、窓面積の補正係数、目標値の担保の有無（いずれもケース数の配列）
+            eta_calc_windowは入力に用いる窓の日射熱取得率（冷房期の値、冷房期の目標値がNaNの場合は暖房期の値）
+    """
+
+    # 以降、ケースを行、部位を列とする2次元配列で計算する
+    is_cold_region = (region <= 3)[:, np.newaxis]
+
+    a_js = info['area']
+    temp_coefficient_js = info['temp_coefficient']
+    door_area_js = np.where(is_cold_region, info['door_area_cold'], info['door_area_warm'])
+    window_area_js = np.where(is_cold_region, info['window_area_cold'], info['window_area_warm'])
     # 壁体面積の計算（全体面積から開口部面積を減じる）
     wall_area_js = a_js - door_area_js - window_area_js
-    cooling_sol_correction_factor_js = df_info[str(region) + '地域冷房期取得日射補正係数'].to_numpy()
-    heating_sol_correction_factor_js = df_info[str(region) + '地域暖房期取得日射補正係数'].to_numpy()
     # 部位名称
-    building_part_name_js = df_info['部位名称']
-
-    # 方位係数の取得
-    direction_js = df_info['方位'].to_numpy()
-    (cooling_azimuthal_coefficient_js, heating_azimuthal_coefficient_js) \
-        = get_azimuth_coefficient(region=region, direction_js=direction_js)
+    building_part_name_js = info['building_part_name']
+
+    # 地域ごとの取得日射補正係数
+    cooling_sol_correction_factor_js = info['cooling_sol_correction_factor'][region - 1]
+    heating_sol_correction_factor_js = info['heating_sol_correction_factor'][region - 1]
+
+    # 地域ごとの方位係数の取得
+    direction_js = info['direction']
+    cooling_azimuthal_coefficient_js = np.zeros((len(region), len(direction_js)))
+    heating_azimuthal_coefficient_js = np.zeros((len(region), len(direction_js)))
+    for r in np.unique(region):
+        is_r = region == r
+        (cooling_azimuthal_coefficient, heating_azimuthal_coefficient) \
+            = get_azimuth_coefficient(region=r, direction_js=direction_js)
+        cooling_azimuthal_coefficient_js[is_r] = cooling_azimuthal_coefficient
+        # 8地域の暖房期の方位係数は定義されていないため、NaNとして扱う
+        heating_azimuthal_coefficient_js[is_r] = np.array(heating_azimuthal_coefficient, dtype=float)
 
     # 仕様基準における外壁、天井、床、窓・ドアの熱貫流率
-    if is_cold_region:
-        u_spec_wall = 0.35
-        u_spec_ceil = 0.17
-        u_spec_floor = 0.34
-        u_spec_door = 2.30
-        u_spec_window = 2.30
-    else:
-        u_spec_wall = 0.53
-        u_spec_ceil = 0.24
-        u_spec_floor = 0.48
-        u_spec_door = 4.70
-        u_spec_window = 4.70
-
-    # 仕様基準U値の辞書作成
+    # 仕様基準U値の辞書作成（寒冷地, 温暖地）
     d = {
-        '外壁': u_spec_wall,
-        '天井': u_spec_ceil,
-        '床': u_spec_floor,
-        'ドア': u_spec_door,
-        '窓': u_spec_window,
-        '土間': 0.0
+        '外壁': (0.35, 0.53),
+        '天井': (0.17, 0.24),
+        '床': (0.34, 0.48),
+        'ドア': (2.30, 4.70),
+        '窓': (2.30, 4.70),
+        '土間': (0.0, 0.0)
     }
+    u_spec_js = np.where(
+        is_cold_region,
+        np.array([d[name][0] for name in building_part_name_js]),
+        np.array([d[name][1] for name in building_part_name_js])
+    )
+    u_spec = {k: np.where(is_cold_region[:, 0], v[0], v[1]) for k, v in d.items()}
 
     # 仕様基準の部位U値のときのq値の計算
-    q_spec = np.sum(wall_area_js * temp_coefficient_js * np.vectorize(d.get)(building_part_name_js)) \
-            + np.sum(window_area_js * temp_coefficient_js * d['窓']) \
-            + np.sum(door_area_js * temp_coefficient_js * d['ドア'])
+    q_spec = np.sum(wall_area_js * temp_coefficient_js * u_spec_js, axis=1) \
+            + np.sum(window_area_js * temp_coefficient_js * u_spec['窓'][:, np.newaxis], axis=1) \
+            + np.sum(door_area_js * temp_coefficient_js * u_spec['ドア'][:, np.newaxis], axis=1)
 
     # 目標とするUA値のときのq値を計算する
     q_target = ua_target * a_env
@@ -74,57 +197,217 @@ def make_input_json(region: int, ua_target: float, eta_ac_target: float, eta_ah_
     f_u = q_target / q_spec
 
     # 各部位の熱貫流率を計算（上限値でアッパーを掛ける）
-    u_calc_wall = min(f_u * d['外壁'], 2.24)
-    u_calc_ceil = min(f_u * d['天井'], 4.48)
-    u_calc_floor = min(f_u * d['床'], 2.32 if is_storage else 2.67)
-    u_calc_door = min(f_u * d['ドア'], 6.51)
-    u_calc_window_dsh = min(f_u * d['窓'], 6.51)
+    u_calc_wall = np.minimum(f_u * u_spec['外壁'], 2.24)
+    u_calc_ceil = np.minimum(f_u * u_spec['天井'], 4.48)
+    u_calc_floor = np.minimum(f_u * u_spec['床'], np.where(is_storage, 2.32, 2.67))
+    u_calc_door = np.minimum(f_u * u_spec['ドア'], 6.51)
+    u_calc_window_dsh = np.minimum(f_u * u_spec['窓'], 6.51)
 
     # 不透明な部位の日射熱取得率の計算
-    eta_d_calc_wall = 0.034 * u_calc_wall
-    eta_d_calc_ceil = 0.034 * u_calc_ceil
-    eta_d_calc_floor = 0.034 * u_calc_floor
-    eta_d_calc_door = 0.034 * u_calc_door
+    eta_d_calc_wall = (0.034 * u_calc_wall)[:, np.newaxis]
+    eta_d_calc_ceil = (0.034 * u_calc_ceil)[:, np.newaxis]
+    eta_d_calc_floor = (0.034 * u_calc_floor)[:, np.newaxis]
+    eta_d_calc_door = (0.034 * u_calc_door)[:, np.newaxis]
 
     # 目標m値の計算
     m_c_target = eta_ac_target * a_env
     m_h_target = eta_ah_target * a_env
 
     # 不透明な部位のm値の計算
-    m_c_calc_opaque = np.sum(eta_d_calc_wall * a_js * cooling_azimuthal_coefficient_js) \
-                    + np.sum(eta_d_calc_ceil * a_js * cooling_azimuthal_coefficient_js) \
-                    + np.sum(eta_d_calc_floor * a_js * cooling_azimuthal_coefficient_js) \
-                    + np.sum(eta_d_calc_door * door_area_js * cooling_azimuthal_coefficient_js)
-
-    m_h_calc_opaque = np.sum(eta_d_calc_wall * a_js * heating_azimuthal_coefficient_js) \
-                    + np.sum(eta_d_calc_ceil * a_js * heating_azimuthal_coefficient_js) \
-                    + np.sum(eta_d_calc_floor * a_js * heating_azimuthal_coefficient_js) \
-                    + np.sum(eta_d_calc_door * door_area_js * heating_azimuthal_coefficient_js)
+    m_c_calc_opaque = np.sum(eta_d_calc_wall * a_js * cooling_azimuthal_coefficient_js, axis=1) \
+                    + np.sum(eta_d_calc_ceil * a_js * cooling_azimuthal_coefficient_js, axis=1) \
+                    + np.sum(eta_d_calc_floor * a_js * cooling_azimuthal_coefficient_js, axis=1) \
+                    + np.sum(eta_d_calc_door * door_area_js * cooling_azimuthal_coefficient_js, axis=1)
+
+    m_h_calc_opaque = np.sum(eta_d_calc_wall * a_js * heating_azimuthal_coefficient_js, axis=1) \
+                    + np.sum(eta_d_calc_ceil * a_js * heating_azimuthal_coefficient_js, axis=1) \
+                    + np.sum(eta_d_calc_floor * a_js * heating_azimuthal_coefficient_js, axis=1) \
+                    + np.sum(eta_d_calc_door * door_area_js * heating_azimuthal_coefficient_js, axis=1)
     # 透明な部位のm値の計算
-    m_c_calc_window = max(m_c_target - m_c_calc_opaque, 0.0)
-    m_h_calc_window = max(m_h_target - m_h_calc_opaque, 0.0)
+    m_c_calc_window = np.maximum(m_c_target - m_c_calc_opaque, 0.0)
+    m_h_calc_window = np.maximum(m_h_target - m_h_calc_opaque, 0.0)
 
     # 透明な部位の日射熱取得率の仮計算
-    eta_c_calc_window_dsh = m_c_calc_window / np.sum(window_area_js * cooling_azimuthal_coefficient_js * cooling_sol_correction_factor_js)
-    eta_h_calc_window_dsh = m_h_calc_window / np.sum(window_area_js * heating_azimuthal_coefficient_js * heating_sol_correction_factor_js)
+    eta_c_calc_window_dsh = m_c_calc_window / np.sum(window_area_js * cooling_azimuthal_coefficient_js * cooling_sol_correction_factor_js, axis=1)
+    eta_h_calc_window_dsh = m_h_calc_window / np.sum(window_area_js * heating_azimuthal_coefficient_js * heating_sol_correction_factor_js, axis=1)
 
     # 透明な部位の日射熱取得率の上限値チェック
-    eta_c_calc_window = eta_c_calc_window_dsh
-    eta_h_calc_window = eta_h_calc_window_dsh
     f_eta_c = eta_c_calc_window_dsh / 0.88
     f_eta_h = eta_h_calc_window_dsh / 0.88
-    f_eta = max(f_eta_c, f_eta_h)
-    u_calc_window = u_calc_window_dsh
-    if f_eta > 1.0:
-        # 窓の日射熱取得率を補正する
-        eta_c_calc_window = eta_c_calc_window_dsh / f_eta
-        eta_h_calc_window = eta_h_calc_window_dsh / f_eta
-        # 窓面積を補正する
-        window_area_js = window_area_js * f_eta
-
-        # UA_targetを担保できるように窓の熱貫流率を補正する
-        u_calc_window = u_calc_window_dsh / f_eta
+    # 暖房期が定義されない地域、目標値を与えない期間（NaN）はもう一方の期間の値を採用する
+    f_eta = np.fmax(f_eta_c, f_eta_h)
+    # 上限値を超える場合のみ補正する（超えない場合は1.0で除して値を変えない）
+    f_eta_over = np.where(f_eta > 1.0, f_eta, 1.0)
+    # 窓の日射熱取得率を補正する
+    eta_c_calc_window = eta_c_calc_window_dsh / f_eta_over
+    eta_h_calc_window = eta_h_calc_window_dsh / f_eta_over
+    # 入力に用いる窓の日射熱取得率（暖房期の目標値のみを与えた場合は暖房期の値）
+    eta_calc_window = np.where(np.isnan(eta_ac_target), eta_h_calc_window, eta_c_calc_window)
+    # UA_targetを担保できるように窓の熱貫流率を補正する
+    u_calc_window = u_calc_window_dsh / f_eta_over
+
+    # 目標値が担保できているかの確認（熱貫流率が上限値に達した場合、不透明部位のm値が目標値を超えた場合は担保できない）
+    is_ua_achieved = (u_calc_wall == f_u * u_spec['外壁']) & (u_calc_ceil == f_u * u_spec['天井']) \
+                    & (u_calc_floor == f_u * u_spec['床']) & (u_calc_door == f_u * u_spec['ドア']) \
+                    & (u_calc_window_dsh == f_u * u_spec['窓'])
+    is_eta_ac_achieved = m_c_target >= m_c_calc_opaque
+    is_eta_ah_achieved = m_h_target >= m_h_calc_opaque
+
+    return {
+        'u_calc_wall': u_calc_wall,
+        'u_calc_ceil': u_calc_ceil,
+        'u_calc_floor': u_calc_floor,
+        'u_calc_door': u_calc_door,
+        'u_calc_window': u_calc_window,
+        'eta_c_calc_window': eta_c_calc_window,
+        'eta_h_calc_window': eta_h_calc_window,
+        'eta_calc_window': eta_calc_window,
+        'f_eta': f_eta,
+        'is_ua_achieved': is_ua_achieved,
+        'is_eta_ac_achieved': is_eta_ac_achieved,
+        'is_eta_ah_achieved': is_eta_ah_achieved
+    }
 
+def make_layers_batch(u_calc_wall, u_calc_ceil, u_calc_floor, is_storage) -> list:
+    """複数ケースの部位の層構成をまとめて作成する（各引数はブロードキャスト可能な配列）
+
+    Args:
+        u_calc_wall (array_like): 外壁の熱貫流率[W/(m2･K)]
+        u_calc_ceil (array_like): 天井の熱貫流率[W/(m2･K)]
+        u_calc_floor (array_like): 床の熱貫流率[W/(m2･K)]
+        is_storage (array_like): 蓄熱の利用ありの場合True
+
+    Returns:
+        list: ケースごとの、部位の構成（layer_table.CONSTRUCTIONSのキー）をキーとする層構成の辞書型
+    """
+
+    (u_calc_wall, u_calc_ceil, u_calc_floor, is_storage) = [
+        a.ravel() for a in np.broadcast_arrays(
+            np.asarray(u_calc_wall, dtype=float),
+            np.asarray(u_calc_ceil, dtype=float),
+            np.asarray(u_calc_floor, dtype=float),
+            np.asarray(is_storage, dtype=bool)
+        )
+    ]
+
+    table = {
+        'exterior_wall': make_layers('exterior_wall', u_calc=u_calc_wall, is_storage=is_storage),
+        'skin_ceiling': make_layers('skin_ceiling', u_calc=u_calc_ceil, is_storage=is_storage),
+        'skin_floor': make_layers('skin_floor', u_calc=u_calc_floor, is_storage=is_storage),
+        'partition_wall': make_layers('partition_wall', is_storage=is_storage),
+        'kaima_floor': make_layers('kaima_floor', is_storage=is_storage),
+        '2nd_floor': make_layers('2nd_floor', is_storage=is_storage),
+        'ground': make_layers('ground', is_storage=is_storage)
+    }
+    # 断熱内壁は外壁と同じ構成のため、同じ層構成を用いる
+    table['insulated_internal_wall'] = table['exterior_wall']
+
+    return [{k: v[n] for k, v in table.items()} for n in range(len(is_storage))]
+
+def get_schedule_names(operation_mode: str) -> list:
+    """室ごとのスケジュール名を返す
+
+    Args:
+        operation_mode (str): 'kyositu_kanketu' or 'kyositu_renzoku' or 'zenkan_renzoku'
+
+    Returns:
+        list: スケジュール名（拡張子を除くファイル名）のリスト
+    """
+
+    return list(
+        np.array(['mor_', 'main_bed_', 'child_1_', 'child_2_', 'nor_', 'zero', 'zero', 'zero'], dtype=object)
+        + np.array([operation_mode] * 5 + [''] * 3, dtype=object)
+    )
+
+
+def make_input_dict(
+        region: int,
+        is_storage: bool,
+        operation_mode: str,
+        u_calc_wall: float,
+        u_calc_ceil: float,
+        u_calc_floor: float,
+        u_calc_door: float,
+        u_calc_window: float,
+        eta_c_calc_window: float,
+        f_eta: float,
+        layers: dict = None
+    ) -> dict:
+    """計算済みの部位の熱貫流率、日射熱取得率から入力の辞書型を返す
+
+    Args:
+        region (int): 地域区分
+        is_storage (bool): 蓄熱の利用ありの場合True
+        operation_mode (str): 'kyositu_kanketu' or 'kyositu_renzoku' or 'zenkan_renzoku'
+        u_calc_wall (float): 外壁の熱貫流率[W/(m2･K)]
+        u_calc_ceil (float): 天井の熱貫流率[W/(m2･K)]
+        u_calc_floor (float): 床の熱貫流率[W/(m2･K)]
+        u_calc_door (float): ドアの熱貫流率[W/(m2･K)]
+        u_calc_window (float): 窓の熱貫流率[W/(m2･K)]
+        eta_c_calc_window (float): 窓の日射熱取得率[－]
+        f_eta (float): 窓面積の補正係数[－]
+        layers (dict): 部位の構成をキーとする層構成（make_layers_batchの結果。省略時は熱貫流率から求める）
+
+    Returns:
+        dict: _description_
+    """
+
+    return make_input_model(
+        region=region,
+        is_storage=is_storage,
+        operation_mode=operation_mode,
+        u_calc_wall=u_calc_wall,
+        u_calc_ceil=u_calc_ceil,
+        u_calc_floor=u_calc_floor,
+        u_calc_door=u_calc_door,
+        u_calc_window=u_calc_window,
+        eta_c_calc_window=eta_c_calc_window,
+        f_eta=f_eta,
+        layers=layers
+    ).to_dict()
+
+def make_input_model(
+        region: int,
+        is_storage: bool,
+        operation_mode: str,
+        u_calc_wall: float,
+        u_calc_ceil: float,
+        u_calc_floor: float,
+        u_calc_door: float,
+        u_calc_window: float,
+        eta_c_calc_window: float,
+        f_eta: float,
+        layers: dict = None
+    ) -> InputModel:
+    """計算済みの部位の熱貫流率、日射熱取得率から入力のモデルを返す
+
+    室、部位、層はスロット付きのオブジェクトとし、隣室側の部位は表側の部位と層構成を共有する（InputModel.to_dictで辞書型に変換する）。
+
+    Args:
+        region (int): 地域区分
+        is_storage (bool): 蓄熱の利用ありの場合True
+        operation_mode (str): 'kyositu_kanketu' or 'kyositu_renzoku' or 'zenkan_renzoku'
+        u_calc_wall (float): 外壁の熱貫流率[W/(m2･K)]
+        u_calc_ceil (float): 天井の熱貫流率[W/(m2･K)]
+        u_calc_floor (float): 床の熱貫流率[W/(m2･K)]
+        u_calc_door (float): ドアの熱貫流率[W/(m2･K)]
+        u_calc_window (float): 窓の熱貫流率[W/(m2･K)]
+        eta_c_calc_window (float): 窓の日射熱取得率[－]
+        f_eta (float): 窓面積の補正係数[－]
+        layers (dict): 部位の構成をキーとする層構成（make_layers_batchの結果。省略時は熱貫流率から求める）
+
+    Returns:
+        InputModel: 入力のモデル
+    """
+
+    is_cold_region = region <= 3
+    if layers is None:
+        layers = make_layers_batch(
+            u_calc_wall=u_calc_wall,
+            u_calc_ceil=u_calc_ceil,
+            u_calc_floor=u_calc_floor,
+            is_storage=is_storage
+        )[0]
     # common辞書の作成
     common = make_common(region=region)
     # building辞書の作成
@@ -137,12 +420,9 @@ def make_input_json(region: int, ua_target: float, eta_ac_target: float, eta_ah_
     # 室気積（家具熱容量を含む）
     volume = np.array([811.88, 364.04, 295.70, 295.81, 1541.20, 282.07, 699.62, 378.06])
     # スケジュール名
-    schedule_name = np.array(['mor_', 'main_bed_', 'child_1_', 'child_2_', 'nor_', 'zero', 'zero', 'zero'], dtype=object) \
-            + np.array([operation_mode] * 5 + [''] * 3, dtype=object)
-    schedule_json = []
-    for name in schedule_name:
-        with open('schedule/' + name + '.json') as f:
-            schedule_json.append(json.load(f))
+    schedule_name = get_schedule_names(operation_mode=operation_mode)
+    # スケジュールは読み込み済みのものを部屋間、ケース間で共有する
+    schedule_json = schedule_store.get_many(schedule_name)
     # 集約した部屋間の熱容量（家具の熱容量として計上）
     internal_thermal_capacity = np.array([113295.0, 0.001, 0.001, 0.001, 1237844.0, 0.001, 0.001, 0.001])
     room = [make_room(i, room_name[i], floor_area[i], volume[i], internal_thermal_capacity[i], schedule_json[i]) for i in range(len(room_name))]
@@ -153,7 +433,7 @@ def make_input_json(region: int, ua_target: float, eta_ac_target: float, eta_ah_
     else:
         area = np.array([14.45, 9.09, 3.77, 8.39, 15.17, 7.43, 4.36, 8.77, 19.7, 39.02, 2.73, 4.78, 0.25, 1.37])
     direction = np.array(['e', 's', 'n', 'e', 's', 'w', 'e', 's', 'w', 'n', 'e', 's', 'w', 'n'])
-    exterior_wall = [make_dictionary_for_exterior_wall(i, connected_room_id[i], area[i], direction[i], u_calc_wall) for i in range(len(area))]
+    exterior_wall = [make_exterior_wall(i, connected_room_id[i], area[i], direction[i], u_calc_wall, layers['exterior_wall']) for i in range(len(area))]
     # 不透明な開口部
     connected_room_id = np.array([4, 4, 6], dtype='int')
     if is_cold_region:
@@ -162,7 +442,7 @@ def make_input_json(region: int, ua_target: float, eta_ac_target: float, eta_ah_
         area = np.array([1.89, 1.62, 67.9])
     u_value_opaque_part = np.array([u_calc_door, u_calc_door, 4.51])
     direction = np.array(['w', 'n', 'top'])
-    opaque_part = [make_dictionary_for_door(i + 16, connected_room_id[i], area[i], direction[i], u_value_opaque_part[i]) for i in range(len(area))]
+    opaque_part = [make_door(i + 16, connected_room_id[i], area[i], direction[i], u_value_opaque_part[i]) for i in range(len(area))]
     # 透明な開口部
     if is_cold_region:
         connected_room_id = np.array([4, 0, 0, 0, 0, 4, 4, 4, 4, 1, 2, 3, 3, 1, 4, 4], dtype='int')
@@ -179,7 +459,7 @@ def make_input_json(region: int, ua_target: float, eta_ac_target: float, eta_ah_
     solar_shading_depth = np.array([0.3, 0.91, 0.91, 0, 0, 0, 0, 0, 0, 0.65, 0.65, 0.65, 0, 0, 0, 0, 0])
     solar_shadeing_d_e = np.array([0.6, 0.48, 0.48, 0, 0, 0, 0, 0, 0, 0.45, 0.45, 0.45, 0, 0, 0, 0, 0])
     solar_shading_part = [{'existence': solar_shading_existence[i], "input_method": "simple", 'depth': solar_shading_depth[i], 'd_h': solar_shading_d_h[i], 'd_e': solar_shadeing_d_e[i]} for i in range(len(area))]
-    transparent_part = [make_dictionary_for_window(i + 19, connected_room_id[i], area[i] * f_eta, direction[i], u_calc_window, eta_c_calc_window, solar_shading_part[i]) for i in range(len(area))]
+    transparent_part = [make_window(i + 19, connected_room_id[i], area[i] * f_eta, direction[i], u_calc_window, eta_c_calc_window, solar_shading_part[i]) for i in range(len(area))]
 
     # 内壁の作成
     # 2階床
@@ -188,7 +468,7 @@ def make_input_json(region: int, ua_target: float, eta_ac_target: float, eta_ah_
     connected_room_id = np.array([1, 2, 3], dtype='int')
     rear_connected_room_id = np.array([5, 5, 5], dtype='int')
     area = np.array([13.25, 10.76, 10.77])
-    second_floor = [d for i in range(len(area)) for d in make_dictionary_2nd_floor(part_id[i], connected_room_id[i], rear_connected_room_id[i], area[i], rear_part_id[i], is_storage)]
+    second_floor = [d for i in range(len(area)) for d in make_2nd_floor(part_id[i], connected_room_id[i], rear_connected_room_id[i], area[i], rear_part_id[i], is_storage, layers['2nd_floor'])]
 
     # 外壁
     part_id = np.array([40, 70, 78, 80], dtype='int')
@@ -196,58 +476,52 @@ def make_input_json(region: int, ua_target: float, eta_ac_target: float, eta_ah_
     connected_room_id = np.array([0, 4, 4, 6], dtype='int')
     rear_connected_room_id = np.array([6, 6, 7, 5], dtype='int')
     area = np.array([0.34, 3.21, 0.63, 4.3])
-    insulated_internal_wall = [d for i in range(len(area)) for d in make_dictionary_for_insulated_internal_wall(part_id[i], connected_room_id[i], rear_connected_room_id[i], area[i], rear_part_id[i], u_calc_wall)]
+    insulated_internal_wall = [d for i in range(len(area)) for d in make_insulated_internal_wall(part_id[i], connected_room_id[i], rear_connected_room_id[i], area[i], rear_part_id[i], u_calc_wall, layers['insulated_internal_wall'])]
     # 外壁床
     part_id = np.array([44, 76], dtype='int')
     rear_part_id = np.array([45, 77], dtype='int')
     connected_room_id = np.array([0, 4], dtype='int')
     rear_connected_room_id = np.array([7, 7], dtype='int')
     area = np.array([29.81, 35.61])
-    insulated_internal_floor = [d for i in range(len(area)) for d in make_dictionary_for_skin_floor(part_id[i], connected_room_id[i], rear_connected_room_id[i], area[i], rear_part_id[i], u_calc_floor, is_storage)]
+    insulated_internal_floor = [d for i in range(len(area)) for d in make_skin_floor(part_id[i], connected_room_id[i], rear_connected_room_id[i], area[i], rear_part_id[i], u_calc_floor, is_storage, layers['skin_floor'])]
     # 階間床
     part_id = np.array([42, 72], dtype='int')
     rear_part_id = np.array([43, 73], dtype='int')
     connected_room_id = np.array([0, 5], dtype='int')
     rear_connected_room_id = np.array([5, 4], dtype='int')
     area = np.array([25.67, 38.1])
-    kaima_floor = [d for i in range(len(area)) for d in make_dictionary_for_kaima_floor(part_id[i], connected_room_id[i], rear_connected_room_id[i], area[i], rear_part_id[i])]
+    kaima_floor = [d for i in range(len(area)) for d in make_kaima_floor(part_id[i], connected_room_id[i], rear_connected_room_id[i], area[i], rear_part_id[i], layers['kaima_floor'])]
     # 間仕切壁
     part_id = np.array([36, 46, 48, 54, 56, 62, 74], dtype='int')
     rear_part_id = np.array([37, 47, 49, 55, 57, 63, 75], dtype='int')
     connected_room_id = np.array([0, 1, 1, 2, 2, 3, 4], dtype='int')
     rear_connected_room_id = np.array([4, 2, 4, 3, 4, 4, 5], dtype='int')
     area = np.array([25.84, 8.74, 8.73, 8.74, 7.09, 7.1, 2.51])
-    partition_wall = [d for i in range(len(area)) for d in make_dictionary_for_partition_wall(part_id[i], connected_room_id[i], rear_connected_room_id[i], area[i], rear_part_id[i])]
+    partition_wall = [d for i in range(len(area)) for d in make_partition_wall(part_id[i], connected_room_id[i], rear_connected_room_id[i], area[i], rear_part_id[i], layers['partition_wall'])]
     # 天井
     part_id = np.array([38, 50, 58, 64, 68], dtype='int')
     rear_part_id = np.array([39, 51, 59, 65, 69], dtype='int')
     connected_room_id = np.array([0, 1, 2, 3, 4], dtype='int')
     rear_connected_room_id = np.array([6, 6, 6, 6, 6], dtype='int')
     area = np.array([4.14, 13.25, 10.76, 10.77, 28.99])
-    ceil = [d for i in range(len(area)) for d in make_dictionary_for_skin_ceiling(part_id[i], connected_room_id[i], rear_connected_room_id[i], area[i], rear_part_id[i], u_calc_ceil)]
+    ceil = [d for i in range(len(area)) for d in make_skin_ceiling(part_id[i], connected_room_id[i], rear_connected_room_id[i], area[i], rear_part_id[i], u_calc_ceil, layers['skin_ceiling'])]
 
     # 土壌
     part_id = np.array([82, 83], dtype='int')
     connected_room_id = np.array([4, 7], dtype='int')
     area = np.array([2.48, 66.05])
-    ground_part = [make_dictionary_for_ground(part_id[i], connected_room_id[i], area[i]) for i in range(len(area))]
+    ground_part = [make_ground(part_id[i], connected_room_id[i], area[i], layers['ground']) for i in range(len(area))]
 
     # 機械換気の設定
     mechanical_ventilation = make_mechanical_ventiration()
 
-    return {
-        "common": common,
-        "building": building,
-        "rooms": room,
-        "boundaries": exterior_wall + opaque_part + transparent_part + second_floor + insulated_internal_wall + insulated_internal_floor + kaima_floor + partition_wall + ceil + ground_part,
-        "mechanical_ventilations": mechanical_ventilation,
-        "equipments": {
-            "heating_equipments": {
-            },
-            "cooling_equipments": {
-            }
-        }
-    }
+    return InputModel(
+        common=common,
+        building=building,
+        rooms=room,
+        boundaries=exterior_wall + opaque_part + transparent_part + second_floor + insulated_internal_wall + insulated_internal_floor + kaima_floor + partition_wall + ceil + ground_part,
+        mechanical_ventilations=mechanical_ventilation
+    )
 
 def get_azimuth_coefficient(region: int, direction_js: np.ndarray) -> (np.ndarray, np.ndarray):
     """方位係数を取得する
@@ -346,8 +620,8 @@ def make_room(
         volume: float,
         heatcap_of_internal: float,
         schedule_json: dict
-    ) -> dict:
-    """room部の辞書型を返す
+    ) -> Room:
+    """room部のモデルを返す
 
     Args:
         id (int): 部屋ID
@@ -358,38 +632,29 @@ def make_room(
         schedule_json (str): スケジュール名
 
     Returns:
-        dict: _description_
+        Room: 室
     """
 
-    return {
-        "id": id,
-        "name": name,
-        "sub_name": name,
-        "floor_area": floor_area,
-        "volume": volume,
-        "ventilation": {
-            "natural": 0.0
-        },
-        "furniture": {
-            "input_method": "specify",
-            "heat_capacity": heatcap_of_internal,
-            "heat_cond": heatcap_of_internal * 0.00022,
-            "moisture_capacity": 0.0,
-            "moisture_cond": 1.0
-        },
-        "schedule": schedule_json
-    }
+    return Room(
+        id=id,
+        name=name,
+        floor_area=floor_area,
+        volume=volume,
+        heat_capacity=heatcap_of_internal,
+        schedule=schedule_json
+    )
 
-def make_dictionary_for_exterior_wall(
+def make_exterior_wall(
         id: int,
         connected_room_id: int,
         area: float,
         direction: str,
-        u_calc: float
-        ) -> dict:
+        u_calc: float,
+        layers: LayerStack = None
+        ) -> ExternalGeneralPart:
     """
 
-        部位の熱貫流率から外壁要素の辞書型を返す
+        部位の熱貫流率から外壁要素のモデルを返す
 
     Args:
         id (int): 部位ID
@@ -397,110 +662,51 @@ def make_dictionary_for_exterior_wall(
         area (float): 面積[m2]
         direction (str): 方位
         u_calc (float): 部位の熱貫流率[W/(m2･K)]
+        layers (LayerStack): 層構成（layer_table.make_layersの結果。省略時は熱貫流率から求める）
 
     Returns:
-        dict: _description_
+        ExternalGeneralPart: 外壁
     """
     
-    R_i = 0.11
-    R_o = 0.04
-    # 石膏ボード10mm
-    lamda_1 = 0.24
-    d_1 = 0.010
-    crho_1 = 830
-    R_1 = d_1 / lamda_1
-    hcap_1 = crho_1 * d_1
-    # 中空層
-    R_2 = 0.09
-    hcap_2 = 0.0
-    # 住宅用グラスウール断熱材16K相当
-    lamda_3 = 0.045
-    crho_3 = 13
-    # 合板　12mm
-    lamda_4 = 0.16
-    d_4 = 0.012
-    crho_4 = 720
-    R_4 = d_4 / lamda_4
-    hcap_4 = crho_4 * d_4
-    # 木片セメント板　13mm
-    d_5 = 0.013
-    lamda_5 = 0.15
-    crho_5 = 1000.0
-    R_5 = d_5 / lamda_5
-    hcap_5 = d_5 * crho_5
-
-    # 断熱材の熱抵抗の計算
-    R_3 = max(1.0 / u_calc - R_i - R_o - R_1 - R_2 - R_4 - R_5, 0.0)
-    # 断熱材の厚さの計算
-    d_3 = R_3 * lamda_3
-    # 断熱材の熱容量の計算
-    hcap_3 = crho_3 * d_3
-
-    # dictionary要素の作成
-    dictionary = [
-        {
-            "name": "石膏ボード10mm",
-            "thermal_resistance": R_1,
-            "thermal_capacity": hcap_1
-        },
-        {
-            "name": "中空層",
-            "thermal_resistance": R_2,
-            "thermal_capacity": hcap_2
-        },
-        {
-            "name": "住宅用グラスウール断熱材16K相当",
-            "thermal_resistance": R_3,
-            "thermal_capacity": hcap_3
-        },
-        {
-            "name": "合板12mm",
-            "thermal_resistance": R_4,
-            "thermal_capacity": hcap_4
-        },
-        {
-            "name": "木片セメント板13mm",
-            "thermal_resistance": R_5,
-            "thermal_capacity": hcap_5
-        }
-        ]
-    
-    # もし、断熱なしの結果になったらlayerを削除
-    if R_3 == 0.0:
-        del dictionary[2]
-
-    return {
-        "id": id,
-        "name": "外壁",
-        "sub_name": "外壁",
-        "connected_room_id": connected_room_id,
-        "boundary_type": "external_general_part",
-        "area": area,
-        "is_sun_striked_outside": True,
-        "temp_dif_coef": 1.0,
-        "is_solar_absorbed_inside": True,
-        "is_floor": False,
-        "direction": direction,
-        "h_c": 2.5,
-        "outside_emissivity": 0.9,
-        "outside_heat_transfer_resistance": R_o,
+    R_o = CONSTRUCTIONS['exterior_wall']['r_o']
+
+    # 層構成の作成（省略時は熱貫流率から求める）
+    if layers is None:
+        layers = make_layers('exterior_wall', u_calc=u_calc)[0]
+
+    return ExternalGeneralPart(
+        id=id,
+        name="外壁",
+        sub_name="外壁",
+        connected_room_id=connected_room_id,
+        boundary_type="external_general_part",
+        area=area,
+        is_sun_striked_outside=True,
+        temp_dif_coef=1.0,
+        is_solar_absorbed_inside=True,
+        is_floor=False,
+        direction=direction,
+        h_c=2.5,
+        outside_emissivity=0.9,
+        outside_heat_transfer_resistance=R_o,
         
-        "outside_solar_absorption": 0.8,
-        "layers": dictionary,
-        "solar_shading_part": {
+        outside_solar_absorption=0.8,
+        layers=layers,
+        solar_shading_part={
             "existence": False
         }
-    }
+    )
 
-def make_dictionary_for_skin_ceiling(
+def make_skin_ceiling(
         id: int,
         connected_room_id: int,
         rear_connected_room_id: int,
         area: float,
         rear_surface_boundary_id: int,
-        u_calc: float
-        ) -> dict:
-    """部位の熱貫流率から天井要素の辞書型を返す
+        u_calc: float,
+        layers: LayerStack = None
+        ) -> (InternalBoundary, RearSurface):
+    """部位の熱貫流率から天井要素のモデルを返す
 
     Args:
         id (int): 部位ID
@@ -509,106 +715,46 @@ def make_dictionary_for_skin_ceiling(
         area (float): 面積[m2]
         rear_surface_boundary_id (int): 隣室側の部位ID
         u_calc (float): 部位の熱貫流率
+        layers (LayerStack): 層構成（layer_table.make_layersの結果。省略時は熱貫流率から求める）
 
     Returns:
-        dict: _description_
+        (InternalBoundary, RearSurface): 天井（表側）、隣室側の床
     """
     
-    R_i = 0.09
-    R_o = 0.09
-    # 石膏ボード10mm
-    lamda_1 = 0.24
-    d_1 = 0.010
-    crho_1 = 830
-    R_1 = d_1 / lamda_1
-    hcap_1 = crho_1 * d_1
-    # 住宅用グラスウール断熱材10K相当
-    lamda_2 = 0.05
-    crho_2 = 8
-
-    # 断熱材の熱抵抗の計算
-    R_2 = max(1.0 / u_calc - R_i - R_o - R_1, 0.0)
-    # 断熱材の厚さの計算
-    d_2 = R_2 * lamda_2
-    # 断熱材の熱容量の計算
-    hcap_2 = crho_2 * d_2
-
-    # dictionary要素の作成
-    dictionary = [
-        {
-            "name": "石膏ボード10mm",
-            "thermal_resistance": R_1,
-            "thermal_capacity": hcap_1
-        },
-        {
-            "name": "住宅用グラスウール断熱材10K相当",
-            "thermal_resistance": R_2,
-            "thermal_capacity": hcap_2
-        }
-        ]
-    
-    # もし、断熱なしの結果になったらlayerを削除
-    if R_2 == 0.0:
-        del dictionary[1]
-    
-    ceil_part = {
-        "id": id,
-        "name": "天井",
-        "sub_name": "天井",
-        "connected_room_id": connected_room_id,
-        "boundary_type": "internal",
-        "area": area,
-        "rear_surface_boundary_id": rear_surface_boundary_id,
-        "is_solar_absorbed_inside": True,
-        "is_floor": False,
-        "h_c": 5.0,
-        "layers": dictionary,
-        "solar_shading_part": {
+    # 層構成の作成（省略時は熱貫流率から求める）
+    if layers is None:
+        layers = make_layers('skin_ceiling', u_calc=u_calc)[0]
+
+    ceil_part = InternalBoundary(
+        id=id,
+        name="天井",
+        sub_name="天井",
+        connected_room_id=connected_room_id,
+        boundary_type="internal",
+        area=area,
+        rear_surface_boundary_id=rear_surface_boundary_id,
+        is_solar_absorbed_inside=True,
+        is_floor=False,
+        h_c=5.0,
+        layers=layers,
+        solar_shading_part={
             "existence": False
         }
-    }
-
-    return ceil_part, \
-        reverse_dictionary_for_skin_ceiling(
-            connected_room_id=rear_connected_room_id,
-            d=copy.deepcopy(ceil_part)
-            )
-
-def reverse_dictionary_for_skin_ceiling(
-        connected_room_id: int,
-        d: dict
-        ) -> dict:
-    """天井のdictionaryの層の順序を入れ替える（隣室側の定義用）
+    )
 
-    Args:
-        connected_room_id (int): 隣接する部屋ID
-        d (dict): _description_
-    """
+    return ceil_part, ceil_part.rear(connected_room_id=rear_connected_room_id, is_floor=True)
 
-    id = d['id']
-    rear_surface_boundary_id = d['rear_surface_boundary_id']
-    dictionary = d['layers']
-    del d['layers']
-    dictionary.reverse()
-    d['layers'] = dictionary
-    d['is_floor'] = True
-    d["id"] = rear_surface_boundary_id
-    d["rear_surface_boundary_id"] = id
-    d['h_c'] = 5.0
-    d['connected_room_id'] = connected_room_id
-
-    return d
-
-def make_dictionary_for_skin_floor(
+def make_skin_floor(
         id: int,
         connected_room_id: int,
         rear_connected_room_id: int,
         area: float,
         rear_surface_boundary_id: int,
         u_calc: float,
-        is_storage: bool
-        ) -> dict:
-    """部位の熱貫流率から床要素の辞書型を返す
+        is_storage: bool,
+        layers: LayerStack = None
+        ) -> (InternalBoundary, RearSurface):
+    """部位の熱貫流率から床要素のモデルを返す
 
     Args:
         id (int): 部位ID
@@ -618,110 +764,36 @@ def make_dictionary_for_skin_floor(
         rear_surface_boundary_id (int): 隣室側の部位ID
         u_calc (float): 部位の熱貫流率
         is_storage(bool): 蓄熱ありの場合True
+        layers (LayerStack): 層構成（layer_table.make_layersの結果。省略時は熱貫流率から求める）
 
     Returns:
-        dict: _description_
+        (InternalBoundary, RearSurface): 床（表側）、隣室側の天井
     """
     
-    R_i = 0.15
-    R_o = 0.15
-    # コンクリート90mm（is_storage==Trueのときのみ）
-    lamda_1 = 1.6
-    d_1 = 0.090 if is_storage else 0.0
-    crho_1 = 2000
-    R_1 = d_1 / lamda_1
-    hcap_1 = crho_1 * d_1
-    # 合板12mm
-    lamda_2 = 0.16
-    d_2 = 0.012
-    crho_2 = 720
-    R_2 = d_2 / lamda_2
-    hcap_2 = crho_2 * d_2
-    # 住宅用グラスウール断熱材16K相当
-    lamda_3 = 0.045
-    crho_3 = 13
-
-    # 断熱材の熱抵抗の計算
-    R_3 = max(1.0 / u_calc - R_i - R_o - R_1 - R_2, 0.0)
-    # 断熱材の厚さの計算
-    d_3 = R_3 * lamda_3
-    # 断熱材の熱容量の計算
-    hcap_3 = crho_3 * d_3
-
-    # dictionary要素の作成
-    dictionary = [
-        {
-            "name": "コンクリート90mm",
-            "thermal_resistance": R_1,
-            "thermal_capacity": hcap_1
-        },
-        {
-            "name": "合板12mm",
-            "thermal_resistance": R_2,
-            "thermal_capacity": hcap_2
-        },
-        {
-            "name": "住宅用グラスウール断熱材16K相当",
-            "thermal_resistance": R_3,
-            "thermal_capacity": hcap_3
-        }
-        ]
-    
-    # もし、断熱なしの結果になったらlayerを削除
-    if R_3 == 0.0:
-        del dictionary[2]
-    if R_1 == 0.0:
-        del dictionary[0]
-    
-    floor_part = {
-        "id": id,
-        "name": "床",
-        "sub_name": "床",
-        "connected_room_id": connected_room_id,
-        "boundary_type": "internal",
-        "area": area,
-        "rear_surface_boundary_id": rear_surface_boundary_id,
-        "is_solar_absorbed_inside": True,
-        "is_floor": True,
-        "h_c": 0.7,
-        "layers": dictionary,
-        "solar_shading_part": {
+    # 層構成の作成（省略時は熱貫流率から求める）
+    if layers is None:
+        layers = make_layers('skin_floor', u_calc=u_calc, is_storage=is_storage)[0]
+
+    floor_part = InternalBoundary(
+        id=id,
+        name="床",
+        sub_name="床",
+        connected_room_id=connected_room_id,
+        boundary_type="internal",
+        area=area,
+        rear_surface_boundary_id=rear_surface_boundary_id,
+        is_solar_absorbed_inside=True,
+        is_floor=True,
+        h_c=0.7,
+        layers=layers,
+        solar_shading_part={
             "existence": False
         }
-    }
-
-    return floor_part, \
-        reverse_dictionary_for_skin_floor(
-            connected_room_id=rear_connected_room_id,
-            d=copy.deepcopy(floor_part)
-            )
-
-def reverse_dictionary_for_skin_floor(
-        connected_room_id: int,
-        d: dict
-        ) -> dict:
-    """床のdictionaryの層の順序を入れ替える（隣室側の定義用）
+    )
 
-    Args:
-        connected_room_id (int): 隣接する部屋ID
-        d (dict): _description_
-    """
+    return floor_part, floor_part.rear(connected_room_id=rear_connected_room_id, is_floor=False)
 
-    id = d['id']
-    rear_surface_boundary_id = d['rear_surface_boundary_id']
-    dictionary = d['layers']
-    del d['layers']
-    dictionary.reverse()
-    d['layers'] = dictionary
-    d['is_floor'] = False
-    d["id"] = rear_surface_boundary_id
-    d["rear_surface_boundary_id"] = id
-    d['h_c'] = 0.7
-    d['connected_room_id'] = connected_room_id
-
-    return d
-
-def make_dictionary_for_window(
+def make_window(
         id: int,
         connected_room_id: int,
         area: float,
@@ -729,8 +801,8 @@ def make_dictionary_for_window(
         u_calc: float,
         eta_calc: float,
         solar_shading_part: dict
-        ) -> dict:
-    """部位の熱貫流率、日射熱取得率から窓要素の辞書型を返す
+        ) -> ExternalTransparentPart:
+    """部位の熱貫流率、日射熱取得率から窓要素のモデルを返す
 
     Args:
         id (int): 部位ID
@@ -742,43 +814,43 @@ def make_dictionary_for_window(
         solar_shading_part (dict): 日射遮蔽部位の辞書型
 
     Returns:
-        dict: _description_
+        ExternalTransparentPart: 窓
     """
 
     R_i = 0.11
     R_o = 0.04
 
-    return {
-        "id": id,
-        "name": "窓",
-        "sub_name": "窓",
-        "connected_room_id": connected_room_id,
-        "boundary_type": "external_transparent_part",
-        "area": area,
-        "is_sun_striked_outside": True,
-        "temp_dif_coef": 1.0,
-        "is_solar_absorbed_inside": True,
-        "is_floor": False,
-        "direction": direction,
-        "h_c": 2.5,
-        "outside_emissivity": 0.9,
-        "outside_heat_transfer_resistance": R_o,
-        "u_value": u_calc,
-        "inside_heat_transfer_resistance": R_i,
-        "eta_value": eta_calc,
-        "incident_angle_characteristics": "multiple",
-        "glass_area_ratio": 1.0,
-        "solar_shading_part": solar_shading_part
-    }
+    return ExternalTransparentPart(
+        id=id,
+        name="窓",
+        sub_name="窓",
+        connected_room_id=connected_room_id,
+        boundary_type="external_transparent_part",
+        area=area,
+        is_sun_striked_outside=True,
+        temp_dif_coef=1.0,
+        is_solar_absorbed_inside=True,
+        is_floor=False,
+        direction=direction,
+        h_c=2.5,
+        outside_emissivity=0.9,
+        outside_heat_transfer_resistance=R_o,
+        u_value=u_calc,
+        inside_heat_transfer_resistance=R_i,
+        eta_value=eta_calc,
+        incident_angle_characteristics="multiple",
+        glass_area_ratio=1.0,
+        solar_shading_part=solar_shading_part
+    )
 
-def make_dictionary_for_door(
+def make_door(
         id: int,
         connected_room_id: int,
         area: float,
         direction: str,
         u_calc: float
-        ) -> dict:
-    """部位の熱貫流率からドア要素の辞書型を返す
+        ) -> ExternalOpaquePart:
+    """部位の熱貫流率からドア要素のモデルを返す
 
     Args:
         id (int): 部位ID
@@ -788,40 +860,40 @@ def make_dictionary_for_door(
         u_calc (float): 熱貫流率[W/(m2･K)]
 
     Returns:
-        dict: _description_
+        ExternalOpaquePart: ドア
     """
 
     R_i = 0.11
     R_o = 0.04
 
-    return {
-        "id": id,
-        "name": "ドア",
-        "sub_name": "ドア",
-        "connected_room_id": connected_room_id,
-        "boundary_type": "external_opaque_part",
-        "area": area,
-        "is_sun_striked_outside": True,
-        "temp_dif_coef": 1.0,
-        "is_solar_absorbed_inside": True,
-        "is_floor": False,
-        "direction": direction,
-        "h_c": 2.5,
-        "outside_emissivity": 0.9,
-        "outside_heat_transfer_resistance": R_o,
-        "u_value": u_calc,
-        "inside_heat_transfer_resistance": R_i,
-        "outside_solar_absorption": 0.8,
-        "solar_shading_part": {
+    return ExternalOpaquePart(
+        id=id,
+        name="ドア",
+        sub_name="ドア",
+        connected_room_id=connected_room_id,
+        boundary_type="external_opaque_part",
+        area=area,
+        is_sun_striked_outside=True,
+        temp_dif_coef=1.0,
+        is_solar_absorbed_inside=True,
+        is_floor=False,
+        direction=direction,
+        h_c=2.5,
+        outside_emissivity=0.9,
+        outside_heat_transfer_resistance=R_o,
+        u_value=u_calc,
+        inside_heat_transfer_resistance=R_i,
+        outside_solar_absorption=0.8,
+        solar_shading_part={
             "existence": False
         }
-    }
+    )
 
-def make_dictionary_for_roof(
+def make_roof(
         id: int,
         connected_room_id: int,
         area: float
-        ) -> dict:
+        ) -> ExternalOpaquePart:
     """_summary_
 
     Args:
@@ -830,81 +902,78 @@ def make_dictionary_for_roof(
         area (float): 面積[m2]
 
     Returns:
-        dict: _description_
+        ExternalOpaquePart: 屋根
     """
 
     R_i = 0.09
     R_o = 0.04
 
-    return {
-        "id": id,
-        "name": "屋根",
-        "sub_name": "屋根",
-        "connected_room_id": connected_room_id,
-        "boundary_type": "external_opaque_part",
-        "area": area,
-        "is_sun_striked_outside": True,
-        "temp_dif_coef": 1.0,
-        "is_solar_absorbed_inside": True,
-        "is_floor": False,
-        "direction": "top",
-        "h_c": 5.0,
-        "outside_emissivity": 0.9,
-        "outside_heat_transfer_resistance": R_o,
-        "u_value": 4.51,
-        "inside_heat_transfer_resistance": R_i,
-        "outside_solar_absorption": 0.8,
-        "solar_shading_part": {
+    return ExternalOpaquePart(
+        id=id,
+        name="屋根",
+        sub_name="屋根",
+        connected_room_id=connected_room_id,
+        boundary_type="external_opaque_part",
+        area=area,
+        is_sun_striked_outside=True,
+        temp_dif_coef=1.0,
+        is_solar_absorbed_inside=True,
+        is_floor=False,
+        direction="top",
+        h_c=5.0,
+        outside_emissivity=0.9,
+        outside_heat_transfer_resistance=R_o,
+        u_value=4.51,
+        inside_heat_transfer_resistance=R_i,
+        outside_solar_absorption=0.8,
+        solar_shading_part={
             "existence": False
         }
-    }
+    )
 
-def make_dictionary_for_ground(
+def make_ground(
         id: int,
         connected_room_id: int,
-        area: float
-        ) -> dict:
-    """土間床中央部の辞書型を返す
+        area: float,
+        layers: LayerStack = None
+        ) -> Ground:
+    """土間床中央部のモデルを返す
 
     Args:
         id (int): 部位ID
         connected_room_id (int): 隣接する部屋ID
         area (float): 面積[m2]
+        layers (LayerStack): 層構成（layer_table.make_layersの結果。省略時は既定の構成）
 
     Returns:
-        dict: _description_
+        Ground: 土間床
     """
 
-    return {
-        "id": id,
-        "name": "土間",
-        "sub_name": "土間",
-        "connected_room_id": connected_room_id,
-        "boundary_type": "ground",
-        "area": area,
-        "is_solar_absorbed_inside": True,
-        "is_floor": True,
-        "h_c": 0.7,
-        "layers": [
-            {
-            "name": "コンクリート",
-            "thermal_resistance": 0.075,
-            "thermal_capacity": 227.5512
-            }
-        ],
-        "solar_shading_part": {
+    return Ground(
+        id=id,
+        name="土間",
+        sub_name="土間",
+        connected_room_id=connected_room_id,
+        boundary_type="ground",
+        area=area,
+        is_solar_absorbed_inside=True,
+        is_floor=True,
+        h_c=0.7,
+        layers=make_layers('ground')[0] if layers is None else layers,
+        solar_shading_part={
             "existence": False
         }
-    }
+    )
 
-def make_dictionary_for_partition_wall(
+def make_partition_wall(
         id: int,
         connected_room_id: int,
         rear_connected_room_id: int,
         area: float,
-        rear_surface_boundary_id: int
-        ) -> dict:
-    """間仕切壁の辞書型を返す
+        rear_surface_boundary_id: int,
+        layers: LayerStack = None
+        ) -> (InternalBoundary, RearSurface):
+    """間仕切壁のモデルを返す
 
     Args:
         id (int): 部位ID
@@ -912,80 +981,38 @@ def make_dictionary_for_partition_wall(
         rear_connected_room_id (int): 隣接する部屋ID（隣室側）
         area (float): 面積[m2]
         rear_surface_boundary_id (int): 隣室側の部位ID
+        layers (LayerStack): 層構成（layer_table.make_layersの結果。省略時は既定の構成）
 
     Returns:
-        dict: _description_
+        (InternalBoundary, RearSurface): 間仕切壁（表側）、隣室側
     """
 
-    partition_wall = {
-        "id": id,
-        "name": "間仕切壁",
-        "sub_name": "間仕切壁",
-        "connected_room_id": connected_room_id,
-        "boundary_type": "internal",
-        "area": area,
-        "rear_surface_boundary_id": rear_surface_boundary_id,
-        "is_solar_absorbed_inside": True,
-        "is_floor": False,
-        "h_c": 5.0,
-        "layers": [
-            {
-                "name": "石膏ボード",
-                "thermal_resistance": 0.0125 / 0.22,
-                "thermal_capacity": 830.0 * 0.0125
-            },
-            {
-                "name": "空気層",
-                "thermal_resistance": 0.07,
-                "thermal_capacity": 0.0
-            },
-            {
-                "name": "石膏ボード",
-                "thermal_resistance": 0.0125 / 0.22,
-                "thermal_capacity": 830.0 * 0.0125
-            }
-        ],
-        "solar_shading_part": {
+    partition_wall = InternalBoundary(
+        id=id,
+        name="間仕切壁",
+        sub_name="間仕切壁",
+        connected_room_id=connected_room_id,
+        boundary_type="internal",
+        area=area,
+        rear_surface_boundary_id=rear_surface_boundary_id,
+        is_solar_absorbed_inside=True,
+        is_floor=False,
+        h_c=5.0,
+        layers=make_layers('partition_wall')[0] if layers is None else layers,
+        solar_shading_part={
             "existence": False
         }
-    }
-    reverse_partition_wall = reverse_layer_for_partition_wall(
-        connected_room_id=rear_connected_room_id,
-        d=copy.deepcopy(partition_wall)
     )
-    return partition_wall, \
-        reverse_partition_wall
-
-def reverse_layer_for_partition_wall(
-        connected_room_id: int,
-        d: dict
-        ) -> dict:
-    """間仕切壁のdictionaryの層の順序を入れ替える（隣室側の定義用）
-
-    Args:
-        connected_room_id (int): 隣接する部屋ID
-        d (dict): _description_
-    """
-
-    id = d['id']
-    rear_surface_boundary_id = d['rear_surface_boundary_id']
-    dictionary = d['layers']
-    del d['layers']
-    dictionary.reverse()
-    d['layers'] = dictionary
-    d["id"] = rear_surface_boundary_id
-    d["rear_surface_boundary_id"] = id
-    d['connected_room_id'] = connected_room_id
+    return partition_wall, partition_wall.rear(connected_room_id=rear_connected_room_id)
 
-    return d
-
-def make_dictionary_for_kaima_floor(
+def make_kaima_floor(
         id: int,
         connected_room_id: int,
         rear_connected_room_id: int,
         area: float,
-        rear_surface_boundary_id: int
-        ) -> dict:
+        rear_surface_boundary_id: int,
+        layers: LayerStack = None
+        ) -> (InternalBoundary, RearSurface):
     """_summary_
 
     Args:
@@ -994,71 +1021,40 @@ def make_dictionary_for_kaima_floor(
         rear_connected_room_id (int): 隣接する部屋ID（隣室側）
         area (float): 面積[m2]
         rear_surface_boundary_id (int): 隣室側の部位ID
+        layers (LayerStack): 層構成（layer_table.make_layersの結果。省略時は既定の構成）
 
     Returns:
-        dict: _description_
+        (InternalBoundary, RearSurface): 階間床（表側）、隣室側
     """
 
-    kaima_floor = {
-        "id": id,
-        "name": "階間床",
-        "sub_name": "階間床",
-        "connected_room_id": connected_room_id,
-        "boundary_type": "internal",
-        "area": area,
-        "rear_surface_boundary_id": rear_surface_boundary_id,
-        "is_solar_absorbed_inside": True,
-        "is_floor": True,
-        "h_c": 5.0,
-        "layers": [
-            {
-                "name": "石膏ボード",
-                "thermal_resistance": 0.0125 / 0.22,
-                "thermal_capacity": 0.0125 * 830.0
-            }
-        ],
-        "solar_shading_part": {
+    kaima_floor = InternalBoundary(
+        id=id,
+        name="階間床",
+        sub_name="階間床",
+        connected_room_id=connected_room_id,
+        boundary_type="internal",
+        area=area,
+        rear_surface_boundary_id=rear_surface_boundary_id,
+        is_solar_absorbed_inside=True,
+        is_floor=True,
+        h_c=5.0,
+        layers=make_layers('kaima_floor')[0] if layers is None else layers,
+        solar_shading_part={
             "existence": False
         }
-    }
-    return kaima_floor, \
-        reverse_layer_for_kaima_floor(
-            connected_room_id=rear_connected_room_id,
-            d=copy.deepcopy(kaima_floor)
-            )
-
-def reverse_layer_for_kaima_floor(
-        connected_room_id: int,
-        d: dict
-        ) -> dict:
-    """階間床のdictionaryの層の順序を入れ替える（隣室側の定義用）
-
-    Args:
-        connected_room_id (int): 隣接する部屋ID
-        d (dict): _description_
-    """
-
-    id = d['id']
-    rear_surface_boundary_id = d['rear_surface_boundary_id']
-    dictionary = d['layers']
-    del d['layers']
-    dictionary.reverse()
-    d['layers'] = dictionary
-    d["id"] = rear_surface_boundary_id
-    d["rear_surface_boundary_id"] = id
-    d['connected_room_id'] = connected_room_id
-
-    return d
+    )
+    return kaima_floor, kaima_floor.rear(connected_room_id=rear_connected_room_id)
 
-def make_dictionary_2nd_floor(
+def make_2nd_floor(
         id: int,
         connected_room_id: int,
         rear_connected_room_id: int,
         area: float,
         rear_surface_boundary_id: int,
-        is_storage: bool
-        ) -> dict:
-    """2階の辞書型を返す
+        is_storage: bool,
+        layers: LayerStack = None
+        ) -> (InternalBoundary, RearSurface):
+    """2階のモデルを返す
     
     Args:
         id (int): 部位ID
@@ -1067,74 +1063,36 @@ def make_dictionary_2nd_floor(
         area (float): 面積[m2]
         rear_surface_boundary_id (int): 隣室側の部位ID
         is_storage (bool): 蓄熱ありの場合True
+        layers (LayerStack): 層構成（layer_table.make_layersの結果。省略時は蓄熱の利用の有無から求める）
+
+    Returns:
+        (InternalBoundary, RearSurface): 2階床（表側）、隣室側
     """
 
-    second_floor = {
-        "id": id,
-        "name": "2階床",
-        "sub_name": "2階床",
-        "connected_room_id": connected_room_id,
-        "boundary_type": "internal",
-        "area": area,
-        "rear_surface_boundary_id": rear_surface_boundary_id,
-        "is_solar_absorbed_inside": True,
-        "is_floor": True,
-        "h_c": 0.7,
-        "layers": [
-            {
-                "name": "コンクリート",
-                "thermal_resistance": 0.09 / 1.6,
-                "thermal_capacity": 0.09 * 2000.0
-            },
-            {
-                "name": "合板",
-                "thermal_resistance": 0.012 / 0.16,
-                "thermal_capacity": 0.012 * 720.0
-            }
-        ],
-        "solar_shading_part": {
+    second_floor = InternalBoundary(
+        id=id,
+        name="2階床",
+        sub_name="2階床",
+        connected_room_id=connected_room_id,
+        boundary_type="internal",
+        area=area,
+        rear_surface_boundary_id=rear_surface_boundary_id,
+        is_solar_absorbed_inside=True,
+        is_floor=True,
+        h_c=0.7,
+        layers=make_layers('2nd_floor', is_storage=is_storage)[0] if layers is None else layers,
+        solar_shading_part={
             "existence": False
         }
-    }
-
-    if not is_storage:
-        del second_floor['layers'][0]
-
-    return second_floor, \
-        reverse_layer_for_2nd_floor(
-            connected_room_id=rear_connected_room_id,
-            d=copy.deepcopy(second_floor)
-            )
-    
-
-def reverse_layer_for_2nd_floor(
-        connected_room_id: int,
-        d: dict
-        ) -> dict:
-    """2階のdictionaryの層の順序を入れ替える（隣室側の定義用）
-
-    Args:
-        connected_room_id (int): 隣接する部屋ID
-        d (dict): _description_
-    """
-
-    id = d['id']
-    rear_surface_boundary_id = d['rear_surface_boundary_id']
-    dictionary = d['layers']
-    del d['layers']
-    dictionary.reverse()
-    d['layers'] = dictionary
-    d["id"] = rear_surface_boundary_id
-    d["rear_surface_boundary_id"] = id
-    d['connected_room_id'] = connected_room_id
+    )
 
-    return d
+    return second_floor, second_floor.rear(connected_room_id=rear_connected_room_id)
 
-def make_mechanical_ventiration() -> dict:
-    """機械換気の辞書型を返す
+def make_mechanical_ventiration() -> list:
+    """機械換気の辞書型のリストを返す
 
     Returns:
-        dict: _description_
+        list: 機械換気ごとの辞書型のリスト
     """
 
     return [
@@ -1148,15 +1106,16 @@ def make_mechanical_ventiration() -> dict:
             { "id": 7, "root_type": "type3", "volume": 165.1, "root": [7]}
         ]
 
-def make_dictionary_for_insulated_internal_wall(
+def make_insulated_internal_wall(
         id: int,
         connected_room_id: int,
         rear_connected_room_id: int,
         area: float,
         rear_surface_boundary_id: int,
-        u_calc: float
-        ) -> dict:
-    """断熱内壁の辞書型を返す
+        u_calc: float,
+        layers: LayerStack = None
+        ) -> (InternalBoundary, RearSurface):
+    """断熱内壁のモデルを返す
 
     Args:
         id (int): 部位ID
@@ -1165,124 +1124,34 @@ def make_dictionary_for_insulated_internal_wall(
         area (float): 面積[m2]
         rear_surface_boundary_id (int): 隣室側の部位ID
         u_calc (float): 熱貫流率[W/(m2･K)]
+        layers (LayerStack): 層構成（layer_table.make_layersの結果。省略時は熱貫流率から求める）
 
     Returns:
-        dict: _description_
+        (InternalBoundary, RearSurface): 断熱内壁（表側）、隣室側
     """
 
-    R_i = 0.11
-    R_o = 0.04
-    # 石膏ボード10mm
-    lamda_1 = 0.24
-    d_1 = 0.010
-    crho_1 = 830
-    R_1 = d_1 / lamda_1
-    hcap_1 = crho_1 * d_1
-    # 中空層
-    R_2 = 0.09
-    hcap_2 = 0.0
-    # 住宅用グラスウール断熱材16K相当
-    lamda_3 = 0.045
-    crho_3 = 13
-    # 合板　12mm
-    lamda_4 = 0.16
-    d_4 = 0.012
-    crho_4 = 720
-    R_4 = d_4 / lamda_4
-    hcap_4 = crho_4 * d_4
-    # 木片セメント板　13mm
-    d_5 = 0.013
-    lamda_5 = 0.15
-    crho_5 = 1000.0
-    R_5 = d_5 / lamda_5
-    hcap_5 = d_5 * crho_5
-
-    # 断熱材の熱抵抗の計算
-    R_3 = max(1.0 / u_calc - R_i - R_o - R_1 - R_2 - R_4 - R_5, 0.0)
-    # 断熱材の厚さの計算
-    d_3 = R_3 * lamda_3
-    # 断熱材の熱容量の計算
-    hcap_3 = crho_3 * d_3
-
-    # layers要素の作成
-    layers = [
-        {
-            "name": "石膏ボード10mm",
-            "thermal_resistance": R_1,
-            "thermal_capacity": hcap_1
-        },
-        {
-            "name": "中空層",
-            "thermal_resistance": R_2,
-            "thermal_capacity": hcap_2
-        },
-        {
-            "name": "住宅用グラスウール断熱材16K相当",
-            "thermal_resistance": R_3,
-            "thermal_capacity": hcap_3
-        },
-        {
-            "name": "合板12mm",
-            "thermal_resistance": R_4,
-            "thermal_capacity": hcap_4
-        },
-        {
-            "name": "木片セメント板13mm",
-            "thermal_resistance": R_5,
-            "thermal_capacity": hcap_5
-        }
-        ]
-    
-    # もし、断熱なしの結果になったらlayerを削除
-    if R_3 == 0.0:
-        del layers[2]
-
-    insulated_internal_wall = {
-        "id": id,
-        "name": "外壁",
-        "sub_name": "外壁",
-        "connected_room_id": connected_room_id,
-        "boundary_type": "internal",
-        "area": area,
-        "rear_surface_boundary_id": rear_surface_boundary_id,
-        "is_solar_absorbed_inside": True,
-        "is_floor": False,
-        "h_c": 5.0,
-        "layers": layers,
-        "solar_shading_part": {
+    # 層構成の作成（省略時は熱貫流率から求める）
+    if layers is None:
+        layers = make_layers('insulated_internal_wall', u_calc=u_calc)[0]
+
+    insulated_internal_wall = InternalBoundary(
+        id=id,
+        name="外壁",
+        sub_name="外壁",
+        connected_room_id=connected_room_id,
+        boundary_type="internal",
+        area=area,
+        rear_surface_boundary_id=rear_surface_boundary_id,
+        is_solar_absorbed_inside=True,
+        is_floor=False,
+        h_c=5.0,
+        layers=layers,
+        solar_shading_part={
             "existence": False
         }
-    }
-
-    return insulated_internal_wall, \
-        reverse_dictionary_for_insulated_internal_wall(
-            connected_room_id=rear_connected_room_id,
-            d=copy.deepcopy(insulated_internal_wall)
-            )
-
-
-def reverse_dictionary_for_insulated_internal_wall(
-        connected_room_id: int,
-        d: dict
-        ) -> dict:
-    """断熱内壁のdictionaryの層の順序を入れ替える（隣室側の定義用）
-
-    Args:
-        connected_room_id (int): 隣接する部屋ID
-        d (dict): _description_
-    """
+    )
 
-    id = d['id']
-    rear_surface_boundary_id = d['rear_surface_boundary_id']
-    layers = d['layers']
-    del d['layers']
-    layers.reverse()
-    d['layers'] = layers
-    d["id"] = rear_surface_boundary_id
-    d["rear_surface_boundary_id"] = id
-    d['connected_room_id'] = connected_room_id
-
-    return d
+    return insulated_internal_wall, insulated_internal_wall.rear(connected_room_id=rear_connected_room_id)
 
 class NumpyEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+
+
+# 入力の作成に用いるソースファイル（内容のハッシュを生成器のバージョンとする）
+# sweep.pyはケースの条件から入力の作成の引数（目標値、出力形式等）を決めるため含める
+GENERATOR_FILES = ['main.py', 'building_part_info.py', 'input_model.py', 'layer_table.py', 'schedule_store.py', 'serializer.py',
+                   'response_factor_store.py', 'rf_table.py', 'sweep.py']
+
+# 部位情報のExcelファイル
+BUILDING_PART_INFO_FILE = 'info_of_building_part.xlsx'
+
+# スケジュールファイルのフォルダ
+SCHEDULE_DIR = 'schedule'
+
+# マニフェストのファイル名（出力先のフォルダに保存する）
+MANIFEST_FILE = 'manifest.json'
+
+
+def file_hash(path: str, memo: dict = None) -> str:
+    """ファイル内容のハッシュ（sha256）を返す
+
+    Args:
+        path (str): ファイル
+        memo (dict): 計算済みのハッシュ（同じ実行の中で同じファイルを何度も読まないようにする）
+
+    Returns:
+        str: ハッシュ（ファイルがない場合は空文字）
+    """
+
+    if memo is not None and path in memo:
+        return memo[path]
+
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            h = hashlib.sha256(f.read()).hexdigest()
+    else:
+        h = ''
+
+    if memo is not None:
+        memo[path] = h
+
+    return h
+
+
+def get_generator_version(memo: dict = None) -> str:
+    """生成器のバージョン（ソースファイルの内容のハッシュ）を返す"""
+
+    h = hashlib.sha256()
+    for path in GENERATOR_FILES:
+        h.update(path.encode('utf-8'))
+        h.update(file_hash(path, memo).encode('utf-8'))
+
+    return h.hexdigest()
+
+
+def params_hash(params: dict) -> str:
+    """ケースのパラメータのハッシュを返す"""
+
+    return hashlib.sha256(json.dumps(params, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def get_input_files(schedule_names: list) -> list:
+    """ケースの作成に読み込むファイルのリストを返す
+
+    Args:
+        schedule_names (list): ケースで使用するスケジュール名
+
+    Returns:
+        list: 部位情報のExcelファイルとスケジュールファイル
+    """
+
+    return [BUILDING_PART_INFO_FILE] + sorted(set(os.path.join(SCHEDULE_DIR, name + '.json') for name in schedule_names))
+
+
+class Manifest:
+    """生成したケースごとに、パラメータと読み込んだファイルのハッシュを記録する
+
+    再実行時には、記録と一致しない（パラメータ、部位情報、スケジュール、生成器のいずれかが変わった）ケースと
+    出力ファイルがないケースのみを作り直す。
+    """
+
+    def __init__(self, output_dir: str):
+        """
+        Args:
+            output_dir (str): 出力先のフォルダ
+        """
+
+        self.output_dir = output_dir
+        self.file_name = os.path.join(output_dir, MANIFEST_FILE)
+        self.entries = {}
+        self._memo = {}
+
+        if os.path.exists(self.file_name):
+            with open(self.file_name, encoding='utf-8') as f:
+                self.entries = json.load(f)['cases']
+
+    def make_entry(self, params: dict, schedule_names: list) -> dict:
+        """ケースの記録を作成する
+
+        Args:
+            params (dict): ケースのパラメータ（出力形式を含む）
+            schedule_names (list): ケースで使用するスケジュール名
+
+        Returns:
+            dict: 記録
+        """
+
+        inputs = {path: file_hash(path, self._memo) for path in get_input_files(schedule_names=schedule_names)}
+        inputs['generator'] = get_generator_version(self._memo)
+
+        return {'params': params_hash(params), 'inputs': inputs}
+
+    def is_fresh(self, output_file: str, entry: dict) -> bool:
+        """記録と一致し、出力ファイルがある場合True
+
+        Args:
+            output_file (str): 出力ファイル名（出力先のフォルダからの相対パス）
+            entry (dict): make_entryで作成した記録
+        """
+
+        recorded = self.entries.get(output_file)
+        if recorded is None:
+            return False
+        if recorded['params'] != entry['params'] or recorded['inputs'] != entry['inputs']:
+            return False
+
+        return os.path.exists(os.path.join(self.output_dir, output_file))
+
+    def get_result(self, output_file: str) -> dict:
+        """記録したケースの結果（result.csvの行）を返す"""
+
+        return self.entries[output_file]['result']
+
+    def update(self, output_file: str, entry: dict, result: dict):
+        """ケースの記録を更新する
+
+        Args:
+            output_file (str): 出力ファイル名（出力先のフォルダからの相対パス）
+            entry (dict): make_entryで作成した記録
+            result (dict): result.csvの行
+        """
+
+        self.entries[output_file] = dict(entry, result=result)
+
+    def save(self):
+        """マニフェストを保存する"""
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        # 書き込み途中のファイルを読まないように、一時ファイルに書いてから置き換える
+        tmp_file = self.file_name + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'cases': self.entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_file, self.file_name)
+
+
+def get_source_state() -> dict:
+    """監視対象のソースファイル（生成器、部位情報、スケジュール）の更新日時とサイズを返す"""
+
+    paths = GENERATOR_FILES + [BUILDING_PART_INFO_FILE] + sorted(
+        os.path.join(SCHEDULE_DIR, name) for name in os.listdir(SCHEDULE_DIR) if name.endswith('.json')
+    )
+    state = {}
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+
+    return state
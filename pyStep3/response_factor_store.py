@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import sys
+
+import rf_table
+from input_model import Boundary, InputModel, LayerStack
+from schedule_store import FrozenDict, freeze
+
+# 応答係数の計算はcalc_rf_using_minimize_functionのモジュールを用いる
+RF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'calc_rf_using_minimize_function')
+if RF_DIR not in sys.path:
+    sys.path.append(RF_DIR)
+
+from rf_cache import ResponseFactorCache, to_output  # noqa: E402
+
+
+# 部位の層構成ごとの応答係数
+# 入力に応答係数（固定根と係数）を付けておき、シミュレーション側でケースごとに計算しなくてよいようにする
+# 応答係数は室外側の表面熱伝達抵抗を含む層構成（rf_cache.get_thermal_layersを参照）について1回だけ計算し、全ての部位、ケースで共有する
+# 入力には応答係数の表を1つだけ出力し、部位は表のキーで参照する
+# 断熱材の厚さに対する応答係数の表（rf_table.pyで作成する）を指定した場合、表の層構成の部位は最適化を行わずに補間した応答係数を用い、
+# 表にない層構成と表の範囲外の断熱材の厚さは最適化を行う（直接計算した応答係数との単位応答の差は表の許容値以下、rf_table.check_tableを参照）
+
+
+class ResponseFactorStore:
+    """層構成の応答係数をプロセス内で共有するためのキャッシュ
+
+    同じ層構成には同じキーと変更できない同一のオブジェクト（'alpha'、't0'、'a0'、'coef_t'、'coef_a'のFrozenDict）を返す。
+    """
+
+    def __init__(self, cache_dir: str = None, method: str = 'QP', tables: dict = None, table_hash: str = None):
+        """
+        Args:
+            cache_dir (str): 応答係数をファイルに保存するフォルダ（省略時はメモリ上のみ、rf_cache.ResponseFactorCacheを参照）
+            method (str): 最適化の解法
+            tables (dict): 断熱材の厚さに対する応答係数の表（rf_table.load_tablesを参照、省略時は全て最適化を行う）
+            table_hash (str): 応答係数の表のファイルのハッシュ（マニフェストに記録する）
+        """
+
+        # 応答係数の表は既定の解法（QP）で計算した応答係数のため、他の解法とは併用しない
+        if tables is not None and method != 'QP':
+            raise ValueError('Response factor tables require method QP', method)
+
+        self.method = method
+        self._cache = ResponseFactorCache(cache_dir=cache_dir, method=method)
+        self._tables = [] if tables is None else list(tables.values())
+        self._table_hash = table_hash
+        self._table_hits = 0
+        self._frozen = {}
+        # (層構成のid, 室外側の表面熱伝達抵抗)ごとの(層構成, キー)（idが再利用されないよう層構成も保持する）
+        self._keys = {}
+
+    @property
+    def solver_hash(self) -> str:
+        """応答係数の計算方法（解法の設定とソースファイル、応答係数の表）のハッシュ（マニフェストに記録する）"""
+
+        if self._table_hash is None:
+            return self._cache.solver_hash
+        return hashlib.sha256(f'{self._cache.solver_hash}:{self._table_hash}'.encode('utf-8')).hexdigest()
+
+    def _get_by_table(self, boundary: Boundary, r_o: float) -> (str, dict):
+        """応答係数の表の層構成の部位の場合、補間した応答係数を返す（表の層構成でない場合はNone）"""
+
+        layers = boundary.layers.to_list()
+        for table in self._tables:
+            r_insulation = table.match(layers=layers, r_o=r_o)
+            if r_insulation is not None:
+                rf = table.lookup(r_insulation=r_insulation)
+                del rf['error_tol']
+                rf = to_output(rf)
+                key = hashlib.sha256(json.dumps({'table': self._table_hash, 'rf': rf}, sort_keys=True).encode('utf-8')).hexdigest()
+                self._table_hits += 1
+                return key, rf
+
+        return None
+
+    def get(self, boundary: Boundary) -> (str, FrozenDict):
+        """部位の応答係数を返す
+
+        Args:
+            boundary (Boundary): 層構成のある部位
+
+        Returns:
+            (str, FrozenDict): 応答係数の表のキー、応答係数
+
+        Raises:
+            ValueError: 応答係数の計算に失敗した場合（部位ID、名前と失敗の理由を付ける）
+        """
+
+        stack = boundary.layers
+        # 室外側の表面熱伝達抵抗のない部位（土間床、内壁）は層構成のみとする
+        r_o = getattr(boundary, 'outside_heat_transfer_resistance', None)
+
+        # 同じ層構成のオブジェクトはキー（層構成のハッシュ）の計算を省く
+        if (id(stack), r_o) not in self._keys:
+            result = self._get_by_table(boundary, r_o)
+            if result is None:
+                try:
+                    result = self._cache.get_output_by_boundary({'layers': stack.to_list(), 'outside_heat_transfer_resistance': r_o})
+                except ValueError as e:
+                    raise ValueError('Response factor fit failed', boundary.id, boundary.name, *e.args[1:]) from e
+            (key, rf) = result
+            if key not in self._frozen:
+                self._frozen[key] = freeze(rf)
+            self._keys[(id(stack), r_o)] = (stack, key)
+        key = self._keys[(id(stack), r_o)][1]
+
+        return key, self._frozen[key]
+
+    def attach(self, model: InputModel) -> InputModel:
+        """入力のモデルの層構成のある全ての部位（内壁の隣室側を含む）に応答係数を付ける
+
+        部位には応答係数の表のキーを、モデルには応答係数の表を付ける。
+
+        Args:
+            model (InputModel): 入力のモデル
+
+        Returns:
+            InputModel: 応答係数を付けたモデル（同じオブジェクト）
+        """
+
+        response_factors = {}
+        for boundary in model.boundaries:
+            if isinstance(getattr(boundary, 'layers', None), LayerStack):
+                (key, rf) = self.get(boundary)
+                boundary.response_factor = key
+                response_factors[key] = rf
+        model.response_factors = response_factors
+
+        return model
+
+    @property
+    def stats(self) -> dict:
+        """応答係数の計算の集計（'n_stacks'（異なる層構成の数）、'table_hits'（表の応答係数を用いた回数）、rf_cache.ResponseFactorCacheの集計）"""
+
+        return dict(self._cache.stats, n_stacks=len(self._frozen), table_hits=self._table_hits)
+
+
+# 保存先のフォルダと解法ごとのキャッシュ
+_stores = {}
+
+
+def get_store(cache_dir: str = None, method: str = 'QP', table_file: str = None) -> ResponseFactorStore:
+    """プロセス内で共有するキャッシュを返す
+
+    Args:
+        cache_dir (str): 応答係数をファイルに保存するフォルダ（省略時はメモリ上のみ）
+        method (str): 最適化の解法
+        table_file (str): 断熱材の厚さに対する応答係数の表のファイル（rf_table.pyで作成する、省略時は全て最適化を行う）
+
+    Returns:
+        ResponseFactorStore: キャッシュ
+    """
+
+    key = (cache_dir, method, table_file)
+    if key not in _stores:
+        if table_file is None:
+            (tables, table_hash) = (None, None)
+        else:
+            with open(table_file, 'rb') as f:
+                table_hash = hashlib.sha256(f.read()).hexdigest()
+            tables = rf_table.load_tables(table_file)
+        _stores[key] = ResponseFactorStore(cache_dir=cache_dir, method=method, tables=tables, table_hash=table_hash)
+
+    return _stores[key]
@@ -0,0 +1,437 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from layer_table import CONSTRUCTIONS, calc_insulation, get_fixed_property
+
+# 応答係数の計算はcalc_rf_using_minimize_functionのモジュールを用いる
+RF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'calc_rf_using_minimize_function')
+if RF_DIR not in sys.path:
+    sys.path.append(RF_DIR)
+
+from response_factor import calc_response_factor, calc_step_response_error, get_alpha_m, get_t_values  # noqa: E402
+from rf_cache import get_thermal_layers  # noqa: E402
+
+
+# 断熱材の厚さに対する応答係数の表
+# 断熱材の熱抵抗（厚さ）のみが異なる層構成（室外側の表面熱伝達抵抗を含む、rf_cache.get_thermal_layersを参照）について、
+# 格子点ごとに直接計算した応答係数（calc_response_factorの既定、固定根は層構成ごとに選定）を保持し、格子点の間は線形補間する
+# 格子点の間の確認点（CHECK_POINTS）で直接計算した応答係数との単位応答の差が許容値（TABLE_TOL）のREFINE_RATIO倍以下となるまで、格子点を二分して追加する
+# 固定根の選定が変わる熱抵抗は二分法で幅SWITCH_WIDTHまで求め、その前後の格子点の間は補間せずに近い方の格子点の応答係数とする
+# 係数の制約（単位応答の上下限、単調増加）は係数と定常値の1次式のため、固定根が同じ格子点の間で線形補間した係数も制約を満たす
+# 表はresponse_factor_store.ResponseFactorStoreで入力の部位の層構成と照合して用い、表にない層構成は直接計算する
+
+# 応答係数の表のファイル
+RF_TABLE_FILE = 'rf_tables.json'
+
+# 断熱材のある部位の層構成（部位の構成、蓄熱の利用の有無、室外側の表面熱伝達抵抗、逆順（内壁の隣室側）かどうか）
+# main.pyの部位のモデルと同じとする（外壁のみ室外側の表面熱伝達抵抗があり、内壁は表側と隣室側の両方）
+TABLE_STACKS = [
+    ('exterior_wall', False, CONSTRUCTIONS['exterior_wall']['r_o'], False),
+    ('insulated_internal_wall', False, None, False),
+    ('insulated_internal_wall', False, None, True),
+    ('skin_ceiling', False, None, False),
+    ('skin_ceiling', False, None, True),
+    ('skin_floor', False, None, False),
+    ('skin_floor', False, None, True),
+    ('skin_floor', True, None, False),
+    ('skin_floor', True, None, True)
+]
+
+# 直接計算した応答係数との単位応答の差（定常値に対する比）の許容値
+TABLE_TOL = 1.0e-3
+
+# 格子点を加える単位応答の差の許容値に対する比
+# 応答係数は熱抵抗に対して滑らかに変化するとは限らず、確認点以外では差が大きくなる場合があるため、許容値より小さい差まで格子点を加える
+REFINE_RATIO = 0.5
+
+# 最初の格子点の数（断熱材の厚さの2乗に比例する間隔とする）
+N_INITIAL = 17
+
+# 格子点の間で直接計算した応答係数と比較する位置（格子点の間隔に対する比）
+CHECK_POINTS = (0.25, 0.5, 0.75)
+
+# 固定根の選定が変わる熱抵抗を求める幅（熱抵抗の最大値に対する比）
+SWITCH_WIDTH = 1.0e-6
+
+
+def get_insulation(construction: str) -> dict:
+    """部位の構成の断熱材の層を返す"""
+
+    return [layer for layer in CONSTRUCTIONS[construction]['layers'] if layer.get('is_insulation', False)][0]
+
+
+def make_boundary_layers(construction: str, r_insulation: float, is_storage: bool = False, is_reversed: bool = False) -> list:
+    """断熱材の熱抵抗を指定した部位の層構成（layer_table.make_layersと同じ層）を返す
+
+    熱抵抗が0の断熱材は層を削除する（layer_table.make_layersと同じ）。
+
+    Args:
+        construction (str): 部位の構成（CONSTRUCTIONSのキー）
+        r_insulation (float): 断熱材の熱抵抗[m2･K/W]
+        is_storage (bool): 蓄熱の利用ありの場合True
+        is_reversed (bool): 逆順（内壁の隣室側）の場合True
+
+    Returns:
+        list: 'name'、'thermal_resistance'[m2･K/W]、'thermal_capacity'[kJ/(m2･K)]をキーとする層の辞書のリスト
+    """
+
+    layers = []
+    for layer in CONSTRUCTIONS[construction]['layers']:
+        if layer.get('is_storage_only', False) and not is_storage:
+            continue
+        if layer.get('is_insulation', False):
+            if r_insulation == 0.0:
+                continue
+            (r, hcap) = (r_insulation, layer['crho'] * (r_insulation * layer['lamda']))
+        else:
+            (r, hcap) = get_fixed_property(layer)
+        layers.append({'name': layer['name'], 'thermal_resistance': r, 'thermal_capacity': hcap})
+
+    return layers[::-1] if is_reversed else layers
+
+
+def make_stack(construction: str, r_insulation: float, is_storage: bool = False, r_o: float = None,
+               is_reversed: bool = False) -> (np.ndarray, np.ndarray):
+    """断熱材の熱抵抗を指定した層構成（室外側の表面熱伝達抵抗を含む）の熱容量と熱抵抗を返す
+
+    Args:
+        construction (str): 部位の構成（CONSTRUCTIONSのキー）
+        r_insulation (float): 断熱材の熱抵抗[m2･K/W]
+        is_storage (bool): 蓄熱の利用ありの場合True
+        r_o (float): 室外側の表面熱伝達抵抗[m2･K/W]（ない場合はNone）
+        is_reversed (bool): 逆順（内壁の隣室側）の場合True
+
+    Returns:
+        (np.ndarray, np.ndarray): 層の熱容量[J/(m2･K)]、熱抵抗[m2･K/W]
+    """
+
+    layers = get_thermal_layers({
+        'layers': make_boundary_layers(construction=construction, r_insulation=r_insulation, is_storage=is_storage, is_reversed=is_reversed),
+        'outside_heat_transfer_resistance': r_o
+    })
+
+    return (
+        np.array([layer['thermal_capacity'] for layer in layers]) * 1000.0,
+        np.array([layer['thermal_resistance'] for layer in layers])
+    )
+
+
+def fit_grid_point(construction: str, r_insulation: float, is_storage: bool, r_o: float, is_reversed: bool) -> (np.ndarray, np.ndarray, np.ndarray):
+    """格子点の応答係数を直接計算し、固定根の候補（get_alpha_m）ごとの配列にする
+
+    Returns:
+        (np.ndarray, np.ndarray, np.ndarray): 採用した固定根の場合True、貫流応答、吸熱応答の係数（採用しない固定根は0）
+    """
+
+    (c_layer, r_layer) = make_stack(construction=construction, r_insulation=r_insulation, is_storage=is_storage, r_o=r_o, is_reversed=is_reversed)
+    rf = calc_response_factor(c_layer=c_layer, r_layer=r_layer)
+    if not (rf['result_t'].success and rf['result_a'].success):
+        raise ValueError('Response factor fit failed', construction, r_insulation)
+
+    is_root = np.isin(get_alpha_m(), rf['alpha'])
+    (coef_t, coef_a) = (np.zeros(len(is_root)), np.zeros(len(is_root)))
+    coef_t[is_root] = rf['coef_t']
+    coef_a[is_root] = rf['coef_a']
+
+    return is_root, coef_t, coef_a
+
+
+class ResponseFactorTable:
+    """断熱材の熱抵抗に対する応答係数の表"""
+
+    def __init__(self, construction: str, is_storage: bool, r_o: float, is_reversed: bool, r_grid: np.ndarray,
+                 is_root: np.ndarray, coef_t: np.ndarray, coef_a: np.ndarray, error_tol: float):
+        """
+        Args:
+            construction (str): 部位の構成（CONSTRUCTIONSのキー）
+            is_storage (bool): 蓄熱の利用ありの場合True
+            r_o (float): 室外側の表面熱伝達抵抗[m2･K/W]（ない場合はNone）
+            is_reversed (bool): 逆順（内壁の隣室側）の場合True
+            r_grid (np.ndarray): 断熱材の熱抵抗の格子点[m2･K/W]
+            is_root (np.ndarray): 格子点ごとの固定根の候補（get_alpha_m）を採用した場合True（格子点の数 × 固定根の候補の数）
+            coef_t (np.ndarray): 格子点ごとの貫流応答の係数（格子点の数 × 固定根の候補の数、採用しない固定根は0）
+            coef_a (np.ndarray): 格子点ごとの吸熱応答の係数（格子点の数 × 固定根の候補の数、採用しない固定根は0）
+            error_tol (float): 直接計算した応答係数との単位応答の差（定常値に対する比）の許容値
+        """
+
+        self.construction = construction
+        self.is_storage = is_storage
+        self.r_o = r_o
+        self.is_reversed = is_reversed
+        self.r_grid = np.asarray(r_grid, dtype=float)
+        self.is_root = np.asarray(is_root, dtype=bool)
+        self.coef_t = np.asarray(coef_t, dtype=float)
+        self.coef_a = np.asarray(coef_a, dtype=float)
+        self.error_tol = error_tol
+
+        self.alpha_m = get_alpha_m()
+
+        # 断熱材以外の層と室外側の表面熱伝達抵抗の熱抵抗の合計（吸熱応答の定常値の計算に用いる）
+        self.r_fixed = float(np.sum(make_stack(construction=construction, r_insulation=0.0, is_storage=is_storage, r_o=r_o)[1]))
+
+    @property
+    def key(self) -> tuple:
+        """表のキー（TABLE_STACKSの要素）"""
+
+        return self.construction, self.is_storage, self.r_o, self.is_reversed
+
+    def lookup(self, r_insulation: float) -> dict:
+        """断熱材の熱抵抗に対する応答係数を補間する
+
+        Args:
+            r_insulation (float): 断熱材の熱抵抗[m2･K/W]（表の範囲内）
+
+        Returns:
+            dict: 'alpha'、't0'、'a0'、'coef_t'、'coef_a'と、直接計算した応答係数との差の許容値'error_tol'
+        """
+
+        if not self.r_grid[0] <= r_insulation <= self.r_grid[-1]:
+            raise ValueError('Insulation resistance out of table range', self.construction, r_insulation)
+
+        i = int(np.clip(np.searchsorted(self.r_grid, r_insulation, side='right') - 1, 0, len(self.r_grid) - 2))
+        w = (r_insulation - self.r_grid[i]) / (self.r_grid[i + 1] - self.r_grid[i])
+
+        if np.array_equal(self.is_root[i], self.is_root[i + 1]):
+            (coef_t, coef_a) = ((1.0 - w) * self.coef_t[i] + w * self.coef_t[i + 1], (1.0 - w) * self.coef_a[i] + w * self.coef_a[i + 1])
+        else:
+            # 固定根の選定が変わる熱抵抗の前後は近い方の格子点とする
+            i = i if w < 0.5 else i + 1
+            (coef_t, coef_a) = (self.coef_t[i], self.coef_a[i])
+        is_root = self.is_root[i]
+
+        return {
+            'alpha': self.alpha_m[is_root],
+            't0': 1.0,
+            'a0': self.r_fixed + r_insulation,
+            'coef_t': coef_t[is_root],
+            'coef_a': coef_a[is_root],
+            'error_tol': self.error_tol
+        }
+
+    def lookup_u(self, u_calc: float) -> dict:
+        """部位の熱貫流率に対する応答係数を補間する
+
+        Args:
+            u_calc (float): 部位の熱貫流率[W/(m2･K)]
+
+        Returns:
+            dict: lookupの結果
+        """
+
+        (r, _) = calc_insulation(construction=self.construction, u_calc=np.array([u_calc]), is_storage=np.array([self.is_storage]))
+
+        return self.lookup(r_insulation=float(r[0]))
+
+    def match(self, layers: list, r_o: float = None) -> float:
+        """部位の層構成がこの表の層構成の場合、断熱材の熱抵抗を返す
+
+        Args:
+            layers (list): 部位の層の辞書のリスト（室外側の表面熱伝達抵抗を含まない）
+            r_o (float): 部位の室外側の表面熱伝達抵抗[m2･K/W]（ない場合はNone）
+
+        Returns:
+            float: 断熱材の熱抵抗[m2･K/W]（表の層構成でない場合、表の範囲外の場合はNone）
+        """
+
+        if r_o != self.r_o:
+            return None
+
+        insulation = [layer for layer in layers if layer['name'] == get_insulation(self.construction)['name']]
+        r_insulation = insulation[0]['thermal_resistance'] if len(insulation) == 1 else 0.0
+        if not self.r_grid[0] <= r_insulation <= self.r_grid[-1]:
+            return None
+
+        expected = make_boundary_layers(
+            construction=self.construction, r_insulation=r_insulation, is_storage=self.is_storage, is_reversed=self.is_reversed)
+        if len(expected) != len(layers):
+            return None
+        for (layer, e) in zip(layers, expected):
+            if layer['name'] != e['name'] \
+                    or not np.isclose(layer['thermal_resistance'], e['thermal_resistance'], rtol=1.0e-12, atol=0.0) \
+                    or not np.isclose(layer['thermal_capacity'], e['thermal_capacity'], rtol=1.0e-12, atol=0.0):
+                return None
+
+        return r_insulation
+
+    def to_dict(self) -> dict:
+
+        return {
+            'construction': self.construction,
+            'is_storage': self.is_storage,
+            'r_o': self.r_o,
+            'is_reversed': self.is_reversed,
+            'r_grid': self.r_grid.tolist(),
+            'is_root': self.is_root.tolist(),
+            'coef_t': self.coef_t.tolist(),
+            'coef_a': self.coef_a.tolist(),
+            'error_tol': self.error_tol
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict):
+
+        return cls(**d)
+
+
+def build_table(construction: str, is_storage: bool = False, r_o: float = None, is_reversed: bool = False, d_max: float = 0.5,
+                n_initial: int = N_INITIAL, tol: float = TABLE_TOL) -> ResponseFactorTable:
+    """断熱材の厚さの格子点ごとに応答係数を直接計算し、表を作成する
+
+    格子点の間の確認点（CHECK_POINTS）で直接計算した応答係数と補間した応答係数の単位応答の差がtol * REFINE_RATIOを超える場合、
+    または確認点と格子点で選定した固定根が異なる場合は、格子点の間の中点を格子点に加えて二分する。
+
+    Args:
+        construction (str): 部位の構成（CONSTRUCTIONSのキー）
+        is_storage (bool): 蓄熱の利用ありの場合True
+        r_o (float): 室外側の表面熱伝達抵抗[m2･K/W]（ない場合はNone）
+        is_reversed (bool): 逆順（内壁の隣室側）の場合True
+        d_max (float): 断熱材の厚さの最大値[m]
+        n_initial (int): 最初の格子点の数
+        tol (float): 直接計算した応答係数との単位応答の差（定常値に対する比）の許容値
+
+    Returns:
+        ResponseFactorTable: 応答係数の表
+    """
+
+    r_max = d_max / get_insulation(construction)['lamda']
+    t_values = get_t_values()
+
+    fits = {}
+
+    def fit(r: float):
+        if r not in fits:
+            fits[r] = fit_grid_point(construction=construction, r_insulation=r, is_storage=is_storage, r_o=r_o, is_reversed=is_reversed)
+        return fits[r]
+
+    def make_table(r_grid: list) -> ResponseFactorTable:
+        return ResponseFactorTable(
+            construction=construction, is_storage=is_storage, r_o=r_o, is_reversed=is_reversed, r_grid=np.array(r_grid),
+            is_root=np.array([fits[r][0] for r in r_grid]), coef_t=np.array([fits[r][1] for r in r_grid]),
+            coef_a=np.array([fits[r][2] for r in r_grid]), error_tol=tol
+        )
+
+    r_initial = (r_max * np.linspace(0.0, 1.0, n_initial) ** 2).tolist()
+
+    # 確認を終えた格子点の間の両端のみを格子点とする（確認点で計算した応答係数は格子点に含めない）
+    r_grid = set()
+    intervals = list(zip(r_initial[:-1], r_initial[1:]))
+    while len(intervals) > 0:
+        (r0, r1) = intervals.pop()
+
+        if r1 - r0 <= SWITCH_WIDTH * r_max:
+            # 固定根の選定が変わる熱抵抗を幅SWITCH_WIDTHまで求めた場合
+            is_split = False
+        elif not np.array_equal(fit(r0)[0], fit(r1)[0]):
+            is_split = True
+        else:
+            is_split = False
+            table = make_table([r0, r1])
+            for p in CHECK_POINTS:
+                r = r0 + (r1 - r0) * p
+                (is_root, coef_t, coef_a) = fit(r)
+                if not np.array_equal(is_root, fits[r0][0]):
+                    is_split = True
+                    break
+                rf = {'alpha': table.alpha_m[is_root], 't0': 1.0, 'a0': table.r_fixed + r, 'coef_t': coef_t[is_root], 'coef_a': coef_a[is_root]}
+                if max(calc_step_response_error(table.lookup(r), rf, t_values)) > tol * REFINE_RATIO:
+                    is_split = True
+                    break
+
+        if is_split:
+            r_mid = (r0 + r1) / 2
+            fit(r_mid)
+            intervals.extend([(r0, r_mid), (r_mid, r1)])
+        else:
+            r_grid.update([r0, r1])
+
+    return make_table(sorted(r_grid))
+
+
+def check_table(table: ResponseFactorTable, n_samples: int = 100, seed: int = 0) -> dict:
+    """表の範囲内の無作為な断熱材の熱抵抗について、補間した応答係数を直接計算した応答係数と比較する
+
+    直接計算した応答係数（calc_response_factorの既定、固定根は層構成ごとに選定）との単位応答の差を表の許容値と比較する。
+
+    Args:
+        table (ResponseFactorTable): 応答係数の表
+        n_samples (int): 比較する熱抵抗の数
+        seed (int): 乱数のシード
+
+    Returns:
+        dict: 単位応答の差の最大値'max_error_t'、'max_error_a'、許容値を超えた数'n_exceeded'、
+            許容値を超えたものがない場合True'ok'
+    """
+
+    rng = np.random.default_rng(seed)
+    t_values = get_t_values()
+
+    result = {'max_error_t': 0.0, 'max_error_a': 0.0, 'n_exceeded': 0}
+    for r in rng.uniform(table.r_grid[0], table.r_grid[-1], n_samples):
+        rf = table.lookup(r)
+        (c_layer, r_layer) = make_stack(
+            construction=table.construction, r_insulation=r, is_storage=table.is_storage, r_o=table.r_o, is_reversed=table.is_reversed)
+        (error_t, error_a) = calc_step_response_error(rf, calc_response_factor(c_layer=c_layer, r_layer=r_layer), t_values)
+        result['max_error_t'] = max(result['max_error_t'], error_t)
+        result['max_error_a'] = max(result['max_error_a'], error_a)
+        if max(error_t, error_a) > table.error_tol:
+            result['n_exceeded'] += 1
+    result['ok'] = result['n_exceeded'] == 0
+
+    return result
+
+
+def load_tables(file_name: str = RF_TABLE_FILE) -> dict:
+    """保存した応答係数の表を読み込む
+
+    Returns:
+        dict: TABLE_STACKSの要素（部位の構成, 蓄熱の利用の有無, 室外側の表面熱伝達抵抗, 逆順かどうか）をキーとする応答係数の表
+    """
+
+    with open(file_name, encoding='utf-8') as f:
+        tables = [ResponseFactorTable.from_dict(d) for d in json.load(f)]
+
+    return {table.key: table for table in tables}
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='断熱材のある部位の層構成ごとに、断熱材の厚さに対する応答係数の表を作成する')
+    parser.add_argument('--output', default=RF_TABLE_FILE, help='応答係数の表の出力先のファイル')
+    parser.add_argument('--d-max', type=float, default=0.5, help='断熱材の厚さの最大値[m]')
+    parser.add_argument('--n-initial', type=int, default=N_INITIAL, help='断熱材の厚さの最初の格子点の数')
+    parser.add_argument('--tol', type=float, default=TABLE_TOL, help='直接計算した応答係数との単位応答の差（定常値に対する比）の許容値')
+    parser.add_argument('--check', type=int, default=0, help='表ごとに直接計算した応答係数と比較する熱抵抗の数')
+    args = parser.parse_args(argv)
+
+    tables = []
+    is_ok = True
+    for (construction, is_storage, r_o, is_reversed) in TABLE_STACKS:
+        table = build_table(
+            construction=construction, is_storage=is_storage, r_o=r_o, is_reversed=is_reversed,
+            d_max=args.d_max, n_initial=args.n_initial, tol=args.tol
+        )
+        tables.append(table)
+        n_roots = sorted(set(int(n) for n in table.is_root.sum(axis=1)))
+        print(
+            f'{construction} storage={is_storage} r_o={r_o} reversed={is_reversed}:'
+            f' points={len(table.r_grid)} roots={n_roots[0]}-{n_roots[-1]} tol={table.error_tol:.1e}'
+        )
+        if args.check > 0:
+            r = check_table(table=table, n_samples=args.check)
+            is_ok = is_ok and r['ok']
+            print(f"  check: max_error_t={r['max_error_t']:.2e} max_error_a={r['max_error_a']:.2e} exceeded={r['n_exceeded']} / {args.check}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump([table.to_dict() for table in tables], f, ensure_ascii=False)
+
+    # 直接計算した応答係数との差が許容値を超えた場合は終了コードを1とする
+    return 0 if is_ok else 1
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
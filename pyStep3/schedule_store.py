@@ -0,0 +1,129 @@
+import collections
+import glob
+import json
+import os
+
+
+class FrozenDict(dict):
+    """変更できない辞書型（JSONへはdictとして書き出される）"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('schedule is read-only')
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+    __ior__ = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(obj):
+    """JSONから読み込んだオブジェクトを変更できない型に変換する
+
+    Args:
+        obj: json.loadの結果
+
+    Returns:
+        辞書はFrozenDict、リストはtupleに変換したオブジェクト
+    """
+
+    if isinstance(obj, dict):
+        return FrozenDict((k, freeze(v)) for k, v in obj.items())
+    elif isinstance(obj, list):
+        return tuple(freeze(v) for v in obj)
+    else:
+        return obj
+
+
+class ScheduleStore:
+    """スケジュールファイルをプロセス内で共有するためのLRUキャッシュ
+
+    同じスケジュールは一度だけ読み込み、変更できない同一のオブジェクトを返す。
+    """
+
+    def __init__(self, schedule_dir: str = 'schedule', maxsize: int = 32):
+        """
+        Args:
+            schedule_dir (str): スケジュールファイルのフォルダ
+            maxsize (int): 保持するスケジュールの最大数
+        """
+
+        self.schedule_dir = schedule_dir
+        self.maxsize = maxsize
+        self._cache = collections.OrderedDict()
+
+    def get(self, name: str) -> FrozenDict:
+        """スケジュールを返す
+
+        Args:
+            name (str): スケジュール名（拡張子を除くファイル名）
+
+        Returns:
+            FrozenDict: スケジュール
+        """
+
+        path = os.path.abspath(os.path.join(self.schedule_dir, name + '.json'))
+
+        if path in self._cache:
+            self._cache.move_to_end(path)
+            return self._cache[path]
+
+        with open(path) as f:
+            schedule = freeze(json.load(f))
+
+        self._cache[path] = schedule
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+        return schedule
+
+    def get_many(self, names) -> list:
+        """複数のスケジュールをまとめて返す
+
+        Args:
+            names: スケジュール名のリスト
+
+        Returns:
+            list: スケジュールのリスト
+        """
+
+        return [self.get(name) for name in names]
+
+    def preload(self, operation_mode: str) -> list:
+        """運転モードに対応する全てのスケジュールと空のスケジュール（zero）を読み込む
+
+        Args:
+            operation_mode (str): 'kyositu_kanketu' or 'kyositu_renzoku' or 'zenkan_renzoku'
+
+        Returns:
+            list: 読み込んだスケジュール名
+        """
+
+        names = sorted(
+            os.path.splitext(os.path.basename(path))[0]
+            for path in glob.glob(os.path.join(self.schedule_dir, '*_' + operation_mode + '.json'))
+        ) + ['zero']
+        self.get_many(names)
+
+        return names
+
+    def clear(self):
+        """キャッシュを空にする"""
+
+        self._cache.clear()
+
+
+# プロセス内で共有するスケジュール
+default_store = ScheduleStore()
@@ -0,0 +1,299 @@
+import argparse
+import functools
+import glob
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# msgpack、cbor形式の出力に用いる（インストールされていない場合は、その形式を指定したときにエラーとする）
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+# 出力形式と拡張子
+FORMATS = {
+    'json': '.json',
+    'compact': '.json',
+    'msgpack': '.msgpack',
+    'cbor': '.cbor'
+}
+
+
+# 変換が不要な型
+_SCALAR_TYPES = {int, str, bool, type(None)}
+
+
+def to_builtin(obj, precision: int = None):
+    """numpyの型をPythonの組み込み型に変換する
+
+    Args:
+        obj: 入力の辞書等（to_dictを持つ入力のモデルは辞書に変換する）
+        precision (int): 浮動小数点数の有効桁数（省略時は丸めない）
+
+    Returns:
+        辞書、リスト、数値、文字列のみからなるオブジェクト（tupleはリストに変換する）
+    """
+
+    t = type(obj)
+    if t is float:
+        return obj if precision is None else round_float(obj, precision)
+    if t is str or t is int or t is bool or obj is None:
+        return obj
+    if isinstance(obj, dict):
+        return {k: to_builtin(v, precision) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        types = set(map(type, obj))
+        if types <= _SCALAR_TYPES:
+            return list(obj)
+        if types == {float}:
+            # スケジュール等の浮動小数点数のみのリストはまとめて丸める
+            return list(obj) if precision is None else round_floats(np.array(obj), precision).tolist()
+        return [to_builtin(v, precision) for v in obj]
+    if isinstance(obj, np.ndarray):
+        if precision is not None and obj.dtype.kind == 'f':
+            return round_floats(obj, precision).tolist()
+        return to_builtin(obj.tolist(), precision)
+    if isinstance(obj, (bool, np.bool_)):
+        return bool(obj)
+    if isinstance(obj, (int, np.integer)):
+        return int(obj)
+    if isinstance(obj, (float, np.floating)):
+        return round_float(float(obj), precision)
+    if hasattr(obj, 'to_dict'):
+        return to_builtin(obj.to_dict(), precision)
+    return obj
+
+
+def _orjson_default(obj):
+    """orjsonが変換できないオブジェクト（入力のモデル）を変換する"""
+
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError
+
+
+def round_float(v: float, precision: int = None) -> float:
+    """浮動小数点数を有効桁数で丸める（0.006000000000000001 → 0.006 等）"""
+
+    # 0.0と-0.0はキャッシュで区別されないため、キャッシュを用いずにそのまま返す
+    if precision is None or v == 0.0 or not math.isfinite(v):
+        return v
+    return _round_float(v, precision)
+
+
+@functools.lru_cache(maxsize=65536)
+def _round_float(v: float, precision: int) -> float:
+
+    return float(f'{v:.{precision}g}')
+
+
+def round_floats(v: np.ndarray, precision: int) -> np.ndarray:
+    """浮動小数点数の配列を有効桁数で丸める
+
+    要素ごとにround_floatと同じ規則で丸める（スケジュール等は同じ値が多いため、異なる値のみround_floatで丸める）。
+    """
+
+    v = np.asarray(v, dtype=float)
+    (values, inverse) = np.unique(v, return_inverse=True)
+    rounded = np.array([round_float(x, precision) for x in values.tolist()], dtype=float)
+
+    # 0.0と-0.0はnp.uniqueで区別されないため、0は元の値とする
+    return np.where(v == 0.0, v, rounded[inverse].reshape(v.shape))
+
+
+def _check_module(module, format: str):
+    """出力形式に用いるパッケージがインストールされていない場合はエラーとする"""
+
+    if module is None:
+        raise ValueError('Package for format is not installed', format, {'msgpack': 'msgpack', 'cbor': 'cbor2'}[format])
+
+
+def dumps(obj, format: str = 'json', precision: int = None) -> bytes:
+    """入力の辞書をバイト列に変換する
+
+    Args:
+        obj: 入力の辞書またはモデル（InputModel）
+        format (str): 'json'（インデント4、従来と同じ形式） or 'compact'（空白なしのJSON） or 'msgpack' or 'cbor'
+        precision (int): 浮動小数点数の有効桁数（省略時は丸めない）
+
+    Returns:
+        bytes: UTF-8のJSONまたはバイナリ
+    """
+
+    if format == 'json':
+        return json.dumps(to_builtin(obj, precision), indent=4, ensure_ascii=False).encode('utf-8')
+
+    if format == 'compact':
+        if orjson is not None:
+            # orjsonはnumpyの配列、スカラーを直接変換できるため、丸めない場合は変換を省略する
+            if precision is not None:
+                obj = to_builtin(obj, precision)
+            return orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(to_builtin(obj, precision), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    if format == 'msgpack':
+        _check_module(msgpack, format)
+        return msgpack.packb(to_builtin(obj, precision), use_bin_type=True)
+
+    if format == 'cbor':
+        _check_module(cbor2, format)
+        return cbor2.dumps(to_builtin(obj, precision))
+
+    raise ValueError('Unknown format', format)
+
+
+def loads(data: bytes, format: str = 'json'):
+    """バイト列を入力の辞書に変換する
+
+    Args:
+        data (bytes): dumpsで作成したバイト列
+        format (str): 'json' or 'compact' or 'msgpack' or 'cbor'
+
+    Returns:
+        dict: 入力の辞書
+    """
+
+    if format in ('json', 'compact'):
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    if format == 'msgpack':
+        _check_module(msgpack, format)
+        return msgpack.unpackb(data, raw=False)
+
+    if format == 'cbor':
+        _check_module(cbor2, format)
+        return cbor2.loads(data)
+
+    raise ValueError('Unknown format', format)
+
+
+def dump(obj, file_name: str, format: str = 'json', precision: int = None):
+    """入力の辞書をファイルに書き出す
+
+    Args:
+        obj: 入力の辞書
+        file_name (str): ファイル名
+        format (str): 'json' or 'compact' or 'msgpack' or 'cbor'
+        precision (int): 浮動小数点数の有効桁数（省略時は丸めない）
+    """
+
+    with open(file_name, 'wb') as f:
+        f.write(dumps(obj, format=format, precision=precision))
+
+
+def load(file_name: str, format: str = None):
+    """ファイルから入力の辞書を読み込む
+
+    Args:
+        file_name (str): ファイル名
+        format (str): 'json' or 'compact' or 'msgpack' or 'cbor'（省略時は拡張子から判断する）
+
+    Returns:
+        dict: 入力の辞書
+    """
+
+    if format is None:
+        format = get_format(file_name=file_name)
+
+    with open(file_name, 'rb') as f:
+        return loads(f.read(), format=format)
+
+
+def get_format(file_name: str) -> str:
+    """拡張子から形式を判断する（.jsonはインデントの有無によらず読み込めるため'json'とする）"""
+
+    ext = os.path.splitext(file_name)[1].lower()
+    for format in ('json', 'msgpack', 'cbor'):
+        if FORMATS[format] == ext:
+            return format
+    raise ValueError('Unknown file extension', file_name)
+
+
+def benchmark(input_dir: str, formats: list, precision: int = None, output_dir: str = None) -> list:
+    """既存の入力JSONを各形式で書き出し、サイズと書き出し、読み込みの時間を計測する
+
+    Args:
+        input_dir (str): 入力JSONのフォルダ
+        formats (list): 計測する形式のリスト
+        precision (int): 浮動小数点数の有効桁数（省略時は丸めない）
+        output_dir (str): 書き出し先のフォルダ（省略時は書き出さずにメモリ上で計測する）
+
+    Returns:
+        list: 形式ごとの結果の辞書のリスト
+    """
+
+    files = sorted(glob.glob(os.path.join(input_dir, '*.json')))
+    documents = [load(file_name) for file_name in files]
+    input_size = sum(os.path.getsize(file_name) for file_name in files)
+
+    results = []
+    for format in formats:
+        try:
+            start = time.perf_counter()
+            data = [dumps(d, format=format, precision=precision) for d in documents]
+            if output_dir is not None:
+                os.makedirs(output_dir, exist_ok=True)
+                for file_name, b in zip(files, data):
+                    name = os.path.splitext(os.path.basename(file_name))[0] + '.' + format + FORMATS[format]
+                    with open(os.path.join(output_dir, name), 'wb') as f:
+                        f.write(b)
+            write_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for b in data:
+                loads(b, format=format)
+            read_time = time.perf_counter() - start
+        except ImportError as e:
+            results.append({'format': format, 'error': str(e)})
+            continue
+
+        results.append({
+            'format': format,
+            'n': len(files),
+            'input_size': input_size,
+            'size': sum(len(b) for b in data),
+            'write_time': write_time,
+            'read_time': read_time
+        })
+
+    return results
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='入力JSONを各形式で書き出し、サイズと書き出し、読み込みの時間を表示する')
+    parser.add_argument('input_dir', help='入力JSONのフォルダ')
+    parser.add_argument('--format', nargs='+', default=list(FORMATS), choices=list(FORMATS), help='計測する形式')
+    parser.add_argument('--precision', type=int, default=None, help='浮動小数点数の有効桁数')
+    parser.add_argument('--output-dir', default=None, help='書き出し先のフォルダ（省略時はメモリ上で計測する）')
+    args = parser.parse_args(argv)
+
+    for r in benchmark(input_dir=args.input_dir, formats=args.format, precision=args.precision, output_dir=args.output_dir):
+        if 'error' in r:
+            print(f"{r['format']:8s} skipped ({r['error']})")
+            continue
+        print(
+            f"{r['format']:8s} files={r['n']} size={r['size'] / 1e6:.2f} MB ({r['size'] / r['input_size'] * 100:.1f} %)"
+            f" write={r['write_time']:.3f} s read={r['read_time']:.3f} s"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,358 @@
+import argparse
+import concurrent.futures
+import csv
+import itertools
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from main import make_input_json_batch, get_schedule_names
+from manifest import Manifest, get_source_state
+from schedule_store import default_store as schedule_store
+import serializer
+
+
+# 運転モード（ファイル名に用いる名称とmake_input_jsonに与える名称）
+OPERATION_MODES = {
+    '全館連続': 'zenkan_renzoku',
+    '居室連続': 'kyositu_renzoku',
+    '居室間歇': 'kyositu_kanketu'
+}
+
+RESULT_COLUMNS = ['case', 'ac_mode', 'region', 'operation_mode', 'TS', 'ua_value', 'eta_a_value', 'ua_flg', 'etaa_flg']
+
+
+def is_excluded(ac_mode: str, region: int, operation_mode: str) -> bool:
+    """計算対象外の組み合わせの場合Trueを返す
+
+    Args:
+        ac_mode (str): 暖冷房モード（'C' or 'H'）
+        region (int): 地域区分
+        operation_mode (str): 運転モード（'全館連続' or '居室連続' or '居室間歇'）
+
+    Returns:
+        bool: 8地域の暖房、居室連続の冷房の場合True
+    """
+
+    return (region == 8 and ac_mode == 'H') or (ac_mode == 'C' and operation_mode == '居室連続')
+
+
+def make_cases(ac_mode_s, region_s, operation_mode_s, TS_s, UA_s, eta_a_s) -> list:
+    """全組み合わせから計算対象外を除いたケースのリストを返す
+
+    ケース番号の順序はnotebookのnp.meshgrid（indexing='xy'）と同じく、地域区分、暖冷房モード、運転モード、熱容量、UA値、ηA値の順に回す。
+
+    Returns:
+        list: ケースの辞書型のリスト
+    """
+
+    cases = []
+    for (region, ac_mode, operation_mode, TS, ua_value, eta_a_value) \
+            in itertools.product(region_s, ac_mode_s, operation_mode_s, TS_s, UA_s, eta_a_s):
+        if is_excluded(ac_mode=ac_mode, region=region, operation_mode=operation_mode):
+            continue
+        cases.append({
+            'case': len(cases),
+            'ac_mode': ac_mode,
+            'region': int(region),
+            'operation_mode': operation_mode,
+            'TS': int(TS),
+            'ua_value': float(ua_value),
+            'eta_a_value': float(eta_a_value)
+        })
+
+    return cases
+
+
+def get_file_name(case: dict) -> str:
+    """ケースのJSONファイル名（拡張子なし）を返す
+
+    Args:
+        case (dict): ケース
+
+    Returns:
+        str: NNNNN_<地域区分><暖冷房モード>_<運転モード>_<熱容量>_<UA値>_<ηA値>
+    """
+
+    # 断熱性能
+    insulation = f"{int(case['ua_value'] * 100.0):03d}"
+    # 日射遮へい性能
+    shading = f"{int(case['eta_a_value'] * 1000.0):03d}"
+
+    return f"{case['case']:05d}" + '_' + str(case['region']) + case['ac_mode'] + '_' + case['operation_mode'] \
+        + '_' + str(case['TS']) + '_' + insulation + '_' + shading
+
+
+def run_cases(cases: list, a_env: float, output_dir: str, format: str = 'json', precision: int = None,
+              response_factors: bool = False, rf_cache_dir: str = None, rf_table_file: str = None) -> list:
+    """ケースの入力を作成してファイルに書き出す（プロセスプールの1タスク分）
+
+    Args:
+        cases (list): ケースの辞書型のリスト
+        a_env (float): 設計住戸の外皮面積の合計[m2]
+        output_dir (str): 出力先のフォルダ
+        format (str): 出力形式（serializer.FORMATS を参照）
+        precision (int): 浮動小数点数の有効桁数（省略時は丸めない）
+        response_factors (bool): Trueの場合、層構成のある部位に応答係数を付ける
+        rf_cache_dir (str): 応答係数をファイルに保存するフォルダ（省略時はメモリ上のみ）
+        rf_table_file (str): 断熱材の厚さに対する応答係数の表のファイル（省略時は全て最適化を行う）
+
+    Returns:
+        list: result.csvの行のリスト
+    """
+
+    if response_factors:
+        # 応答係数の計算にはscipyを用いるため、必要な場合のみ読み込む
+        import response_factor_store
+        rf_store = response_factor_store.get_store(cache_dir=rf_cache_dir, table_file=rf_table_file)
+    else:
+        rf_store = None
+
+    eta_a_value = np.array([case['eta_a_value'] for case in cases])
+    is_cooling = np.array([case['ac_mode'] == 'C' for case in cases])
+    (input_dicts, c) = make_input_json_batch(
+        region=[case['region'] for case in cases],
+        ua_target=[case['ua_value'] for case in cases],
+        # 目標ηA値はExcelの計算条件（A3、J3セル）と同様に暖冷房モードの期間のみに与える（もう一方の期間はNaN）
+        eta_ac_target=np.where(is_cooling, eta_a_value, np.nan),
+        eta_ah_target=np.where(is_cooling, np.nan, eta_a_value),
+        a_env=a_env,
+        # 熱容量（1：なし、2：あり）
+        is_storage=[case['TS'] == 2 for case in cases],
+        operation_mode=[OPERATION_MODES[case['operation_mode']] for case in cases],
+        return_calibration=True,
+        response_factor_store=rf_store
+    )
+
+    rows = []
+    for n, (case, input_dict) in enumerate(zip(cases, input_dicts)):
+        serializer.dump(
+            input_dict,
+            file_name=os.path.join(output_dir, get_file_name(case) + serializer.FORMATS[format]),
+            format=format,
+            precision=precision
+        )
+        is_eta_achieved = c['is_eta_ac_achieved'][n] if case['ac_mode'] == 'C' else c['is_eta_ah_achieved'][n]
+        rows.append(dict(case, ua_flg=bool(c['is_ua_achieved'][n]), etaa_flg=bool(is_eta_achieved)))
+
+    return rows
+
+
+def init_worker(operation_modes: list):
+    """ワーカープロセスの初期化（スケジュールの先読み）
+
+    Args:
+        operation_modes (list): make_input_jsonに与える運転モードのリスト
+    """
+
+    for operation_mode in operation_modes:
+        schedule_store.preload(operation_mode)
+
+
+def run_sweep(cases: list, a_env: float, output_dir: str, workers: int = None, chunk_size: int = None,
+              format: str = 'json', precision: int = None, response_factors: bool = False, rf_cache_dir: str = None,
+              rf_table_file: str = None) -> list:
+    """ケースをプロセスプールに分配して実行する
+
+    Args:
+        cases (list): ケースの辞書型のリスト
+        a_env (float): 設計住戸の外皮面積の合計[m2]
+        output_dir (str): 出力先のフォルダ
+        workers (int): ワーカープロセス数（省略時はCPU数）
+        chunk_size (int): 1タスクあたりのケース数（省略時はワーカーあたり4タスク程度になるように決める）
+        format (str): 出力形式（serializer.FORMATS を参照）
+        precision (int): 浮動小数点数の有効桁数（省略時は丸めない）
+        response_factors (bool): Trueの場合、層構成のある部位に応答係数を付ける
+        rf_cache_dir (str): 応答係数をファイルに保存するフォルダ（ワーカー間で計算結果を共有する場合に指定する）
+        rf_table_file (str): 断熱材の厚さに対する応答係数の表のファイル（省略時は全て最適化を行う）
+
+    Returns:
+        list: result.csvの行のリスト（ケース番号順）
+    """
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(cases) // (workers * 4)))
+    chunks = [cases[i:i + chunk_size] for i in range(0, len(cases), chunk_size)]
+
+    operation_modes = sorted(set(OPERATION_MODES[case['operation_mode']] for case in cases))
+
+    if workers == 1:
+        init_worker(operation_modes)
+        results = [run_cases(chunk, a_env, output_dir, format, precision, response_factors, rf_cache_dir, rf_table_file) for chunk in chunks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, initializer=init_worker, initargs=(operation_modes,)) as executor:
+            results = list(executor.map(
+                run_cases, chunks, itertools.repeat(a_env), itertools.repeat(output_dir),
+                itertools.repeat(format), itertools.repeat(precision), itertools.repeat(response_factors),
+                itertools.repeat(rf_cache_dir), itertools.repeat(rf_table_file)))
+
+    return [row for rows in results for row in rows]
+
+
+def run_incremental(cases: list, a_env: float, output_dir: str, workers: int = None, chunk_size: int = None,
+                    format: str = 'json', precision: int = None, force: bool = False, response_factors: bool = False,
+                    rf_cache_dir: str = None, rf_table_file: str = None) -> (list, int):
+    """マニフェストと一致しないケースのみ作り直す
+
+    ケースのパラメータ、部位情報、使用するスケジュールファイル、生成器のソースファイルのハッシュを出力先のmanifest.jsonに記録し、
+    記録と一致するケース（出力ファイルがあるもの）は作り直さずに記録した結果を用いる。
+
+    Args:
+        cases (list): ケースの辞書型のリスト
+        a_env (float): 設計住戸の外皮面積の合計[m2]
+        output_dir (str): 出力先のフォルダ
+        workers (int): ワーカープロセス数（省略時はCPU数）
+        chunk_size (int): 1タスクあたりのケース数
+        format (str): 出力形式（serializer.FORMATS を参照）
+        precision (int): 浮動小数点数の有効桁数（省略時は丸めない）
+        force (bool): Trueの場合、全てのケースを作り直す
+        response_factors (bool): Trueの場合、層構成のある部位に応答係数を付ける
+        rf_cache_dir (str): 応答係数をファイルに保存するフォルダ
+        rf_table_file (str): 断熱材の厚さに対する応答係数の表のファイル（省略時は全て最適化を行う）
+
+    Returns:
+        (list, int): result.csvの行のリスト（ケース番号順）、作り直したケース数
+    """
+
+    manifest = Manifest(output_dir=output_dir)
+
+    params = dict(a_env=a_env, format=format, precision=precision)
+    if response_factors:
+        # 応答係数の計算方法（応答係数の表を含む）が変わった場合も作り直す
+        import response_factor_store
+        params['response_factors'] = response_factor_store.get_store(cache_dir=rf_cache_dir, table_file=rf_table_file).solver_hash
+
+    output_files = []
+    entries = []
+    stale_cases = []
+    for case in cases:
+        output_file = get_file_name(case) + serializer.FORMATS[format]
+        entry = manifest.make_entry(
+            params=dict(case, **params),
+            schedule_names=get_schedule_names(operation_mode=OPERATION_MODES[case['operation_mode']])
+        )
+        output_files.append(output_file)
+        entries.append(entry)
+        if force or not manifest.is_fresh(output_file=output_file, entry=entry):
+            stale_cases.append(case)
+
+    if len(stale_cases) > 0:
+        rows = run_sweep(cases=stale_cases, a_env=a_env, output_dir=output_dir, workers=workers, chunk_size=chunk_size,
+                         format=format, precision=precision, response_factors=response_factors, rf_cache_dir=rf_cache_dir,
+                         rf_table_file=rf_table_file)
+        stale = {case['case']: row for case, row in zip(stale_cases, rows)}
+        for case, output_file, entry in zip(cases, output_files, entries):
+            if case['case'] in stale:
+                manifest.update(output_file=output_file, entry=entry, result=stale[case['case']])
+        manifest.save()
+
+    return [manifest.get_result(output_file) for output_file in output_files], len(stale_cases)
+
+
+def watch(argv: list, interval: float):
+    """ソースファイル（生成器、部位情報、スケジュール）が更新されるたびに、別プロセスで差分のみ作り直す
+
+    生成器のソースの変更を反映するため、作り直しは毎回新しいプロセスで行う。
+
+    Args:
+        argv (list): 監視モードの指定を除いたコマンドライン引数
+        interval (float): 更新を確認する間隔[s]
+    """
+
+    state = None
+    while True:
+        # 作り直しの間に更新された場合も次の確認で作り直すよう、作り直し前の状態を記録する
+        current = get_source_state()
+        if current != state:
+            state = current
+            subprocess.run([sys.executable, os.path.abspath(__file__)] + argv)
+        time.sleep(interval)
+
+
+def write_result(rows: list, file_name: str):
+    """result.csvを書き出す
+
+    Args:
+        rows (list): result.csvの行のリスト
+        file_name (str): ファイル名
+    """
+
+    with open(file_name, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([''] + RESULT_COLUMNS)
+        for i, row in enumerate(rows):
+            writer.writerow([i] + [row[column] for column in RESULT_COLUMNS])
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='目標とするUA、ηAを再現する入力JSONを全組み合わせについて作成する')
+    parser.add_argument('--ac-mode', nargs='+', default=['C', 'H'], choices=['C', 'H'], help='暖冷房モード（目標ηA値を与える期間）')
+    parser.add_argument('--region', nargs='+', type=int, default=[6], help='地域区分')
+    parser.add_argument('--operation-mode', nargs='+', default=['全館連続', '居室間歇'], choices=list(OPERATION_MODES), help='運転モード')
+    parser.add_argument('--ts', nargs='+', type=int, default=[1], choices=[1, 2], help='蓄熱の利用（1：なし、2：あり）')
+    # UA値は0.4～0.9まで0.1刻み
+    parser.add_argument('--ua', nargs='+', type=float, default=np.arange(start=0.4, stop=0.95, step=0.1, dtype=float).tolist(), help='目標UA値[W/(m2･K)]')
+    # ηAは0.2%～4.8%まで0.2%刻み
+    parser.add_argument('--eta-a', nargs='+', type=float, default=(np.arange(start=0.2, stop=5.0, step=0.2, dtype=float) / 100.0).tolist(), help='目標ηA値[－]')
+    parser.add_argument('--a-env', type=float, default=307.51, help='設計住戸の外皮面積の合計[m2]')
+    parser.add_argument('--output-dir', default='input_data', help='JSONファイルの出力先')
+    parser.add_argument('--result', default='result.csv', help='目標値の担保の確認結果の出力先')
+    parser.add_argument('--format', default='json', choices=list(serializer.FORMATS),
+                        help='出力形式（json：インデント付きJSON、compact：空白なしJSON、msgpack、cbor）')
+    parser.add_argument('--precision', type=int, default=None, help='浮動小数点数の有効桁数（省略時は丸めない）')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='ワーカープロセス数（省略時はCPU数）')
+    parser.add_argument('--chunk-size', type=int, default=None, help='1タスクあたりのケース数')
+    parser.add_argument('--response-factors', action='store_true', help='層構成のある部位に応答係数（固定根と係数）を付ける')
+    parser.add_argument('--rf-cache-dir', default=None, help='応答係数をファイルに保存するフォルダ（省略時はメモリ上のみ）')
+    parser.add_argument('--rf-tables', default=None,
+                        help='断熱材の厚さに対する応答係数の表のファイル（rf_table.pyで作成する、省略時は全て最適化を行う）')
+    parser.add_argument('--force', action='store_true', help='manifest.jsonの記録によらず全てのケースを作り直す')
+    parser.add_argument('--watch', action='store_true', help='ソースファイルが更新されるたびに差分のみ作り直す')
+    parser.add_argument('--watch-interval', type=float, default=2.0, help='監視モードで更新を確認する間隔[s]')
+    if argv is None:
+        argv = sys.argv[1:]
+    args = parser.parse_args(argv)
+
+    # 出力先は呼び出し元のフォルダを基準とし、部位情報、スケジュールはこのファイルのフォルダから相対パスで参照する
+    output_dir = os.path.abspath(args.output_dir)
+    result_file = os.path.abspath(args.result)
+    rf_cache_dir = None if args.rf_cache_dir is None else os.path.abspath(args.rf_cache_dir)
+    rf_table_file = None if args.rf_tables is None else os.path.abspath(args.rf_tables)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if args.watch:
+        watch(
+            argv=[a for a in argv if a != '--watch'] + ['--output-dir', output_dir, '--result', result_file],
+            interval=args.watch_interval
+        )
+        return
+
+    cases = make_cases(
+        ac_mode_s=args.ac_mode,
+        region_s=args.region,
+        operation_mode_s=args.operation_mode,
+        TS_s=args.ts,
+        UA_s=args.ua,
+        eta_a_s=args.eta_a
+    )
+
+    (rows, n_built) = run_incremental(
+        cases=cases, a_env=args.a_env, output_dir=output_dir, workers=args.workers, chunk_size=args.chunk_size,
+        format=args.format, precision=args.precision, force=args.force, response_factors=args.response_factors,
+        rf_cache_dir=rf_cache_dir, rf_table_file=rf_table_file)
+    print(f'{n_built} / {len(cases)} cases built')
+
+    write_result(rows=rows, file_name=result_file)
+
+
+if __name__ == '__main__':
+    main()